@@ -0,0 +1,7 @@
+"""
+Performance benchmarks for EbookLib.
+
+Run them from the root of the repository:
+
+    python -m benchmarks.run --profile medium
+"""
@@ -0,0 +1,150 @@
+"""
+Synthetic books used by the benchmarks.
+
+Content is generated from a seeded random generator so the same parameters always produce the same book.
+"""
+
+import random
+from dataclasses import asdict, dataclass
+
+from ebooklib import epub
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore et dolore "
+    "magna aliqua enim ad minim veniam quis nostrud exercitation ullamco laboris nisi aliquip ex ea commodo "
+    "consequat duis aute irure in reprehenderit voluptate velit esse cillum fugiat nulla pariatur excepteur sint "
+    "occaecat cupidatat non proident sunt culpa qui officia deserunt mollit anim id est laborum"
+).split()
+
+
+@dataclass
+class BookSpec:
+    """Size of a synthetic book."""
+
+    chapters: int = 50
+    chapter_size: int = 20 * 1024
+    images: int = 10
+    image_size: int = 100 * 1024
+    toc_depth: int = 2
+    # page break markers in every chapter, for the page list of the navigation
+    page_breaks: int = 0
+    seed: int = 1
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+PROFILES: dict[str, BookSpec] = {
+    "small": BookSpec(chapters=10, chapter_size=8 * 1024, images=2, image_size=32 * 1024, toc_depth=1),
+    "medium": BookSpec(),
+    "large": BookSpec(chapters=1000, chapter_size=10 * 1024, images=100, image_size=200 * 1024, toc_depth=3),
+}
+
+
+def _paragraph(rnd: random.Random, chapter: int, chapters: int) -> str:
+    words = rnd.choices(WORDS, k=rnd.randint(30, 120))
+
+    # every now and then link to some other chapter
+    if rnd.random() < 0.2:
+        target = rnd.randrange(chapters)
+        pos = rnd.randrange(len(words))
+        words[pos] = f'<a href="chap_{target:05d}.xhtml">{words[pos]}</a>'
+
+    if rnd.random() < 0.1:
+        pos = rnd.randrange(len(words))
+        words[pos] = f"<em>{words[pos]}</em>"
+
+    return "<p>" + " ".join(words) + ".</p>"
+
+
+def make_chapter_content(rnd: random.Random, spec: BookSpec, number: int) -> str:
+    parts = [f"<html><head></head><body><h1>Chapter {number + 1}</h1>"]
+    size = len(parts[0])
+    section = 0
+
+    while size < spec.chapter_size:
+        if size > (section + 1) * 4096:
+            section += 1
+            parts.append(f'<h2 id="section_{section}">Section {section}</h2>')
+
+        part = _paragraph(rnd, number, spec.chapters)
+        parts.append(part)
+        size += len(part)
+
+    parts.append("</body></html>")
+
+    if spec.page_breaks:
+        # spread markers between the paragraphs
+        step = max(1, len(parts) // spec.page_breaks)
+
+        for n, pos in enumerate(range(len(parts) - 1, 0, -step)[: spec.page_breaks]):
+            page = f"{number + 1}-{spec.page_breaks - n}"
+            parts.insert(pos, f'<span epub:type="pagebreak" id="page_{page}" title="{page}"/>')
+
+    return "".join(parts)
+
+
+def _make_toc(items: list, depth: int, prefix: str) -> list:
+    if depth <= 1 or len(items) <= 4:
+        return list(items)
+
+    toc = []
+    step = -(-len(items) // 4)
+
+    for n, start in enumerate(range(0, len(items), step)):
+        group = items[start : start + step]
+        title = f"Part {prefix}{n + 1}"
+        toc.append((epub.Section(title, group[0].file_name), _make_toc(group, depth - 1, f"{prefix}{n + 1}.")))
+
+    return toc
+
+
+def make_book(spec: BookSpec) -> epub.EpubBook:
+    """
+    Returns new book with chapters, images and table of contents described by spec.
+    """
+    rnd = random.Random(spec.seed)
+
+    book = epub.EpubBook()
+    book.set_identifier(f"benchmark-{spec.seed}")
+    book.set_title("Benchmark book")
+    book.set_language("en")
+    book.add_author("EbookLib")
+
+    style = epub.EpubItem(
+        uid="style_default", file_name="style/default.css", media_type="text/css", content=b"body { margin: 1em; }"
+    )
+    book.add_item(style)
+
+    images = []
+    for n in range(spec.images):
+        image = epub.EpubImage(
+            uid=f"image_{n:05d}",
+            file_name=f"images/image_{n:05d}.jpg",
+            media_type="image/jpeg",
+            content=rnd.randbytes(spec.image_size),
+        )
+        book.add_item(image)
+        images.append(image)
+
+    chapters = []
+    for n in range(spec.chapters):
+        chapter = epub.EpubHtml(title=f"Chapter {n + 1}", file_name=f"chap_{n:05d}.xhtml", lang="en")
+        content = make_chapter_content(rnd, spec, n)
+
+        if images:
+            image = images[n % len(images)]
+            content = content.replace("</h1>", f'</h1><img src="{image.file_name}" alt=""/>', 1)
+
+        chapter.content = content
+        chapter.add_item(style)
+        book.add_item(chapter)
+        chapters.append(chapter)
+
+    book.toc = _make_toc(chapters, spec.toc_depth, "")
+    book.spine = ["nav", *chapters]
+
+    book.add_item(epub.EpubNcx())
+    book.add_item(epub.EpubNav())
+
+    return book
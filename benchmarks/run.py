@@ -0,0 +1,327 @@
+"""
+Standalone benchmark runner.
+
+Builds a synthetic book, times reading, writing and processing of it and reports throughput and peak memory.
+Results can be saved as JSON baseline and later runs compared against it:
+
+    python -m benchmarks.run --profile medium --save benchmarks/baselines/medium.json
+    python -m benchmarks.run --profile medium --compare benchmarks/baselines/medium.json
+
+When compared, the runner exits with status 1 if any benchmark got slower than the baseline by more than the
+tolerance.
+"""
+
+import argparse
+import dataclasses
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import ebooklib
+from benchmarks.baseline_syntax import BaselineSyntaxPlugin
+from benchmarks.books import PROFILES, BookSpec, make_book
+from ebooklib import epub
+from ebooklib.plugins import booktype, standard
+
+
+@dataclass
+class Case:
+    """
+    Single benchmark. setup() is called before every repeat and is not timed, its result is passed to run().
+    """
+
+    name: str
+    description: str
+    setup: Callable[[], Any]
+    run: Callable[[Any], Any]
+    # which content is counted for throughput, "all" or "chapters"
+    counts: str = "all"
+    # measure memory held by the result of run()
+    retained: bool = False
+
+
+def peak_rss() -> int | None:
+    """
+    Returns peak resident set size of this process in bytes, None when it can not be measured.
+    """
+    if resource is None:
+        return None
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes, macOS bytes
+    if sys.platform == "darwin":
+        return rss
+
+    return rss * 1024
+
+
+def content_size(book: epub.EpubBook, chapters_only: bool = False) -> int:
+    size = 0
+
+    for item in book.get_items():
+        if chapters_only and not isinstance(item, epub.EpubHtml):
+            continue
+
+        content = item.content
+        size += len(content.encode("utf-8") if isinstance(content, str) else content)
+
+    return size
+
+
+def make_cases(spec: BookSpec, tmpdir: str) -> list[Case]:
+    book = make_book(spec)
+
+    file_name = os.path.join(tmpdir, "benchmark.epub")
+    epub.write_epub(file_name, book)
+
+    def _structure(name):
+        return epub.read_epub(name, {"lazy_load": True})
+
+    def _read_lazy(name):
+        with epub.read_epub(name, {"lazy_load": True}) as book:
+            for item in book.get_items():
+                item.get_content()
+
+    def _roundtrip(name):
+        epub.write_epub(io.BytesIO(), epub.read_epub(name))
+
+    def _get_content(book):
+        for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT):
+            item.get_content()
+
+    def _navigation(book):
+        writer = epub.EpubWriter(io.BytesIO(), book)
+
+        for item in book.get_items():
+            if isinstance(item, epub.EpubNav):
+                writer._get_nav(item)
+            elif isinstance(item, epub.EpubNcx):
+                writer._get_ncx()
+
+    def _parsed_chapters():
+        parsed = make_book(spec)
+        chapters = [item for item in parsed.get_items() if type(item) is epub.EpubHtml]
+
+        for chapter in chapters:
+            chapter.get_html_tree()
+
+        return parsed, chapters
+
+    def _syntax_plugin(state, plugin_class=standard.SyntaxPlugin):
+        book, chapters = state
+        plugin = plugin_class()
+
+        for chapter in chapters:
+            plugin.html_before_write(book, chapter)
+
+    def _syntax_plugin_baseline(state):
+        _syntax_plugin(state, BaselineSyntaxPlugin)
+
+    def _plugins(book):
+        plugins = [standard.SyntaxPlugin(), booktype.BooktypeLinks(book), booktype.BooktypeFootnotes(book)]
+        writer = epub.EpubWriter(io.BytesIO(), book, {"plugins": plugins})
+        writer.process()
+
+        for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT):
+            item.get_content()
+
+    return [
+        Case("write", "write_epub to memory", lambda: book, lambda b: epub.write_epub(io.BytesIO(), b)),
+        Case("read", "read_epub from file", lambda: file_name, epub.read_epub, retained=True),
+        Case("structure", "read_epub with lazy_load, no content", lambda: file_name, _structure, retained=True),
+        Case("read_lazy", "read_epub with lazy_load, touching all items", lambda: file_name, _read_lazy),
+        Case("roundtrip", "read_epub followed by write_epub", lambda: file_name, _roundtrip),
+        Case("get_content", "EpubHtml.get_content for all chapters", lambda: book, _get_content, "chapters"),
+        Case("navigation", "nav and NCX generation", lambda: book, _navigation, "chapters"),
+        # plugins change the chapters so every repeat needs a new book
+        Case("syntax_plugin", "SyntaxPlugin on already parsed chapters", _parsed_chapters, _syntax_plugin, "chapters"),
+        Case(
+            "syntax_plugin_baseline",
+            "SyntaxPlugin before attribute whitelists, on already parsed chapters",
+            _parsed_chapters,
+            _syntax_plugin_baseline,
+            "chapters",
+        ),
+        Case("plugins", "Syntax and Booktype plugins before write", lambda: make_book(spec), _plugins, "chapters"),
+    ]
+
+
+def run_case(case: Case, spec: BookSpec, sizes: dict[str, int], repeat: int) -> dict[str, Any]:
+    timings = []
+
+    for _ in range(repeat):
+        state = case.setup()
+
+        start = time.perf_counter()
+        case.run(state)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    size = sizes[case.counts]
+
+    return {
+        "description": case.description,
+        "best": best,
+        "median": statistics.median(timings),
+        "repeat": repeat,
+        "mb_per_s": size / best / (1024 * 1024),
+        "chapters_per_s": spec.chapters / best,
+        "peak_rss": peak_rss(),
+        "retained": measure_retained(case) if case.retained else None,
+    }
+
+
+def measure_retained(case: Case) -> int:
+    """
+    Returns how many bytes of memory are held by the result of one more, untimed, run of the benchmark.
+    """
+    state = case.setup()
+
+    tracemalloc.start()
+    try:
+        result = case.run(state)
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    close = getattr(result, "close", None)
+    if close is not None:
+        close()
+
+    return retained
+
+
+def compare(results: dict[str, dict], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """
+    Returns list of benchmarks which are slower than in the baseline by more than tolerance.
+    """
+    regressions = []
+
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+
+        if previous is None:
+            continue
+
+        change = result["best"] / previous["best"] - 1
+        result["change"] = change
+
+        if change > tolerance:
+            regressions.append(name)
+
+    return regressions
+
+
+def format_size(size: int | None) -> str:
+    if size is None:
+        return "-"
+
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def report(results: dict[str, dict], regressions: list[str]) -> None:
+    print(
+        f"{'benchmark':<13} {'best':>10} {'median':>10} {'MB/s':>9} {'chapters/s':>11} {'peak RSS':>10} "
+        f"{'retained':>10} {'change':>8}"
+    )
+
+    for name, result in results.items():
+        change = f"{result['change']:+.1%}" if "change" in result else "-"
+        marker = "  REGRESSION" if name in regressions else ""
+
+        print(
+            f"{name:<13} {result['best'] * 1000:>8.1f}ms {result['median'] * 1000:>8.1f}ms "
+            f"{result['mb_per_s']:>9.2f} {result['chapters_per_s']:>11.1f} {format_size(result['peak_rss']):>10} "
+            f"{format_size(result.get('retained')):>10} {change:>8}{marker}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="EbookLib benchmarks")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="medium", help="size of the book")
+    parser.add_argument("--chapters", type=int, help="number of chapters")
+    parser.add_argument("--chapter-size", type=int, help="size of every chapter in bytes")
+    parser.add_argument("--images", type=int, help="number of images")
+    parser.add_argument("--image-size", type=int, help="size of every image in bytes")
+    parser.add_argument("--toc-depth", type=int, help="depth of the table of contents")
+    parser.add_argument("--page-breaks", type=int, help="number of page break markers in every chapter")
+    parser.add_argument("--repeat", type=int, default=5, help="how many times every benchmark is run")
+    parser.add_argument("--only", action="append", help="run only this benchmark (can be used more than once)")
+    parser.add_argument("--save", metavar="FILE", help="save results as JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare results with JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    overrides = {
+        field.name: getattr(args, field.name)
+        for field in dataclasses.fields(BookSpec)
+        if getattr(args, field.name, None) is not None
+    }
+    spec = dataclasses.replace(PROFILES[args.profile], **overrides)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cases = make_cases(spec, tmpdir)
+
+        if args.only:
+            unknown = set(args.only) - {case.name for case in cases}
+            if unknown:
+                parser.error(f"unknown benchmark: {', '.join(sorted(unknown))}")
+
+            cases = [case for case in cases if case.name in args.only]
+
+        book = make_book(spec)
+        sizes = {"all": content_size(book), "chapters": content_size(book, chapters_only=True)}
+
+        print(f"Book: {spec}, content {format_size(sizes['all'])}")
+
+        results = {case.name: run_case(case, spec, sizes, args.repeat) for case in cases}
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        if baseline.get("spec") != spec.as_dict():
+            print(f"Warning: baseline was made for a different book: {baseline.get('spec')}")
+
+        regressions = compare(results, baseline, args.tolerance)
+
+    report(results, regressions)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+
+        with open(args.save, "w") as f:
+            data = {
+                "spec": spec.as_dict(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "ebooklib": ebooklib.VERSION,
+                "results": results,
+            }
+            json.dump(data, f, indent=2)
+
+    if regressions:
+        print(f"Slower than baseline by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
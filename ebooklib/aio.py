@@ -0,0 +1,189 @@
+# This file is part of EbookLib.
+# Copyright (c) 2013 Aleksandar Erkalovic <aerkalov@gmail.com>
+#
+# EbookLib is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# EbookLib is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with EbookLib.  If not, see <http://www.gnu.org/licenses/>.
+
+"""asyncio versions of read_epub and write_epub."""
+
+import asyncio
+import inspect
+import io
+from collections.abc import AsyncIterable, Callable
+from concurrent.futures import Executor
+from functools import partial
+from typing import Any, TypeVar
+
+from ebooklib.book import EpubBook
+from ebooklib.reader import read_epub
+from ebooklib.writer import EpubTarget, write_epub
+
+# Size of the chunks read from async input streams and written to async output streams
+ASYNC_CHUNK_SIZE = 64 * 1024
+
+_T = TypeVar("_T")
+
+
+async def _run(
+    func: Callable[[], _T], executor: Executor | None = None, semaphore: asyncio.Semaphore | None = None
+) -> _T:
+    loop = asyncio.get_running_loop()
+
+    if semaphore is None:
+        return await loop.run_in_executor(executor, func)
+
+    async with semaphore:
+        return await loop.run_in_executor(executor, func)
+
+
+async def _read_stream(source: Any) -> io.BytesIO | None:
+    # archive needs random access, so content of async streams is collected in memory
+    read = getattr(source, "read", None)
+    data = io.BytesIO()
+
+    if read is not None and inspect.iscoroutinefunction(read):
+        while chunk := await read(ASYNC_CHUNK_SIZE):
+            data.write(chunk)
+    elif isinstance(source, AsyncIterable):
+        async for chunk in source:
+            data.write(chunk)
+    else:
+        return None
+
+    data.seek(0)
+
+    return data
+
+
+def _is_async_stream(target: Any) -> bool:
+    return inspect.iscoroutinefunction(getattr(target, "write", None)) or inspect.iscoroutinefunction(
+        getattr(target, "drain", None)
+    )
+
+
+async def _write_stream(stream: Any, data: bytes) -> None:
+    result = stream.write(data)
+    if inspect.isawaitable(result):
+        await result
+
+    # asyncio.StreamWriter
+    drain = getattr(stream, "drain", None)
+    if drain is not None:
+        await drain()
+
+
+class _AsyncStreamFile:
+    """
+    Writable file used by the writer in the executor. Written data is collected in chunks which are written
+    to the async stream in the event loop; the writer waits until every chunk is written.
+    """
+
+    def __init__(self, stream: Any, loop: asyncio.AbstractEventLoop) -> None:
+        self.stream = stream
+        self.loop = loop
+
+        self._buffer = bytearray()
+
+    def write(self, data: bytes, /) -> int:
+        self._buffer += data
+
+        if len(self._buffer) >= ASYNC_CHUNK_SIZE:
+            self.flush()
+
+        return len(data)
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+
+        data = bytes(self._buffer)
+        self._buffer.clear()
+
+        asyncio.run_coroutine_threadsafe(_write_stream(self.stream, data), self.loop).result()
+
+
+async def aread_epub(
+    name: Any,
+    options: dict[str, Any] | None = None,
+    *,
+    executor: Executor | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+) -> EpubBook:
+    """
+    Creates new instance of EpubBook with the content defined in the input file, without blocking the event
+    loop. Reading and parsing is done in the executor.
+
+    >>> book = await ebooklib.aread_epub('book.epub')
+
+    Input can also be an async stream, an object with coroutine read() (asyncio.StreamReader, aiofiles) or
+    an async iterable of bytes (body of a HTTP request). Its content is read in the event loop and kept in
+    memory.
+
+    Content of items in books read with the lazy_load option is read when it is accessed, in the thread
+    which accesses it.
+
+    :Args:
+      - name: full path to the input file, file-like object or async stream
+      - options: extra options as dictionary, same as for read_epub (optional)
+      - executor: Executor for reading, default executor of the event loop if not defined (optional)
+      - semaphore: Semaphore which limits how many books are read or written at the same time (optional)
+
+    :Returns:
+      Instance of EpubBook.
+    """
+    data = await _read_stream(name)
+
+    return await _run(partial(read_epub, name if data is None else data, options), executor, semaphore)
+
+
+async def awrite_epub(
+    name: EpubTarget,
+    book: EpubBook,
+    options: dict[str, Any] | None = None,
+    *,
+    executor: Executor | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+) -> bool:
+    """
+    Creates epub file with the content defined in EpubBook, without blocking the event loop. Plugins,
+    generation of the content and compression run in the executor.
+
+    >>> await ebooklib.awrite_epub('book.epub', book)
+
+    Output can also be an async stream, an object with coroutine write() (aiofiles) or with coroutine
+    drain() (asyncio.StreamWriter). The archive is written to it in chunks while it is being created.
+
+    :Args:
+      - name: file name for the output file, file-like object or async stream
+      - book: instance of EpubBook
+      - options: extra options as dictionary, same as for write_epub (optional)
+      - executor: Executor for writing, default executor of the event loop if not defined (optional)
+      - semaphore: Semaphore which limits how many books are read or written at the same time (optional)
+
+    :Returns:
+      Same as write_epub, False if writing failed and raise_exceptions option is not set.
+    """
+    if not _is_async_stream(name):
+        return await _run(partial(write_epub, name, book, options), executor, semaphore)
+
+    target = _AsyncStreamFile(name, asyncio.get_running_loop())
+
+    def _write() -> bool:
+        result = write_epub(target, book, options)
+
+        if result:
+            target.flush()
+
+        return result
+
+    return await _run(_write, executor, semaphore)
@@ -16,14 +16,57 @@
 
 """EpubBook - in-memory representation of an EPUB book."""
 
+import copy
 import uuid
+import zipfile
 from collections import OrderedDict
 from collections.abc import Iterator
-from typing import Any
+from typing import IO, Any
+
+from lxml import etree
 
 from ebooklib.consts import CHAPTER_XML, COVER_XML, NAMESPACES, NAV_XML, NCX_XML, VERSION
 from ebooklib.items import EpubCover, EpubCoverHtml, EpubHtml, EpubImage, EpubItem
-from ebooklib.utils import guess_type
+from ebooklib.store import ContentStore
+from ebooklib.utils import Directory, close_archive, guess_type, parse_string
+
+
+class _ItemList(list[EpubItem]):
+    # Counts changes of the list, so lookup indexes of the book know when they have to be built again,
+    # also when the list is changed directly instead of with add_item() and remove_item().
+    __slots__ = ("version",)
+
+    def __init__(self, *args: Any) -> None:
+        super().__init__(*args)
+        self.version = 0
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return _ItemList, (list(self),)
+
+    def _changed(method_name: str) -> Any:
+        method = getattr(list, method_name)
+
+        def _method(self: "_ItemList", *args: Any, **kwargs: Any) -> Any:
+            self.version += 1
+            return method(self, *args, **kwargs)
+
+        _method.__name__ = method_name
+        return _method
+
+    append = _changed("append")
+    extend = _changed("extend")
+    insert = _changed("insert")
+    pop = _changed("pop")
+    remove = _changed("remove")
+    clear = _changed("clear")
+    sort = _changed("sort")
+    reverse = _changed("reverse")
+    __setitem__ = _changed("__setitem__")
+    __delitem__ = _changed("__delitem__")
+    __iadd__ = _changed("__iadd__")
+    __imul__ = _changed("__imul__")
+
+    del _changed
 
 
 class EpubBook:
@@ -34,6 +77,16 @@ class EpubBook:
         # Set by EpubReader when loading an existing book.
         self.version: str | None = None
 
+        # Archive the book was read from. Kept open only for lazily loaded books,
+        # closed with close() or when leaving the with block.
+        self._archive: zipfile.ZipFile | Directory | None = None
+        # File the content of the items is still read from (lazy_load and zero_copy options). Writing
+        # the book to this file replaces it only when the new file is complete.
+        self._source_file: str | None = None
+
+        # Keeps content of large items outside of memory, see set_content_store()
+        self.content_store: ContentStore | None = None
+
         self.reset()
 
         # we should have options here
@@ -42,7 +95,14 @@ class EpubBook:
         """Initialises all needed variables to default values"""
 
         self.metadata: dict[str | None, dict[str, list[Any]]] = {}
-        self.items: list[EpubItem] = []
+        self.items = []
+
+        # lookup indexes for items, kept in sync by add_item/remove_item. Direct changes of the items list
+        # and of id or file name of the items make them out of date, they are built again on next lookup.
+        self._id_index: dict[str, EpubItem] = {}
+        self._href_index: dict[str, EpubItem] = {}
+        self._indexed_items: _ItemList | None = None
+        self._indexed_version = 0
         self.spine: list[Any] = []
         self.guide: list[dict[str, Any]] = []
         self.pages: list[Any] = []
@@ -67,6 +127,8 @@ class EpubBook:
             "chapter": CHAPTER_XML,
             "cover": COVER_XML,
         }
+        # parsed templates, as (value, tree), which are only copied and never changed
+        self._template_trees: dict[str, tuple[bytes, etree._ElementTree]] = {}
 
         self.add_metadata(
             "OPF",
@@ -82,6 +144,41 @@ class EpubBook:
         self.prefixes: list[str] = []
         self.namespaces: dict[str, str] = {}
 
+    def close(self) -> None:
+        """
+        Closes the archive this book was lazily loaded from and the content store. Content of the items
+        which was not accessed before closing can not be read anymore.
+        """
+        if self._archive is not None:
+            close_archive(self._archive)
+            self._archive = None
+
+        if self.content_store is not None:
+            self.content_store.close()
+            self.content_store = None
+
+    def set_content_store(self, store: ContentStore | None) -> None:
+        """
+        Sets the store which keeps content of large items outside of memory. Items already in the book
+        are given to the store right away, the others when they are added or their content is set.
+
+        >>> book.set_content_store(epub.TempFileStore(threshold=1024 * 1024))
+
+        :Args:
+          - store: Instance of ContentStore, or None to stop using the store
+        """
+        self.content_store = store
+
+        if store is not None:
+            for item in self.items:
+                store.put(item)
+
+    def __enter__(self) -> "EpubBook":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
     def set_identifier(self, uid: str) -> None:
         """
         Sets unique id for this epub
@@ -234,11 +331,82 @@ class EpubBook:
                 item.id = f"static_{self._id_static}"
                 self._id_static += 1
 
+        index_current = self._is_index_current()
+
         item.book = self
         self.items.append(item)
 
+        if self.content_store is not None:
+            self.content_store.put(item)
+
+        if index_current:
+            self._index_item(item)
+            self._indexed_version = self._items.version
+
         return item
 
+    def remove_item(self, item: EpubItem) -> None:
+        """
+        Removes item from the book. Item is not removed from the spine, table of contents or guide.
+
+        :Args:
+          - item: Item instance
+
+        :Raises:
+          ValueError if item is not part of this book.
+        """
+        index_current = self._is_index_current()
+
+        self.items.remove(item)
+        item.book = None
+
+        if self.content_store is not None:
+            self.content_store.discard(item)
+
+        # other item with the same id or file name could be found in its place, index is built again then
+        if (
+            index_current
+            and (item.id is None or self._id_index.get(item.id) is not item)
+            and self._href_index.get(item.get_name()) is not item
+        ):
+            self._indexed_version = self._items.version
+        else:
+            self._invalidate_index()
+
+    @property
+    def items(self) -> list[EpubItem]:
+        """
+        All items of the book. Assigned lists are copied.
+        """
+        return self._items
+
+    @items.setter
+    def items(self, value: list[EpubItem]) -> None:
+        self._items = value if isinstance(value, _ItemList) else _ItemList(value)
+
+    def _is_index_current(self) -> bool:
+        return self._indexed_items is self._items and self._indexed_version == self._items.version
+
+    def _invalidate_index(self) -> None:
+        self._indexed_items = None
+
+    def _index_item(self, item: EpubItem) -> None:
+        # the first item with the same id or href wins, same as when searching the list
+        if item.id is not None:
+            self._id_index.setdefault(item.id, item)
+
+        self._href_index.setdefault(item.get_name(), item)
+
+    def _rebuild_index(self) -> None:
+        self._id_index = {}
+        self._href_index = {}
+
+        for item in self._items:
+            self._index_item(item)
+
+        self._indexed_items = self._items
+        self._indexed_version = self._items.version
+
     def get_item_with_id(self, uid: str) -> EpubItem | None:
         """
         Returns item for defined UID.
@@ -251,11 +419,10 @@ class EpubBook:
         :Returns:
           Returns item object. Returns None if nothing was found.
         """
-        for item in self.get_items():
-            if item.id == uid:
-                return item
+        if not self._is_index_current():
+            self._rebuild_index()
 
-        return None
+        return self._id_index.get(uid)
 
     def get_item_with_href(self, href: str) -> EpubItem | None:
         """
@@ -269,11 +436,34 @@ class EpubBook:
         :Returns:
           Returns item object. Returns None if nothing was found.
         """
-        for item in self.get_items():
-            if item.get_name() == href:
-                return item
+        if not self._is_index_current():
+            self._rebuild_index()
 
-        return None
+        return self._href_index.get(href)
+
+    def open_item(self, href: str) -> IO[bytes]:
+        """
+        Opens content of the item for reading, without reading all of it into memory when the book was
+        lazily loaded. Members of the archive stored without compression are returned as seekable streams,
+        deflated members are decompressed while they are read. Every stream reads with its own handle of
+        the archive file, so several threads can read at the same time.
+
+        >>> with book.open_item('audio/chapter1.mp3') as f:
+        ...     f.seek(1024 * 1024)
+        ...     data = f.read(64 * 1024)
+
+        :Args:
+          - href: HREF of the item
+
+        :Returns:
+          Binary file-like object, which should be closed when it is not needed anymore.
+        """
+        item = self.get_item_with_href(href)
+
+        if item is None:
+            raise KeyError(f"There is no item with href {href!r}")
+
+        return item.open_content()
 
     def get_items(self) -> Iterator[EpubItem]:
         """
@@ -327,6 +517,7 @@ class EpubBook:
         """
 
         self.templates[name] = value
+        self._template_trees.pop(name, None)
 
     def get_template(self, name: str) -> bytes | None:
         """
@@ -340,6 +531,29 @@ class EpubBook:
         """
         return self.templates.get(name)
 
+    def get_template_tree(self, name: str) -> etree._ElementTree | None:
+        """
+        Returns parsed template. Template is parsed only once and every call returns new copy of it which
+        can be freely changed.
+
+        :Args:
+          - name: template name
+
+        :Returns:
+          Parsed template or None if template is not defined.
+        """
+        value = self.templates.get(name)
+        if value is None:
+            return None
+
+        cached = self._template_trees.get(name)
+
+        # templates dictionary can also be changed directly, so the value is checked as well
+        if cached is None or cached[0] is not value:
+            cached = self._template_trees[name] = (value, parse_string(value))
+
+        return copy.deepcopy(cached[1])
+
     def add_prefix(self, name: str, uri: str) -> None:
         """
         Appends custom prefix to be added to the content.opf document
@@ -0,0 +1,234 @@
+# This file is part of EbookLib.
+# Copyright (c) 2013 Aleksandar Erkalovic <aerkalov@gmail.com>
+#
+# EbookLib is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# EbookLib is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with EbookLib.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Caches of compressed archive members, shared by all books written with them."""
+
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+
+# Members smaller than this are compressed every time, by default
+DEFAULT_CACHE_MIN_SIZE = 4 * 1024
+# Size of all cached entries in bytes, by default
+DEFAULT_CACHE_MAX_SIZE = 512 * 1024 * 1024
+# When the cache is full, least recently used entries are removed until it is only this full
+CACHE_EVICT_RATIO = 0.9
+
+# CRC32, uncompressed and compressed size in front of the compressed data
+_HEADER = struct.Struct("<IQQ")
+_SUFFIX = ".deflate"
+# prefix of files which are still being written
+_TEMP_PREFIX = ".ebooklib-"
+
+
+class CompressionCache:
+    """
+    Base class for caches of compressed members. A cache set with the compression_cache option of
+    :class:`ebooklib.epub.EpubWriter` gets the content of every member which is deflated. If it already has
+    the compressed data for that content and compression level, the writer adds it to the archive as it is,
+    otherwise the content is compressed and given to the cache.
+    """
+
+    # members smaller than this are not looked up in the cache
+    min_size = DEFAULT_CACHE_MIN_SIZE
+
+    @staticmethod
+    def get_key(content: bytes | memoryview, compresslevel: int) -> str:
+        """
+        Returns the key of the content compressed with the compression level.
+
+        :Args:
+          - content: Uncompressed content of the member
+          - compresslevel: Deflate level
+
+        :Returns:
+          Key as string.
+        """
+        return f"{hashlib.sha256(content).hexdigest()}-{compresslevel}"
+
+    def get(self, key: str) -> tuple[bytes, int, int] | None:
+        """
+        Returns the cached member.
+
+        :Args:
+          - key: Key of the member
+
+        :Returns:
+          Tuple of raw deflate stream, CRC32 and uncompressed size, or None if the member is not cached.
+        """
+        return None
+
+    def put(self, key: str, compressed: bytes, crc: int, size: int) -> None:
+        """
+        Called with every member which was compressed because it was not in the cache.
+
+        :Args:
+          - key: Key of the member
+          - compressed: Raw deflate stream
+          - crc: CRC32 of the uncompressed content
+          - size: Uncompressed size
+        """
+
+
+class DiskCompressionCache(CompressionCache):
+    """
+    Keeps compressed members in files in a directory, one file for every content and compression level.
+    When the files together take more than max_size bytes, the least recently used ones are removed.
+
+    Several processes can use the same directory at the same time. Files are written under temporary names
+    and renamed when they are complete, and entries removed by another process are treated as not cached.
+
+    >>> cache = DiskCompressionCache('/var/cache/ebooks', max_size=256 * 1024 * 1024)
+    >>> ebooklib.write_epub('book.epub', book, {'compression_cache': cache})
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        max_size: int = DEFAULT_CACHE_MAX_SIZE,
+        min_size: int = DEFAULT_CACHE_MIN_SIZE,
+    ) -> None:
+        """
+        :Args:
+          - directory: Directory for the cached files, it is created if it does not exist
+          - max_size: Size of all cached files in bytes (optional)
+          - min_size: Members smaller than this are not cached (optional)
+        """
+        self.directory = os.fspath(directory)
+        self.max_size = max_size
+        self.min_size = min_size
+
+        # hits and misses since the cache was created
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._size = sum(size for _, size, _ in self._scan())
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def _scan(self) -> list[tuple[str, int, float]]:
+        entries = []
+
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(_SUFFIX):
+                    continue
+
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+
+        return entries
+
+    def get(self, key: str) -> tuple[bytes, int, int] | None:
+        path = self._get_path(key)
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+
+            # modification time is the time of the last use
+            os.utime(path)
+        except OSError:
+            data = b""
+
+        if len(data) >= _HEADER.size:
+            crc, size, compressed_size = _HEADER.unpack_from(data)
+
+            if len(data) == _HEADER.size + compressed_size:
+                with self._lock:
+                    self.hits += 1
+
+                return data[_HEADER.size :], crc, size
+
+        with self._lock:
+            self.misses += 1
+
+        return None
+
+    def put(self, key: str, compressed: bytes, crc: int, size: int) -> None:
+        path = self._get_path(key)
+
+        fd, temp_name = tempfile.mkstemp(prefix=_TEMP_PREFIX, dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(crc, size, len(compressed)))
+                f.write(compressed)
+
+            with self._lock:
+                # entry can already be there, written by another thread or process
+                try:
+                    replaced = os.stat(path).st_size
+                except OSError:
+                    replaced = 0
+
+                os.replace(temp_name, path)
+                self._size += _HEADER.size + len(compressed) - replaced
+        except OSError:
+            # cache is only an optimisation, writing the book does not fail because of it
+            try:
+                os.remove(temp_name)
+            except OSError:
+                pass
+
+            return
+
+        with self._lock:
+            if self._size > self.max_size:
+                self._evict()
+
+    def _evict(self) -> None:
+        # other processes can add and remove files as well, so the real content of the directory is used
+        entries = sorted(self._scan(), key=lambda entry: entry[2])
+        self._size = sum(size for _, size, _ in entries)
+
+        for path, size, _ in entries:
+            if self._size <= self.max_size * CACHE_EVICT_RATIO:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+
+            self._size -= size
+
+    def clear(self) -> None:
+        """
+        Removes all cached files, together with temporary files left by processes which did not finish writing them.
+        """
+        with self._lock:
+            with os.scandir(self.directory) as it:
+                paths = [
+                    entry.path for entry in it if entry.name.endswith(_SUFFIX) or entry.name.startswith(_TEMP_PREFIX)
+                ]
+
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+            self._size = 0
@@ -70,3 +70,19 @@ COVER_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
 
 
 IMAGE_MEDIA_TYPES: list[str] = ["image/jpeg", "image/jpg", "image/png", "image/svg+xml"]
+
+# Media types which are already compressed, by default they are stored in the archive without compression.
+COMPRESSED_MEDIA_TYPES: list[str] = [
+    "image/jpeg",
+    "image/png",
+    "image/gif",
+    "image/webp",
+    "font/woff",
+    "font/woff2",
+    "application/font-woff",
+    "audio/mpeg",
+    "audio/mp4",
+    "audio/ogg",
+    "video/mp4",
+    "video/webm",
+]
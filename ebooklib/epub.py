@@ -20,14 +20,18 @@ Backwards compatible public API for EbookLib.
 Historically all of EbookLib lived in this module. The implementation has
 been split into smaller modules (:mod:`ebooklib.book`, :mod:`ebooklib.items`,
 :mod:`ebooklib.reader`, :mod:`ebooklib.writer`, :mod:`ebooklib.toc`,
+:mod:`ebooklib.store`, :mod:`ebooklib.cache`, :mod:`ebooklib.aio`, :mod:`ebooklib.tracing`,
 :mod:`ebooklib.consts` and :mod:`ebooklib.exceptions`) but everything is
 still importable from ``ebooklib.epub`` and will remain so until a future
 major release.
 """
 
+from ebooklib.aio import aread_epub, awrite_epub
 from ebooklib.book import EpubBook
+from ebooklib.cache import CompressionCache, DiskCompressionCache
 from ebooklib.consts import (
     CHAPTER_XML,
+    COMPRESSED_MEDIA_TYPES,
     CONTAINER_PATH,
     CONTAINER_XML,
     COVER_XML,
@@ -48,9 +52,11 @@ from ebooklib.items import (
     EpubNcx,
     EpubSMIL,
 )
-from ebooklib.reader import EpubReader, read_epub
+from ebooklib.reader import EpubReader, read_epub, read_epub_metadata, read_many
+from ebooklib.store import ContentStore, TempFileStore
 from ebooklib.toc import Link, Section
-from ebooklib.writer import EpubWriter, write_epub
+from ebooklib.tracing import Span, TimingReport
+from ebooklib.writer import EpubWriter, update_epub, write_epub
 
 __all__ = [
     # consts
@@ -63,6 +69,7 @@ __all__ = [
     "CHAPTER_XML",
     "COVER_XML",
     "IMAGE_MEDIA_TYPES",
+    "COMPRESSED_MEDIA_TYPES",
     # toc
     "Section",
     "Link",
@@ -79,9 +86,24 @@ __all__ = [
     "EpubSMIL",
     # book
     "EpubBook",
+    # content stores
+    "ContentStore",
+    "TempFileStore",
+    # compression caches
+    "CompressionCache",
+    "DiskCompressionCache",
     # writer / reader
     "EpubWriter",
     "write_epub",
+    "update_epub",
     "EpubReader",
     "read_epub",
+    "read_epub_metadata",
+    "read_many",
+    # tracing
+    "Span",
+    "TimingReport",
+    # asyncio
+    "aread_epub",
+    "awrite_epub",
 ]
@@ -23,5 +23,9 @@ class EpubException(Exception):
         self.code = code
         self.msg = msg
 
+    def __reduce__(self):
+        # needed for sending the exception between processes
+        return (self.__class__, (self.code, self.msg))
+
     def __str__(self) -> str:
         return repr(self.msg)
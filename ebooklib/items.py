@@ -16,25 +16,46 @@
 
 """Items which can be part of an EPUB book."""
 
+import io
 import posixpath as zip_path
-from collections.abc import Iterator
-from typing import TYPE_CHECKING, Any, cast
+from collections.abc import Callable, Generator, Iterable, Iterator
+from typing import IO, TYPE_CHECKING, Any, TypeAlias, cast
 
 from lxml import etree
 
 import ebooklib
 from ebooklib.consts import NAMESPACES
-from ebooklib.utils import parse_html_string, parse_string
+from ebooklib.utils import ArchiveMember, find_pages, parse_html_string, parse_string
 
 if TYPE_CHECKING:
     from ebooklib.book import EpubBook
 
+# Callable which returns content of an item as iterable of chunks or as binary file-like object.
+ContentProvider: TypeAlias = Callable[[], Iterable[bytes] | IO[bytes]]
+
 
 class EpubItem:
     """
     Base class for the items in a book.
     """
 
+    # Books can have thousands of items, so the attributes are in slots. __dict__ is kept for attributes
+    # set by applications and plugins, it is only created when such an attribute is set.
+    __slots__ = (
+        "_id",
+        "_file_name",
+        "media_type",
+        "_source",
+        "_provider",
+        "_provider_size",
+        "_content",
+        "is_linear",
+        "manifest",
+        "book",
+        "__dict__",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         uid: str | None = None,
@@ -51,14 +72,46 @@ class EpubItem:
           - content: Content for this item (optional)
           - manifest: Manifest for this item (optional)
         """
+        self.book: EpubBook | None = None
+
         self.id = uid
         self.file_name = file_name
         self.media_type = media_type
-        self.content: str | bytes = content or b""
+        self._source: ArchiveMember | None = None
+        self._provider: ContentProvider | None = None
+        self._provider_size: int | None = None
+        self._content: str | bytes | memoryview | None = content or b""
         self.is_linear = True
         self.manifest = manifest
 
-        self.book: EpubBook | None = None
+    @property
+    def id(self) -> str | None:
+        """
+        Unique identifier of the item.
+        """
+        return self._id
+
+    @id.setter
+    def id(self, value: str | None) -> None:
+        self._id = value
+
+        # lookups of the book are indexed by id and file name
+        if self.book is not None:
+            self.book._invalidate_index()
+
+    @property
+    def file_name(self) -> str:
+        """
+        File name of the item.
+        """
+        return self._file_name
+
+    @file_name.setter
+    def file_name(self, value: str) -> None:
+        self._file_name = value
+
+        if self.book is not None:
+            self.book._invalidate_index()
 
     def get_id(self) -> str | None:
         """
@@ -109,6 +162,170 @@ class EpubItem:
 
         return ebooklib.ITEM_UNKNOWN
 
+    @property
+    def content(self) -> str | bytes:
+        """
+        Content of the item. If the item was loaded lazily, content is read from the archive on first access.
+        Content read with the zero_copy option is copied into bytes every time it is accessed, see
+        :meth:`get_buffer`.
+        """
+        if self._content is None:
+            if self._provider is not None:
+                # provided content is not kept in memory
+                return b"".join(self.iter_content())
+
+            self._content = self._source.read() if self._source is not None else b""
+
+        if isinstance(self._content, memoryview):
+            return bytes(self._content)
+
+        return self._content
+
+    @content.setter
+    def content(self, value: str | bytes) -> None:
+        self._content = value
+        self._source = None
+        self._provider = None
+
+        if self.book is not None and self.book.content_store is not None:
+            self.book.content_store.put(self)
+
+    def set_content_view(self, view: memoryview) -> None:
+        """
+        Sets content of the item to a read-only view, usually over a memory map of the file the item was
+        read from. The view is written to the archive without copying it.
+
+        :Args:
+          - view: Content of the item
+        """
+        self._content = view
+        self._source = None
+        self._provider = None
+
+    def get_buffer(self) -> str | bytes | memoryview:
+        """
+        Returns content of the item without copying it. Items read with the zero_copy option return
+        read-only memoryview over a memory map of the file, the other items the same as :meth:`get_content`.
+
+        :Returns:
+          Returns content of the item.
+        """
+        if self._content is None and self._provider is None and self._source is not None:
+            self._content = self._source.read()
+
+        if isinstance(self._content, memoryview) and type(self).get_content is EpubItem.get_content:
+            return self._content
+
+        return self.get_content()
+
+    def set_lazy_content(self, source: ArchiveMember) -> None:
+        """
+        Defers reading of the content until it is accessed for the first time. The archive
+        the source belongs to must stay open until then.
+
+        :Args:
+          - source: Reference to the file in the opened archive
+        """
+        self._source = source
+        self._content = None
+
+    def set_content_provider(self, provider: ContentProvider, size: int | None = None) -> None:
+        """
+        Content of the item will be read from the provider every time it is needed. When writing the book
+        content is copied to the archive in chunks, so it never has to be in memory as a whole.
+
+        >>> item.set_content_provider(lambda: open('audio/chapter1.mp3', 'rb'))
+
+        :Args:
+          - provider: Callable which returns content as iterable of bytes or as binary file-like object
+          - size: Size of the content in bytes, if known (optional)
+        """
+        self._provider = provider
+        self._provider_size = size
+        self._content = None
+        self._source = None
+
+    def has_content_provider(self) -> bool:
+        """
+        Returns if content of this item comes from a content provider.
+        """
+        return self._provider is not None
+
+    def get_provided_size(self) -> int | None:
+        """
+        Returns size of the content given when setting the content provider, or None if it is not known.
+        """
+        return self._provider_size
+
+    def iter_content(self, chunk_size: int = 64 * 1024) -> Generator[bytes, None, None]:
+        """
+        Returns content of the item in chunks.
+
+        :Args:
+          - chunk_size: Size of the chunks read from file-like objects (optional)
+
+        :Returns:
+          Iterator over chunks of content.
+        """
+        if self._provider is None:
+            content = self.get_content()
+            yield content.encode("utf-8") if isinstance(content, str) else content
+            return
+
+        data = self._provider()
+
+        if hasattr(data, "read"):
+            stream = cast("IO[bytes]", data)
+            try:
+                while chunk := stream.read(chunk_size):
+                    yield chunk
+            finally:
+                stream.close()
+        else:
+            yield from cast("Iterable[bytes]", data)
+
+    def open_content(self) -> IO[bytes]:
+        """
+        Returns content of the item as binary stream. Content of lazily loaded items which was not changed
+        is read from the archive as the stream is read, content from providers which return file-like
+        objects is read from them, other content is already in memory.
+
+        :Returns:
+          Binary file-like object.
+        """
+        if self._source is not None:
+            return self._source.open()
+
+        if self._provider is not None:
+            data = self._provider()
+
+            if hasattr(data, "read"):
+                return cast("IO[bytes]", data)
+
+            return io.BytesIO(b"".join(cast("Iterable[bytes]", data)))
+
+        content = self.get_content()
+        return io.BytesIO(content.encode("utf-8") if isinstance(content, str) else content)
+
+    def get_source(self) -> ArchiveMember | None:
+        """
+        Returns reference to the file in the archive this item was lazily loaded from. Reference is
+        dropped when content of the item is changed, so it always points to the unmodified content.
+
+        :Returns:
+          Returns reference to the file in the archive or None.
+        """
+        return self._source
+
+    def is_loaded(self) -> bool:
+        """
+        Returns if content of this item is already in memory.
+
+        :Returns:
+          Returns False for lazily loaded items whose content was not accessed yet.
+        """
+        return self._content is not None
+
     def get_content(self, default: str | bytes | None = None) -> str | bytes:
         """
         Returns content of the item. Content is usually of type 'bytes' but
@@ -140,6 +357,8 @@ class EpubItem:
 class EpubNcx(EpubItem):
     """Represents Navigation Control File (NCX) in the EPUB."""
 
+    __slots__ = ()
+
     def __init__(self, uid: str | None = "ncx", file_name: str = "toc.ncx") -> None:
         super().__init__(uid=uid, file_name=file_name, media_type="application/x-dtbncx+xml")
 
@@ -152,6 +371,8 @@ class EpubCover(EpubItem):
     Represents Cover image in the EPUB file.
     """
 
+    __slots__ = ()
+
     def __init__(self, uid: str | None = "cover-img", file_name: str = "") -> None:
         super().__init__(uid=uid, file_name=file_name)
 
@@ -167,6 +388,20 @@ class EpubHtml(EpubItem):
     Represents HTML document in the EPUB file.
     """
 
+    __slots__ = (
+        "title",
+        "lang",
+        "direction",
+        "media_overlay",
+        "media_duration",
+        "_metas",
+        "_links",
+        "_properties",
+        "_pages",
+        "_html_tree",
+        "_page_breaks",
+    )
+
     _template_name = "chapter"
 
     def __init__(
@@ -190,10 +425,135 @@ class EpubHtml(EpubItem):
         self.media_overlay = media_overlay
         self.media_duration = media_duration
 
-        self.metas: list[dict[str, Any]] = []
-        self.links: list[dict[str, Any]] = []
-        self.properties: list[str] = []
-        self.pages: list[Any] = []
+        # lists are created when they are used for the first time, most of them stay empty
+        self._metas: list[dict[str, Any]] | None = None
+        self._links: list[dict[str, Any]] | None = None
+        self._properties: list[str] | None = None
+        self._pages: list[Any] | None = None
+
+        # parsed content shared by plugins and the writer, see get_html_tree()
+        self._html_tree: Any = None
+        # page breaks found in the content, kept together with the content they were found in
+        self._page_breaks: tuple[str | bytes | memoryview, list[tuple[str, str]]] | None = None
+
+    @property
+    def metas(self) -> list[dict[str, Any]]:
+        """Additional <meta> elements of the document, see add_meta()."""
+        if self._metas is None:
+            self._metas = []
+        return self._metas
+
+    @metas.setter
+    def metas(self, value: list[dict[str, Any]]) -> None:
+        self._metas = value
+
+    @property
+    def links(self) -> list[dict[str, Any]]:
+        """Additional links of the document, see add_link()."""
+        if self._links is None:
+            self._links = []
+        return self._links
+
+    @links.setter
+    def links(self, value: list[dict[str, Any]]) -> None:
+        self._links = value
+
+    @property
+    def properties(self) -> list[str]:
+        """Manifest properties of the document."""
+        if self._properties is None:
+            self._properties = []
+        return self._properties
+
+    @properties.setter
+    def properties(self, value: list[str]) -> None:
+        self._properties = value
+
+    @property
+    def pages(self) -> list[Any]:
+        """Pages of the page list which point to this document."""
+        if self._pages is None:
+            self._pages = []
+        return self._pages
+
+    @pages.setter
+    def pages(self, value: list[Any]) -> None:
+        self._pages = value
+
+    @property
+    def content(self) -> str | bytes:
+        """
+        Content of the document. If the parsed document was requested with get_html_tree(), content is
+        serialized from it, so all changes made to the tree are included.
+        """
+        if self._html_tree is not None:
+            return etree.tostring(self._html_tree, pretty_print=True, encoding="utf-8")
+
+        return super().content
+
+    @content.setter
+    def content(self, value: str | bytes) -> None:
+        self._html_tree = None
+        EpubItem.content.fset(self, value)
+
+    def get_html_tree(self) -> Any:
+        """
+        Returns the parsed content of this document as lxml HTML element. Document is parsed only once and
+        the same tree is returned until the content is set again. Changes made to the tree are used when
+        the book is written, so plugins can modify it in place instead of parsing and serializing
+        the content every time.
+
+        :Returns:
+          Returns root element of the parsed document.
+        """
+        if self._html_tree is None:
+            self._html_tree = parse_html_string(self.content)
+            # tree can be changed in place, so content can not be copied from the original archive anymore
+            self._source = None
+
+        return self._html_tree
+
+    def _get_parsed_content(self) -> Any:
+        # use already parsed tree if there is one, but do not keep a new one
+        if self._html_tree is not None:
+            return self._html_tree
+
+        return parse_html_string(self.content)
+
+    def get_pages(self) -> list[tuple[str, str, str]]:
+        """
+        Returns page breaks in this document, elements with epub:type and id attributes, which are used for
+        the page list of the navigation document. Page breaks are found when the document is parsed for
+        writing and kept until the content changes, so the document is not parsed again for the page list.
+
+        :Returns:
+          Returns list of (file name, id, label) tuples.
+        """
+        try:
+            pages = self._find_pages()
+        except (etree.ParserError, etree.XMLSyntaxError):
+            return []
+
+        return [(self.get_name(), page_id, label) for page_id, label in pages]
+
+    def _find_pages(self, html_tree: Any = None) -> list[tuple[str, str]]:
+        # tree can be changed in place, it is cheap to look at it every time
+        if self._html_tree is not None:
+            return find_pages(self._html_tree)
+
+        if self._page_breaks is not None and self._page_breaks[0] is self._content:
+            return self._page_breaks[1]
+
+        if html_tree is None:
+            html_tree = parse_html_string(self.content)
+
+        pages = find_pages(html_tree)
+
+        # provided content is not kept in memory, so there is nothing to compare with later
+        if self._content is not None:
+            self._page_breaks = (self._content, pages)
+
+        return pages
 
     def is_chapter(self) -> bool:
         """
@@ -246,7 +606,7 @@ class EpubHtml(EpubItem):
         :Returns:
           As tuple return list of metas.
         """
-        return (meta for meta in self.metas)
+        return (meta for meta in self._metas or ())
 
     def add_link(self, **kwgs: Any) -> None:
         """
@@ -266,7 +626,7 @@ class EpubHtml(EpubItem):
         :Returns:
           As tuple return list of links.
         """
-        return (link for link in self.links)
+        return (link for link in self._links or ())
 
     def get_links_of_type(self, link_type: str) -> Iterator[dict[str, Any]]:
         """
@@ -275,7 +635,7 @@ class EpubHtml(EpubItem):
         :Returns:
           As tuple returns list of links.
         """
-        return (link for link in self.links if link.get("type", "") == link_type)
+        return (link for link in self._links or () if link.get("type", "") == link_type)
 
     def add_item(self, item: EpubItem) -> None:
         """
@@ -299,8 +659,8 @@ class EpubHtml(EpubItem):
         """
 
         try:
-            html_tree = parse_html_string(self.content)
-        except Exception:
+            html_tree = self._get_parsed_content()
+        except (etree.ParserError, etree.XMLSyntaxError):
             return b""
 
         body = html_tree.find("body")
@@ -333,11 +693,10 @@ class EpubHtml(EpubItem):
         if book is None:
             raise ValueError("EpubHtml item is not attached to a book. Call book.add_item() first.")
 
-        template = book.get_template(self._template_name)
-        if template is None:
+        tree = book.get_template_tree(self._template_name)
+        if tree is None:
             raise ValueError(f"Book does not define template {self._template_name!r}.")
 
-        tree = parse_string(template)
         tree_root = tree.getroot()
 
         tree_root.set("lang", self.lang or book.language)
@@ -347,24 +706,28 @@ class EpubHtml(EpubItem):
         #  <meta charset="utf-8" />
 
         try:
-            html_tree = parse_html_string(self.content)
-        except Exception:
+            html_tree = self._get_parsed_content()
+        except (etree.ParserError, etree.XMLSyntaxError):
             return b""
 
+        if html_tree is not self._html_tree:
+            # remember page breaks while the content is parsed anyway
+            self._find_pages(html_tree)
+
         _html_root = html_tree.getroottree()
 
         # create and populate head
 
         _head = etree.SubElement(tree_root, "head")
 
-        for meta in self.metas:
+        for meta in self._metas or ():
             _meta = etree.SubElement(_head, "meta", meta)
 
         if self.title != "":
             _title = etree.SubElement(_head, "title")
             _title.text = self.title
 
-        for lnk in self.links:
+        for lnk in self._links or ():
             if lnk.get("type") == "text/javascript":
                 _lnk = etree.SubElement(_head, "script", lnk)
                 # force <script></script>
@@ -380,11 +743,15 @@ class EpubHtml(EpubItem):
             tree_root.set("dir", self.direction)
 
         body = html_tree.find("body")
-        if body is not None:
-            for i in list(body):
-                _body.append(i)
+        children = list(body) if body is not None else []
 
-        tree_str = etree.tostring(tree, pretty_print=True, encoding="utf-8", xml_declaration=True)
+        # elements are moved to the new document, so they have to be moved back when the tree is kept
+        _body.extend(children)
+        try:
+            tree_str = etree.tostring(tree, pretty_print=True, encoding="utf-8", xml_declaration=True)
+        finally:
+            if body is not None and html_tree is self._html_tree:
+                body.extend(children)
 
         return tree_str
 
@@ -397,6 +764,8 @@ class EpubCoverHtml(EpubHtml):
     Represents Cover page in the EPUB file.
     """
 
+    __slots__ = ("image_name",)
+
     def __init__(
         self, uid: str = "cover", file_name: str = "cover.xhtml", image_name: str = "", title: str = "Cover"
     ) -> None:
@@ -450,6 +819,8 @@ class EpubNav(EpubHtml):
     Represents Navigation Document in the EPUB file.
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         uid: str | None = "nav",
@@ -479,6 +850,8 @@ class EpubImage(EpubItem):
     Represents Image in the EPUB file.
     """
 
+    __slots__ = ()
+
     def get_type(self) -> int:
         return ebooklib.ITEM_IMAGE
 
@@ -487,6 +860,8 @@ class EpubImage(EpubItem):
 
 
 class EpubSMIL(EpubItem):
+    __slots__ = ()
+
     def __init__(self, uid: str | None = None, file_name: str = "", content: str | bytes | None = None) -> None:
         super().__init__(uid=uid, file_name=file_name, media_type="application/smil+xml", content=content)
 
@@ -17,7 +17,6 @@
 from typing import cast
 
 from ebooklib.plugins.base import BasePlugin
-from ebooklib.utils import parse_html_string
 
 
 class BooktypeLinks(BasePlugin):
@@ -32,7 +31,7 @@ class BooktypeLinks(BasePlugin):
         from lxml import etree
 
         try:
-            tree = parse_html_string(chapter.content)
+            tree = chapter.get_html_tree()
         except Exception:
             return
 
@@ -68,8 +67,6 @@ class BooktypeLinks(BasePlugin):
                         _link.set("id", _name)
                         etree.strip_attributes(_link, "name")
 
-        chapter.content = etree.tostring(tree, pretty_print=True, encoding="utf-8")
-
 
 class BooktypeFootnotes(BasePlugin):
     NAME = "Booktype Footnotes"
@@ -83,7 +80,7 @@ class BooktypeFootnotes(BasePlugin):
         from ebooklib import epub
 
         try:
-            tree = parse_html_string(chapter.content)
+            tree = chapter.get_html_tree()
         except Exception:
             return
 
@@ -119,5 +116,3 @@ class BooktypeFootnotes(BasePlugin):
             old_footnote = cast("list[etree._Element]", body.xpath('//ol[@id="InsertNote_NoteList"]'))
             if len(old_footnote) > 0:
                 body.remove(old_footnote[0])
-
-        chapter.content = etree.tostring(tree, pretty_print=True, encoding="utf-8")
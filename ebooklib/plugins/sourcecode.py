@@ -14,59 +14,172 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with EbookLib.  If not, see <http://www.gnu.org/licenses/>.
 
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
 from typing import cast
 
 from ebooklib.plugins.base import BasePlugin
-from ebooklib.utils import parse_html_string
 
+# css class of the <pre> element and the name of the Pygments lexer used for it
+LANGUAGES = {"source-python": "python", "source-css": "css"}
 
-class SourceHighlighter(BasePlugin):
-    def __init__(self):
-        pass
 
-    def html_before_write(self, book, chapter):
-        from lxml import etree, html
-        from pygments import highlight
-        from pygments.formatters import HtmlFormatter
+@cache
+def _get_lexer(language):
+    from pygments.lexers import CssLexer, PythonLexer
 
-        try:
-            tree = parse_html_string(chapter.content)
-        except Exception:
-            return
+    lexers = {"python": PythonLexer, "css": CssLexer}
 
-        had_source = False
+    return lexers[language]()
+
+
+def _create_formatter(options=()):
+    from pygments.formatters import HtmlFormatter
+
+    return HtmlFormatter(**dict(options))
+
+
+_get_cached_formatter = cache(_create_formatter)
+
+
+def _get_formatter(options=()):
+    try:
+        hash(options)
+    except TypeError:
+        # options with lists or dictionaries as values (hl_lines=[1, 2]) can not be cached
+        return _create_formatter(options)
+
+    return _get_cached_formatter(options)
+
+
+def highlight_source(language, source_text, formatter_options=()):
+    """
+    Returns highlighted source as HTML. Lexers and formatters are created only once per process.
+
+    :Args:
+      - language: Name of the language, one of the values in LANGUAGES
+      - source_text: Source code
+      - formatter_options: Options for the HtmlFormatter as tuple of (name, value) pairs (optional)
+
+    :Returns:
+      Returns HTML string.
+    """
+    from pygments import highlight
+
+    return highlight(source_text, _get_lexer(language), _get_formatter(formatter_options))
+
+
+def _find_sources(tree):
+    from lxml import etree, html
+
+    sources = []
+
+    body = tree.find("body")
+    if body is not None and len(body) != 0:
+        # check for embeded source
+        for source in cast("list[etree._Element]", body.xpath('//pre[contains(@class,"source-")]')):
+            css_class = source.get("class") or ""
+
+            # when there is more than one, the last language wins
+            language = None
+            for class_name, name in LANGUAGES.items():
+                if class_name in css_class:
+                    language = name
+
+            if language is None:
+                # unknown source language; leave the element untouched
+                continue
 
-        body = tree.find("body")
-        if body is not None and len(body) != 0:
-            # check for embeded source
-            for source in cast("list[etree._Element]", body.xpath('//pre[contains(@class,"source-")]')):
-                css_class = source.get("class") or ""
+            source_text = (source.text or "") + "".join(
+                [html.tostring(child, encoding="unicode") for child in source.iterchildren()]
+            )
 
-                source_text = (source.text or "") + "".join([html.tostring(child) for child in source.iterchildren()])
+            sources.append((source, language, source_text))
 
-                _text = None
+    return sources
 
-                if "source-python" in css_class:
-                    from pygments.lexers import PythonLexer
 
-                    #                    _text =  highlight(source_text, PythonLexer(), HtmlFormatter(linenos="inline"))
-                    _text = highlight(source_text, PythonLexer(), HtmlFormatter())
+class SourceHighlighter(BasePlugin):
+    """
+    Highlights source code in <pre> elements with class source-python or source-css using Pygments.
+
+    Options for the Pygments HtmlFormatter can be given with formatter_options.
 
-                if "source-css" in css_class:
-                    from pygments.lexers import CssLexer
+    With more than one worker, code of all chapters is highlighted at once in before_write, using a pool
+    of that many processes. The result is the same as when chapters are highlighted one at a time.
+    """
 
-                    _text = highlight(source_text, CssLexer(), HtmlFormatter())
+    def __init__(self, workers=1, formatter_options=None):
+        self.workers = workers
+        self.formatter_options = tuple(sorted((formatter_options or {}).items()))
 
-                if _text is None:
-                    # unknown source language; leave the element untouched
-                    continue
+        # chapters already highlighted in before_write
+        self._highlighted = set()
 
-                _parent = source.getparent()
-                if _parent is not None:
-                    _parent.replace(source, etree.XML(_text))
+    def _replace_sources(self, chapter, sources, results):
+        from lxml import etree
+
+        had_source = False
 
-                    had_source = True
+        for (source, _, _), _text in zip(sources, results, strict=True):
+            _parent = source.getparent()
+            if _parent is not None:
+                _parent.replace(source, etree.XML(_text))
+
+                had_source = True
 
         if had_source:
             chapter.add_link(href="style/code.css", rel="stylesheet", type="text/css")
-            chapter.content = etree.tostring(tree, pretty_print=True, encoding="utf-8")
+
+    def before_write(self, book):
+        from ebooklib.items import EpubHtml
+
+        if self.workers <= 1:
+            return True
+
+        chapters = []
+
+        for item in book.get_items():
+            if not isinstance(item, EpubHtml):
+                continue
+
+            try:
+                tree = item.get_html_tree()
+            except Exception:
+                continue
+
+            sources = _find_sources(tree)
+            if sources:
+                chapters.append((item, sources))
+
+        jobs = [(language, text) for _, sources in chapters for _, language, text in sources]
+        if not jobs:
+            return True
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            chunksize = max(1, len(jobs) // (self.workers * 4))
+            languages, texts = zip(*jobs, strict=True)
+            options = [self.formatter_options] * len(jobs)
+            results = iter(executor.map(highlight_source, languages, texts, options, chunksize=chunksize))
+
+            for chapter, sources in chapters:
+                self._replace_sources(chapter, sources, [next(results) for _ in sources])
+                self._highlighted.add(chapter)
+
+        return True
+
+    def html_before_write(self, book, chapter):
+        if chapter in self._highlighted:
+            self._highlighted.discard(chapter)
+            return
+
+        try:
+            tree = chapter.get_html_tree()
+        except Exception:
+            return
+
+        sources = _find_sources(tree)
+
+        results = [highlight_source(language, text, self.formatter_options) for _, language, text in sources]
+
+        self._replace_sources(chapter, sources, results)
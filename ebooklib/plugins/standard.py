@@ -15,7 +15,6 @@
 # along with EbookLib.  If not, see <http://www.gnu.org/licenses/>.
 
 from ebooklib.plugins.base import BasePlugin
-from ebooklib.utils import parse_html_string
 
 # TODO:
 #   - should also look for the _required_ elements
@@ -65,10 +64,155 @@ DEPRECATED_TAGS = [
 ]
 
 
+# Allowed attributes, on top of the global ones, for elements in <head>
+ATTRIBUTES_HEAD = {
+    "base": ["href", "target"],
+    "link": ["href", "crossorigin", "rel", "media", "hreflang", "type", "sizes"],
+    "script": ["src", "type", "charset", "async", "defer", "crossorigin"],
+    "source": ["src", "type", "media"],
+    "style": ["media", "type", "scoped"],
+}
+
+# Allowed attributes, on top of the global ones, for elements in <body>. None means attributes are not checked.
+ATTRIBUTES_BODY = {
+    "a": ["href", "target", "download", "rel", "hreflang", "type"],
+    "area": ["alt", "coords", "shape", "href", "target", "download", "rel", "hreflang", "type"],
+    "audio": ["src", "crossorigin", "preload", "autoplay", "mediagroup", "loop", "muted", "controls"],
+    "blockquote": ["cite"],
+    "button": [
+        "autofocus",
+        "disabled",
+        "form",
+        "formaction",
+        "formenctype",
+        "formmethod",
+        "formnovalidate",
+        "formtarget",
+        "name",
+        "type",
+        "value",
+        "menu",
+    ],
+    "canvas": ["width", "height"],
+    "col": ["span"],
+    "colgroup": ["span"],
+    "del": ["cite", "datetime"],
+    "details": ["open"],
+    # http://html5doctor.com/the-dl-element/
+    # should be checked really, some of the elements can be missing
+    # dl
+    #   dt
+    #   dd
+    #   dt
+    #   dd
+    "dl": None,
+    "embed": ["src", "type", "width", "height"],
+    "fieldset": ["disable", "form", "name"],
+    "form": ["accept-charset", "action", "autocomplete", "enctype", "method", "name", "novalidate", "target"],
+    "iframe": ["src", "srcdoc", "name", "sandbox", "seamless", "allowfullscreen", "width", "height"],
+    "img": ["alt", "src", "crossorigin", "usemap", "ismap", "width", "height"],
+    "input": [
+        "accept",
+        "alt",
+        "autocomplete",
+        "autofocus",
+        "checked",
+        "dirname",
+        "disabled",
+        "form",
+        "formaction",
+        "formenctype",
+        "formmethod",
+        "formnovalidate",
+        "formtarget",
+        "height",
+        "inputmode",
+        "list",
+        "max",
+        "maxlength",
+        "min",
+        "multiple",
+        "name",
+        "pattern",
+        "placeholder",
+        "readonly",
+        "required",
+        "size",
+        "src",
+        "steptype",
+        "value",
+        "width",
+    ],
+    "ins": ["cite", "datetime"],
+    "keygen": ["autofocus", "challenge", "disabled", "form", "keytype", "name"],
+    "label": ["form", "for"],
+    "map": ["name"],
+    "menu": ["type", "label"],
+    "object": ["data", "type", "typemustmatch", "name", "usemap", "form", "width", "height"],
+    "ol": ["reversed", "start", "type"],
+    "optgroup": ["disabled", "label"],
+    "option": ["disabled", "label", "selected", "value"],
+    "output": ["for", "form", "name"],
+    "param": ["name", "value"],
+    "progress": ["value", "max"],
+    "q": ["cite"],
+    "select": ["autofocus", "disabled", "form", "multiple", "name", "required", "size"],
+    # svg attributes are handled separately
+    "svg": None,
+    "table": ["border", "sortable"],
+    "td": ["colspan", "rowspan", "headers"],
+    "textarea": [
+        "autocomplete",
+        "autofocus",
+        "cols",
+        "dirname",
+        "disabled",
+        "form",
+        "inputmode",
+        "maxlength",
+        "name",
+        "placeholder",
+        "readonly",
+        "required",
+        "rows",
+        "wrap",
+    ],
+    "th": ["colspan", "rowspan", "headers", "scope", "abbr", "sorted"],
+    "time": ["datetime"],
+    "track": ["kind", "src", "srclang", "label", "default"],
+    "video": [
+        "src",
+        "crossorigin",
+        "poster",
+        "preload",
+        "autoplay",
+        "mediagroup",
+        "loop",
+        "muted",
+        "controls",
+        "width",
+        "height",
+    ],
+}
+
+
+def _make_whitelists(attributes):
+    return {
+        tag: None if extra is None else frozenset(ATTRIBUTES_GLOBAL).union(extra) for tag, extra in attributes.items()
+    }
+
+
+_GLOBAL_WHITELIST = frozenset(ATTRIBUTES_GLOBAL)
+_HEAD_WHITELISTS = _make_whitelists(ATTRIBUTES_HEAD)
+_BODY_WHITELISTS = _make_whitelists(ATTRIBUTES_BODY)
+
+
 def leave_only(item, tag_list):
-    for _attr in list(item.attrib.keys()):
+    attrib = item.attrib
+
+    for _attr in attrib.keys():
         if _attr not in tag_list:
-            del item.attrib[_attr]
+            del attrib[_attr]
 
 
 class SyntaxPlugin(BasePlugin):
@@ -78,46 +222,27 @@ class SyntaxPlugin(BasePlugin):
         from lxml import etree
 
         try:
-            tree = parse_html_string(chapter.content)
+            tree = chapter.get_html_tree()
         except Exception:
             return
 
-        root = tree.getroottree()
-
         # delete deprecated tags
         # i should really have a list of allowed tags
-        for tag in DEPRECATED_TAGS:
-            etree.strip_tags(root, tag)
+        etree.strip_tags(tree.getroottree(), *DEPRECATED_TAGS)
 
         head = tree.find("head")
 
         if head is not None and len(head) != 0:
             for _item in head:
                 match _item.tag:
-                    case "base":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["href", "target"])
-                    case "link":
-                        leave_only(
-                            _item,
-                            ATTRIBUTES_GLOBAL + ["href", "crossorigin", "rel", "media", "hreflang", "type", "sizes"],
-                        )
                     case "title":
                         if _item.text == "":
                             head.remove(_item)
                     case "meta":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["name", "http-equiv", "content", "charset"])
                         # just remove for now, but really should not be like this
                         head.remove(_item)
-                    case "script":
-                        leave_only(
-                            _item, ATTRIBUTES_GLOBAL + ["src", "type", "charset", "async", "defer", "crossorigin"]
-                        )
-                    case "source":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["src", "type", "media"])
-                    case "style":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["media", "type", "scoped"])
-                    case _:
-                        leave_only(_item, ATTRIBUTES_GLOBAL)
+                    case tag:
+                        leave_only(_item, _HEAD_WHITELISTS.get(tag, _GLOBAL_WHITELIST))
 
         body = tree.find("body")
 
@@ -125,242 +250,22 @@ class SyntaxPlugin(BasePlugin):
             for _item in body.iter():
                 # it is not
                 # <a class="indexterm" href="ch05.html#ix_epub:trigger_element">
+                tag = _item.tag
 
-                match _item.tag:
-                    case "a":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["href", "target", "download", "rel", "hreflang", "type"])
-                    case "area":
-                        leave_only(
-                            _item,
-                            ATTRIBUTES_GLOBAL
-                            + ["alt", "coords", "shape", "href", "target", "download", "rel", "hreflang", "type"],
-                        )
-                    case "audio":
-                        leave_only(
-                            _item,
-                            ATTRIBUTES_GLOBAL
-                            + ["src", "crossorigin", "preload", "autoplay", "mediagroup", "loop", "muted", "controls"],
-                        )
-                    case "blockquote":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["cite"])
-                    case "button":
-                        leave_only(
-                            _item,
-                            ATTRIBUTES_GLOBAL
-                            + [
-                                "autofocus",
-                                "disabled",
-                                "form",
-                                "formaction",
-                                "formenctype",
-                                "formmethod",
-                                "formnovalidate",
-                                "formtarget",
-                                "name",
-                                "type",
-                                "value",
-                                "menu",
-                            ],
-                        )
-                    case "canvas":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["width", "height"])
-                    case "del":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["cite", "datetime"])
-                    case "details":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["open"])
-                    case "embed":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["src", "type", "width", "height"])
-                    case "fieldset":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["disable", "form", "name"])
-                    case "form":
-                        leave_only(
-                            _item,
-                            ATTRIBUTES_GLOBAL
-                            + [
-                                "accept-charset",
-                                "action",
-                                "autocomplete",
-                                "enctype",
-                                "method",
-                                "name",
-                                "novalidate",
-                                "target",
-                            ],
-                        )
-                    case "iframe":
-                        leave_only(
-                            _item,
-                            ATTRIBUTES_GLOBAL
-                            + ["src", "srcdoc", "name", "sandbox", "seamless", "allowfullscreen", "width", "height"],
-                        )
+                match tag:
                     case "img":
-                        _src = _item.get("src", "").lower()
-                        if _src.startswith(("http://", "https://")):
-                            if "remote-resources" not in chapter.properties:
-                                chapter.properties.append("remote-resources")
-                                # THIS DOES NOT WORK, ONLY VIDEO AND AUDIO FILES CAN BE REMOTE RESOURCES
-                                # THAT MEANS I SHOULD ALSO CATCH <SOURCE TAG
-                                from ebooklib import epub
-
-                                _img = epub.EpubImage(file_name=_item.get("src") or "")
-                                book.add_item(_img)
-                        leave_only(
-                            _item,
-                            ATTRIBUTES_GLOBAL + ["alt", "src", "crossorigin", "usemap", "ismap", "width", "height"],
-                        )
-                    case "input":
-                        leave_only(
-                            _item,
-                            ATTRIBUTES_GLOBAL
-                            + [
-                                "accept",
-                                "alt",
-                                "autocomplete",
-                                "autofocus",
-                                "checked",
-                                "dirname",
-                                "disabled",
-                                "form",
-                                "formaction",
-                                "formenctype",
-                                "formmethod",
-                                "formnovalidate",
-                                "formtarget",
-                                "height",
-                                "inputmode",
-                                "list",
-                                "max",
-                                "maxlength",
-                                "min",
-                                "multiple",
-                                "name",
-                                "pattern",
-                                "placeholder",
-                                "readonly",
-                                "required",
-                                "size",
-                                "src",
-                                "steptype",
-                                "value",
-                                "width",
-                            ],
-                        )
-                    case "ins":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["cite", "datetime"])
-                    case "keygen":
-                        leave_only(
-                            _item, ATTRIBUTES_GLOBAL + ["autofocus", "challenge", "disabled", "form", "keytype", "name"]
-                        )
-                    case "label":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["form", "for"])
-                    case "map":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["name"])
-                    case "menu":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["type", "label"])
-                    case "object":
-                        leave_only(
-                            _item,
-                            ATTRIBUTES_GLOBAL
-                            + ["data", "type", "typemustmatch", "name", "usemap", "form", "width", "height"],
-                        )
-                    case "ol":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["reversed", "start", "type"])
-                    case "optgroup":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["disabled", "label"])
-                    case "option":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["disabled", "label", "selected", "value"])
-                    case "output":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["for", "form", "name"])
-                    case "param":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["name", "value"])
-                    case "progress":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["value", "max"])
-                    case "q":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["cite"])
-                    case "select":
-                        leave_only(
-                            _item,
-                            ATTRIBUTES_GLOBAL
-                            + ["autofocus", "disabled", "form", "multiple", "name", "required", "size"],
-                        )
+                        self._check_image(book, chapter, _item)
                     case "table":
-                        if _item.get("border", None):
-                            if _item.get("border") == "0":
-                                _item.set("border", "")
+                        if _item.get("border") == "0":
+                            _item.set("border", "")
 
                         if _item.get("summary", None):
+                            # add it as caption
                             _caption = etree.Element("caption", {})
                             _caption.text = _item.get("summary")
                             _item.insert(0, _caption)
 
-                            # add it as caption
                             del _item.attrib["summary"]
-
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["border", "sortable"])
-                    case "dl":
-                        _d = _item.find("dd")
-                        if _d is not None and len(_d) == 0:
-                            pass
-
-                            # http://html5doctor.com/the-dl-element/
-                            # should be like this really
-                            # some of the elements can be missing
-                            # dl
-                            #   dt
-                            #   dd
-                            #   dt
-                            #   dd
-                    case "td":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["colspan", "rowspan", "headers"])
-                    case "textarea":
-                        leave_only(
-                            _item,
-                            ATTRIBUTES_GLOBAL
-                            + [
-                                "autocomplete",
-                                "autofocus",
-                                "cols",
-                                "dirname",
-                                "disabled",
-                                "form",
-                                "inputmode",
-                                "maxlength",
-                                "name",
-                                "placeholder",
-                                "readonly",
-                                "required",
-                                "rows",
-                                "wrap",
-                            ],
-                        )
-                    case "col" | "colgroup":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["span"])
-                    case "th":
-                        leave_only(
-                            _item, ATTRIBUTES_GLOBAL + ["colspan", "rowspan", "headers", "scope", "abbr", "sorted"]
-                        )
-                    case "time":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["datetime"])
-                    case "track":
-                        leave_only(_item, ATTRIBUTES_GLOBAL + ["kind", "src", "srclang", "label", "default"])
-                    case "video":
-                        leave_only(
-                            _item,
-                            ATTRIBUTES_GLOBAL
-                            + [
-                                "src",
-                                "crossorigin",
-                                "poster",
-                                "preload",
-                                "autoplay",
-                                "mediagroup",
-                                "loop",
-                                "muted",
-                                "controls",
-                                "width",
-                                "height",
-                            ],
-                        )
                     case "svg":
                         # We need to add property "svg" in case we have embeded svg file
                         if "svg" not in chapter.properties:
@@ -371,11 +276,21 @@ class SyntaxPlugin(BasePlugin):
 
                         if _item.get("preserveaspectratio", None):
                             del _item.attrib["preserveaspectratio"]
-                    case _:
-                        for _attr in list(_item.attrib.keys()):
-                            if _attr not in ATTRIBUTES_GLOBAL:
-                                del _item.attrib[_attr]
 
-        chapter.content = etree.tostring(tree, pretty_print=True, encoding="utf-8", xml_declaration=True)
+                whitelist = _BODY_WHITELISTS.get(tag, _GLOBAL_WHITELIST)
+
+                if whitelist is not None and len(_item.attrib) != 0:
+                    leave_only(_item, whitelist)
+
+    def _check_image(self, book, chapter, image):
+        _src = image.get("src", "").lower()
+
+        if _src.startswith(("http://", "https://")):
+            if "remote-resources" not in chapter.properties:
+                chapter.properties.append("remote-resources")
+                # THIS DOES NOT WORK, ONLY VIDEO AND AUDIO FILES CAN BE REMOTE RESOURCES
+                # THAT MEANS I SHOULD ALSO CATCH <SOURCE TAG
+                from ebooklib import epub
 
-        return chapter.content
+                _img = epub.EpubImage(file_name=image.get("src") or "")
+                book.add_item(_img)
@@ -14,10 +14,14 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with EbookLib.  If not, see <http://www.gnu.org/licenses/>.
 
+import logging
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
 from ebooklib.plugins.base import BasePlugin
 
+logger = logging.getLogger(__name__)
+
 # Recommend usage of
 # - https://github.com/w3c/tidy-html5
 
@@ -32,6 +36,9 @@ def tidy_cleanup(content, **extra):
         else:
             cmd.append(f"-{k}")
 
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+
     # must parse all other extra arguments
     try:
         p = subprocess.Popen(
@@ -56,26 +63,83 @@ def tidy_cleanup(content, **extra):
 
 
 class TidyPlugin(BasePlugin):
+    """
+    Cleans HTML of the chapters with tidy.
+
+    All chapters are cleaned in before_write (and after_read), before the html_before_write
+    (html_after_read) hooks of all plugins, so the result does not depend on the number of workers.
+    With more than one worker that many tidy processes run at the same time. Chapters which only get
+    content later are cleaned when they are processed.
+
+    Return code of tidy for every chapter is kept in return_codes, by the chapter file name.
+    """
+
     NAME = "Tidy HTML"
     OPTIONS = {"char-encoding": "utf8", "tidy-mark": "no"}
 
-    def __init__(self, extra=None):
+    def __init__(self, extra=None, workers=1):
         self.options = dict(self.OPTIONS)
         if extra is not None:
             self.options.update(extra)
 
-    def html_before_write(self, book, chapter):
-        if not chapter.content:
-            return None
+        self.workers = workers
+        self.return_codes = {}
 
-        (_, chapter.content) = tidy_cleanup(chapter.content, **self.options)
+        # chapters already cleaned in before_write or after_read
+        self._cleaned = set()
 
-        return chapter.content
+    def _cleanup(self, content):
+        return tidy_cleanup(content, **self.options)
+
+    def _set_result(self, chapter, result):
+        (return_code, content) = result
+
+        self.return_codes[chapter.file_name] = return_code
+
+        if return_code >= 2:
+            logger.warning("tidy returned %s for %s", return_code, chapter.file_name)
+
+        # content is left as it is when tidy could not be run
+        if content is not None:
+            chapter.content = content
+
+    def _cleanup_book(self, book):
+        from ebooklib.items import EpubHtml
+
+        chapters = [item for item in book.get_items() if isinstance(item, EpubHtml) and item.content]
+
+        # tidy runs in its own process, so threads are enough to keep several of them busy
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = executor.map(self._cleanup, [chapter.content for chapter in chapters])
+
+            for chapter, result in zip(chapters, results, strict=True):
+                self._set_result(chapter, result)
+                self._cleaned.add(chapter)
+
+    def _cleanup_chapter(self, chapter):
+        if chapter in self._cleaned:
+            self._cleaned.discard(chapter)
+            return chapter.content
 
-    def html_after_read(self, book, chapter):
         if not chapter.content:
             return None
 
-        (_, chapter.content) = tidy_cleanup(chapter.content, **self.options)
+        self._set_result(chapter, self._cleanup(chapter.content))
 
         return chapter.content
+
+    def before_write(self, book):
+        self._cleanup_book(book)
+
+        return True
+
+    def after_read(self, book):
+        self._cleanup_book(book)
+
+        return True
+
+    def html_before_write(self, book, chapter):
+        return self._cleanup_chapter(chapter)
+
+    def html_after_read(self, book, chapter):
+        return self._cleanup_chapter(chapter)
@@ -16,10 +16,15 @@
 
 """EpubReader - loads an EPUB file into an EpubBook."""
 
+import io
+import logging
 import os
 import posixpath as zip_path
 import warnings
 import zipfile
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import ExitStack
 from typing import Any, cast
 from urllib.parse import unquote
 
@@ -30,11 +35,45 @@ from ebooklib.consts import IMAGE_MEDIA_TYPES, NAMESPACES
 from ebooklib.exceptions import EpubException
 from ebooklib.items import EpubCover, EpubCoverHtml, EpubHtml, EpubImage, EpubItem, EpubNav, EpubNcx, EpubSMIL
 from ebooklib.toc import Link, Section
-from ebooklib.utils import Directory, parse_html_string, parse_string
+from ebooklib.tracing import trace_span
+from ebooklib.utils import (
+    DEFAULT_ARCHIVE_HANDLES,
+    ArchiveMember,
+    Directory,
+    close_archive,
+    get_archive_pool,
+    parse_html_string,
+    parse_string,
+)
+
+logger = logging.getLogger(__name__)
+
+_OPF_METADATA = f"{{{NAMESPACES['OPF']}}}metadata"
+_OPF_MANIFEST = f"{{{NAMESPACES['OPF']}}}manifest"
+_OPF_ITEM = f"{{{NAMESPACES['OPF']}}}item"
+_OPF_SPINE = f"{{{NAMESPACES['OPF']}}}spine"
+_OPF_GUIDE = f"{{{NAMESPACES['OPF']}}}guide"
+
+# how many parsed elements of the OPF file are kept before they are removed from the tree
+_OPF_BATCH_SIZE = 1000
+
+# sections of the OPF file and names of their trace phases
+_OPF_SECTIONS = {
+    _OPF_METADATA: "load_metadata",
+    _OPF_MANIFEST: "load_manifest",
+    _OPF_SPINE: "load_spine",
+    _OPF_GUIDE: "load_guide",
+}
 
 
 class EpubReader:
-    DEFAULT_OPTIONS: dict[str, Any] = {"ignore_ncx": True}
+    DEFAULT_OPTIONS: dict[str, Any] = {
+        "ignore_ncx": True,
+        "lazy_load": False,
+        "zero_copy": False,
+        "archive_handles": DEFAULT_ARCHIVE_HANDLES,
+        "trace": None,
+    }
 
     def __init__(self, epub_file_name, options: dict[str, Any] | None = None) -> None:
         self.file_name = epub_file_name
@@ -44,6 +83,17 @@ class EpubReader:
         self.opf_file = ""
         self.opf_dir = ""
 
+        # manifest entries as found in the OPF file and the toc attribute of the spine
+        self.manifest: list[dict[str, Any]] = []
+        self._spine_toc = ""
+        # default namespace of the metadata element
+        self._metadata_ns = ""
+        # Package document. Sections are emptied after they were loaded, unless a subclass overrides
+        # one of _load_metadata, _load_manifest, _load_spine or _load_guide, see _parse_opf().
+        self.container: etree._ElementTree | None = None
+        # manifest entries whose files are missing in the archive are skipped instead of raising KeyError
+        self._skip_missing = False
+
         self.options = dict(self.DEFAULT_OPTIONS)
         if options:
             self.options.update(options)
@@ -54,17 +104,21 @@ class EpubReader:
         if self.options.get("ignore_ncx") is None:
             warnings.warn("In the future version we will turn default option ignore_ncx to True.", stacklevel=2)
 
+    def _span(self, phase: str, name: str | None = None):
+        return trace_span(self.options.get("trace"), phase, name)
+
     def process(self) -> None:
-        # should cache this html parsing so we don't do it for every plugin
         for plg in self.options.get("plugins", []):
             if hasattr(plg, "after_read"):
-                plg.after_read(self.book)
+                with self._span(f"{type(plg).__name__}.after_read"):
+                    plg.after_read(self.book)
 
         for item in self.book.get_items():
             if isinstance(item, EpubHtml):
                 for plg in self.options.get("plugins", []):
                     if hasattr(plg, "html_after_read"):
-                        plg.html_after_read(self.book, item)
+                        with self._span(f"{type(plg).__name__}.html_after_read", item.file_name):
+                            plg.html_after_read(self.book, item)
 
     def load(self) -> EpubBook:
         self._load()
@@ -79,6 +133,35 @@ class EpubReader:
         name = zip_path.normpath(name)
         return self.zf.read(name)
 
+    def _read_item_content(self, item: EpubItem, name: str) -> None:
+        if self.zf is None:
+            raise EpubException(-1, "EPUB file is not opened")
+
+        # documents are parsed, so only the other items are read as views over the memory mapped file
+        zero_copy = bool(self.options.get("zero_copy")) and not isinstance(item, EpubHtml)
+
+        if self.options.get("lazy_load"):
+            try:
+                member = ArchiveMember(self.zf, zip_path.normpath(name), zero_copy=zero_copy)
+            except KeyError:
+                if not self._skip_missing:
+                    raise
+
+                logger.warning(f"File {name} from the manifest is missing in the archive.")
+                return
+
+            item.set_lazy_content(member)
+        else:
+            with self._span("read_item", name) as span:
+                data = ArchiveMember(self.zf, zip_path.normpath(name), zero_copy=True).read() if zero_copy else None
+
+                if isinstance(data, memoryview):
+                    item.set_content_view(data)
+                    span.size = len(data)
+                else:
+                    item.content = data if data is not None else self.read_file(name)
+                    span.size = len(item.content)
+
     def _load_container(self) -> None:
         meta_inf = self.read_file("META-INF/container.xml")
         tree = parse_string(meta_inf)
@@ -90,61 +173,94 @@ class EpubReader:
                 self.opf_file = root_file.get("full-path") or ""
                 self.opf_dir = zip_path.dirname(self.opf_file)
 
-    def _load_metadata(self) -> None:
-        container_root = self.container.getroot()
-
+    def _load_package(self, package: etree._Element) -> None:
         # get epub version
-        self.book.version = container_root.get("version", None)
+        self.book.version = package.get("version", None)
 
         # get unique-identifier
-        unique_identifier = container_root.get("unique-identifier", None)
+        unique_identifier = package.get("unique-identifier", None)
         if unique_identifier:
             self.book.IDENTIFIER_ID = unique_identifier
 
-        # get xml:lang
-        # get metadata
-        metadata = self.container.find(f"{{{NAMESPACES['OPF']}}}metadata")
-        if metadata is None:
-            raise EpubException(-1, "Can not find metadata element")
+    def _start_section(
+        self, section: etree._Element, found: set[str], spans: ExitStack
+    ) -> Callable[[etree._Element], None] | None:
+        # Returns function which loads children of the section. Only the first metadata, manifest, spine
+        # and guide are loaded.
+        if section.tag not in _OPF_SECTIONS or section.tag in found:
+            return None
 
-        nsmap = metadata.nsmap
-        default_ns = nsmap.get(None, "")
+        package = section.getparent()
+        if not found and package is not None:
+            self._load_package(package)
 
-        nsdict: dict[str | None, dict[str, list[Any]]] = {v: {} for v in nsmap.values()}
+        found.add(section.tag)
+        spans.enter_context(self._span(_OPF_SECTIONS[section.tag]))
 
-        def add_item(ns, tag, value, extra):
-            if ns not in nsdict:
-                nsdict[ns] = {}
+        return self._begin_section(section)
 
-            values = nsdict[ns].setdefault(tag, [])
-            values.append((value, extra))
+    def _begin_section(self, section: etree._Element) -> Callable[[etree._Element], None]:
+        # Returns function which loads children of metadata, manifest, spine or guide
+        if section.tag == _OPF_METADATA:
+            # get xml:lang
+            # get metadata
+            self._metadata_ns = section.nsmap.get(None, "")
+            self.book.metadata = {v: {} for v in section.nsmap.values()}
 
-        for t in metadata:
-            if not etree.iselement(t) or t.tag is etree.Comment:
-                continue
-            if t.tag == default_ns + "meta":
-                name = t.get("name")
-                others = dict(t.items())
+            return self._load_metadata_element
+        elif section.tag == _OPF_MANIFEST:
+            return self._load_manifest_item
+        elif section.tag == _OPF_SPINE:
+            self.book.spine = []
 
-                if name and ":" in name:
-                    prefix, name = name.split(":", 1)
-                else:
-                    prefix = None
+            self._spine_toc = section.get("toc", "")
+            self.book.set_direction(section.get("page-progression-direction", None))
 
-                add_item(t.nsmap.get(prefix, prefix), name, t.text, others)
-            else:
-                tag = t.tag[t.tag.rfind("}") + 1 :]
+            return self._load_spine_item
+
+        self.book.guide = []
+
+        return self._load_guide_item
+
+    def _load_section(self, tag: str, required: bool = True) -> None:
+        section = self.container.find(tag) if self.container is not None else None
+        if section is None:
+            if required:
+                raise EpubException(-1, f"Can not find {etree.QName(tag).localname} element")
+
+            return
+
+        package = section.getparent()
+        if tag == _OPF_METADATA and package is not None:
+            self._load_package(package)
 
-                if (t.prefix and t.prefix.lower() == "dc") and tag == "identifier":
-                    _id = t.get("id", None)
+        load = self._begin_section(section)
+        for t in section.iterchildren(etree.Element):
+            load(t)
 
-                    if _id:
-                        self.book.IDENTIFIER_ID = _id
+        self._end_section(tag)
 
-                others = dict(t.items())
-                add_item(t.nsmap[t.prefix], tag, t.text, others)
+    def _load_metadata(self) -> None:
+        self._load_section(_OPF_METADATA)
+
+    def _load_manifest(self) -> None:
+        self._load_section(_OPF_MANIFEST)
+
+    def _load_spine(self) -> None:
+        self._load_section(_OPF_SPINE)
+
+    def _load_guide(self) -> None:
+        self._load_section(_OPF_GUIDE, required=False)
+
+    def _load_spine_item(self, t: etree._Element) -> None:
+        self.book.spine.append((t.get("idref"), t.get("linear", "yes")))
+
+    def _load_guide_item(self, t: etree._Element) -> None:
+        self.book.guide.append({"href": t.get("href"), "title": t.get("title"), "type": t.get("type")})
 
-        self.book.metadata = nsdict
+    def _end_section(self, section: str) -> None:
+        if section != _OPF_METADATA:
+            return
 
         titles = self.book.get_metadata("DC", "title")
         if len(titles) > 0:
@@ -154,81 +270,112 @@ class EpubReader:
             if others.get("id") == self.book.IDENTIFIER_ID:
                 self.book.uid = value
 
-    def _load_manifest(self) -> None:
-        manifest = self.container.find(f"{{{NAMESPACES['OPF']}}}manifest")
-        if manifest is None:
-            raise EpubException(-1, "Can not find manifest element")
+    def _add_metadata(self, ns, tag, value, extra) -> None:
+        if ns not in self.book.metadata:
+            self.book.metadata[ns] = {}
+
+        values = self.book.metadata[ns].setdefault(tag, [])
+        values.append((value, extra))
 
-        for r in manifest:
-            if r is not None and r.tag != f"{{{NAMESPACES['OPF']}}}item":
-                continue
+    def _load_metadata_element(self, t: etree._Element) -> None:
+        if not etree.iselement(t) or t.tag is etree.Comment:
+            return
 
-            uid = r.get("id")
-            href = unquote(r.get("href") or "")
-            media_type = r.get("media-type") or ""
-            _properties = r.get("properties", "")
+        if t.tag == self._metadata_ns + "meta":
+            name = t.get("name")
+            others = dict(t.items())
 
-            if _properties:
-                properties = _properties.split(" ")
+            if name and ":" in name:
+                prefix, name = name.split(":", 1)
             else:
-                properties = []
+                prefix = None
 
-            # people use wrong content types
-            if media_type == "image/jpg":
-                media_type = "image/jpeg"
+            self._add_metadata(t.nsmap.get(prefix, prefix), name, t.text, others)
+        else:
+            tag = t.tag[t.tag.rfind("}") + 1 :]
+
+            if (t.prefix and t.prefix.lower() == "dc") and tag == "identifier":
+                _id = t.get("id", None)
+
+                if _id:
+                    self.book.IDENTIFIER_ID = _id
+
+            others = dict(t.items())
+            self._add_metadata(t.nsmap[t.prefix], tag, t.text, others)
+
+    def _load_manifest_item(self, r: etree._Element) -> None:
+        if r.tag != _OPF_ITEM:
+            return
+
+        uid = r.get("id")
+        href = unquote(r.get("href") or "")
+        media_type = r.get("media-type") or ""
+        _properties = r.get("properties", "")
 
-            ei: EpubItem
+        if _properties:
+            properties = _properties.split(" ")
+        else:
+            properties = []
+
+        self.manifest.append({"id": uid, "href": href, "media_type": media_type, "properties": properties})
+
+        # people use wrong content types
+        if media_type == "image/jpg":
+            media_type = "image/jpeg"
 
-            match media_type:
-                case "application/x-dtbncx+xml":
-                    ei = EpubNcx(uid=uid, file_name=href)
+        ei: EpubItem
 
-                    ei.content = self.read_file(zip_path.join(self.opf_dir, ei.file_name))
-                case "application/smil+xml":
-                    ei = EpubSMIL(uid=uid, file_name=href)
+        match media_type:
+            case "application/x-dtbncx+xml":
+                ei = EpubNcx(uid=uid, file_name=href)
 
-                    ei.content = self.read_file(zip_path.join(self.opf_dir, ei.file_name))
-                case "application/xhtml+xml" if "nav" in properties:
-                    ei = EpubNav(uid=uid, file_name=href)
+                self._read_item_content(ei, zip_path.join(self.opf_dir, ei.file_name))
+            case "application/smil+xml":
+                ei = EpubSMIL(uid=uid, file_name=href)
 
-                    ei.content = self.read_file(zip_path.join(self.opf_dir, ei.file_name))
-                case "application/xhtml+xml" if "cover" in properties:
-                    ei = EpubCoverHtml()
+                self._read_item_content(ei, zip_path.join(self.opf_dir, ei.file_name))
+            case "application/xhtml+xml" if "nav" in properties:
+                ei = EpubNav(uid=uid, file_name=href)
 
-                    ei.content = self.read_file(zip_path.join(self.opf_dir, href))
-                case "application/xhtml+xml":
-                    ei = EpubHtml()
+                self._read_item_content(ei, zip_path.join(self.opf_dir, ei.file_name))
+            case "application/xhtml+xml" if "cover" in properties:
+                ei = EpubCoverHtml()
 
-                    ei.id = uid
-                    ei.file_name = href
-                    ei.media_type = media_type
-                    ei.media_overlay = r.get("media-overlay", None)
-                    ei.media_duration = r.get("duration", None)
-                    ei.content = self.read_file(zip_path.join(self.opf_dir, ei.get_name()))
+                self._read_item_content(ei, zip_path.join(self.opf_dir, href))
+            case "application/xhtml+xml":
+                ei = EpubHtml()
+
+                ei.id = uid
+                ei.file_name = href
+                ei.media_type = media_type
+                ei.media_overlay = r.get("media-overlay", None)
+                ei.media_duration = r.get("duration", None)
+                self._read_item_content(ei, zip_path.join(self.opf_dir, ei.get_name()))
+                if properties:
                     ei.properties = properties
-                case _ if media_type in IMAGE_MEDIA_TYPES and "cover-image" in properties:
-                    ei = EpubCover(uid=uid, file_name=href)
+            case _ if media_type in IMAGE_MEDIA_TYPES and "cover-image" in properties:
+                ei = EpubCover(uid=uid, file_name=href)
 
-                    ei.media_type = media_type
-                    ei.content = self.read_file(zip_path.join(self.opf_dir, ei.get_name()))
-                case _ if media_type in IMAGE_MEDIA_TYPES:
-                    ei = EpubImage()
+                ei.media_type = media_type
+                self._read_item_content(ei, zip_path.join(self.opf_dir, ei.get_name()))
+            case _ if media_type in IMAGE_MEDIA_TYPES:
+                ei = EpubImage()
 
-                    ei.id = uid
-                    ei.file_name = href
-                    ei.media_type = media_type
-                    ei.content = self.read_file(zip_path.join(self.opf_dir, ei.get_name()))
-                case _:
-                    # different types
-                    ei = EpubItem()
+                ei.id = uid
+                ei.file_name = href
+                ei.media_type = media_type
+                self._read_item_content(ei, zip_path.join(self.opf_dir, ei.get_name()))
+            case _:
+                # different types
+                ei = EpubItem()
 
-                    ei.id = uid
-                    ei.file_name = href
-                    ei.media_type = media_type
+                ei.id = uid
+                ei.file_name = href
+                ei.media_type = media_type
 
-                    ei.content = self.read_file(zip_path.join(self.opf_dir, ei.get_name()))
+                self._read_item_content(ei, zip_path.join(self.opf_dir, ei.get_name()))
 
-            self.book.add_item(ei)
+        self.book.add_item(ei)
 
     def _parse_ncx(self, data: bytes) -> None:
         tree = parse_string(data)
@@ -315,18 +462,18 @@ class EpubReader:
                 if filename in htmlfiles:
                     htmlfiles[filename].pages.append(page)
 
-    def _load_spine(self) -> None:
-        spine = self.container.find(f"{{{NAMESPACES['OPF']}}}spine")
-        if spine is None:
-            raise EpubException(-1, "Can not find spine element")
-
-        self.book.spine = [(t.get("idref"), t.get("linear", "yes")) for t in spine]
-
-        toc = spine.get("toc", "")
-        self.book.set_direction(spine.get("page-progression-direction", None))
+    def _load_toc(self) -> None:
+        toc = self._spine_toc
 
         # should read ncx or nav file
-        nav_item = next((item for item in self.book.items if isinstance(item, EpubNav)), None)
+        nav_item = next(
+            (
+                item
+                for item in self.book.items
+                if isinstance(item, EpubNav) and not (self._skip_missing and item.get_source() is None)
+            ),
+            None,
+        )
         if toc:
             if not self.options.get("ignore_ncx") or not nav_item:
                 ncx_item = self.book.get_item_with_id(toc)
@@ -339,34 +486,108 @@ class EpubReader:
                 except KeyError:
                     raise EpubException(-1, "Can not find ncx file.") from None
 
-                self._parse_ncx(ncxFile)
+                with self._span("parse_ncx", ncx_item.get_name()) as span:
+                    span.size = len(ncxFile)
+                    self._parse_ncx(ncxFile)
 
-    def _load_guide(self) -> None:
-        guide = self.container.find(f"{{{NAMESPACES['OPF']}}}guide")
-        if guide is not None:
-            self.book.guide = [{"href": t.get("href"), "title": t.get("title"), "type": t.get("type")} for t in guide]
+        # read nav file if found
+        if nav_item:
+            with self._span("parse_nav", nav_item.file_name) as span:
+                span.size = len(nav_item.content)
 
-    def _load_opf_file(self) -> None:
-        try:
-            s = self.read_file(self.opf_file)
-        except KeyError:
-            raise EpubException(-1, "Can not find container file") from None
+                if self.options.get("ignore_ncx") or not self.book.toc:
+                    self._parse_nav(nav_item.content, zip_path.dirname(nav_item.file_name), navtype="toc")
+                self._parse_nav(nav_item.content, zip_path.dirname(nav_item.file_name), navtype="pages")
 
-        self.container = parse_string(s)
+    def _load_opf_file(self, load_toc: bool = True) -> None:
+        with self._span("parse_opf", self.opf_file) as span:
+            try:
+                s = self.read_file(self.opf_file)
+            except KeyError:
+                raise EpubException(-1, "Can not find container file") from None
+
+            span.size = len(s)
+            self._parse_opf(s)
+
+        if load_toc:
+            with self._span("load_toc"):
+                self._load_toc()
+
+    def _parse_opf(self, data: bytes) -> None:
+        # Subclasses which override loading of the sections get the whole tree in self.container
+        hooks = [f"_{phase}" for phase in _OPF_SECTIONS.values()]
+
+        if any(getattr(type(self), hook) is not getattr(EpubReader, hook) for hook in hooks):
+            self.container = parse_string(data)
+
+            for phase, hook in zip(_OPF_SECTIONS.values(), hooks, strict=True):
+                with self._span(phase):
+                    getattr(self, hook)()
+
+            return
+
+        # The OPF is parsed in one streaming pass. Children of metadata, manifest, spine and guide are
+        # loaded as soon as they are parsed and removed from the tree in batches, so the memory used by
+        # the tree does not grow with the size of the manifest.
+        found: set[str] = set()
+        # section whose children are parsed and function which loads them, None if they are not loaded
+        section: etree._Element | None = None
+        load: Callable[[etree._Element], None] | None = None
+        parsed = 0
+
+        with ExitStack() as spans:
+            for _, elem in etree.iterparse(io.BytesIO(data), recover=True, resolve_entities=False):
+                parent = elem.getparent()
+
+                if parent is None:
+                    # end of the package, it is kept without the content of the sections
+                    self.container = elem.getroottree()
+                    continue
+
+                if parent is not section:
+                    grandparent = parent.getparent()
+
+                    if grandparent is None:
+                        # end of a section, sections without children are also started here
+                        if elem is not section:
+                            load = self._start_section(elem, found, spans)
+
+                        if load is not None:
+                            self._end_section(elem.tag)
+
+                        spans.close()
+                        elem.clear()
+                        section, load = None, None
+                        continue
+
+                    if grandparent.getparent() is not None:
+                        # deeper elements are loaded together with their parent
+                        continue
+
+                    # first child of a section
+                    section = parent
+                    load = self._start_section(parent, found, spans)
+                    parsed = 0
+
+                if load is not None:
+                    load(elem)
+
+                parsed += 1
+                if parsed == _OPF_BATCH_SIZE:
+                    # loaded elements are not needed anymore, the parser can already be ahead of elem
+                    del parent[: parent.index(elem)]
+                    parsed = 0
+
+        if _OPF_METADATA not in found:
+            raise EpubException(-1, "Can not find metadata element")
 
-        self._load_metadata()
-        self._load_manifest()
-        self._load_spine()
-        self._load_guide()
+        if _OPF_MANIFEST not in found:
+            raise EpubException(-1, "Can not find manifest element")
 
-        # read nav file if found
-        nav_item = next((item for item in self.book.items if isinstance(item, EpubNav)), None)
-        if nav_item:
-            if self.options.get("ignore_ncx") or not self.book.toc:
-                self._parse_nav(nav_item.content, zip_path.dirname(nav_item.file_name), navtype="toc")
-            self._parse_nav(nav_item.content, zip_path.dirname(nav_item.file_name), navtype="pages")
+        if _OPF_SPINE not in found:
+            raise EpubException(-1, "Can not find spine element")
 
-    def _load(self) -> None:
+    def _open(self) -> zipfile.ZipFile | Directory:
         self.zf = None
 
         file_name = self.file_name
@@ -386,11 +607,34 @@ class EpubReader:
             except zipfile.LargeZipFile:
                 raise EpubException(1, "Large Zip file") from None
 
-        # 1st check metadata
-        self._load_container()
-        self._load_opf_file()
+        return self.zf
+
+    def _load(self) -> None:
+        with self._span("open"):
+            zf = self._open()
 
-        self.zf.close()
+        try:
+            # 1st check metadata
+            with self._span("load_container"):
+                self._load_container()
+            self._load_opf_file()
+        except BaseException:
+            close_archive(zf)
+            raise
+
+        # items read lazily or mapped into memory depend on the file as long as they exist
+        if self.options.get("lazy_load") or self.options.get("zero_copy"):
+            if isinstance(zf, zipfile.ZipFile) and isinstance(zf.filename, str):
+                self.book._source_file = zf.filename
+
+        if self.options.get("lazy_load"):
+            # content is read on demand, the book is now responsible for closing the archive
+            self.book._archive = zf
+
+            if isinstance(zf, zipfile.ZipFile):
+                get_archive_pool(zf, self.options.get("archive_handles", DEFAULT_ARCHIVE_HANDLES))
+        else:
+            close_archive(zf)
 
 
 def read_epub(name, options: dict[str, Any] | None = None) -> EpubBook:
@@ -412,3 +656,128 @@ def read_epub(name, options: dict[str, Any] | None = None) -> EpubBook:
     reader.process()
 
     return book
+
+
+def read_epub_metadata(name, options: dict[str, Any] | None = None, toc: bool = False) -> dict[str, Any]:
+    """
+    Reads only the package document of the EPUB file. Content of the items is never read, so this is much
+    faster than read_epub when only metadata is needed. Files listed in the manifest which are missing in the
+    archive are logged and skipped.
+
+    >>> info = ebooklib.read_epub_metadata('book.epub', toc=True)
+    >>> info['title']
+
+    :Args:
+      - name: full path to the input file
+      - options: extra options as dictionary (optional)
+      - toc: Should the table of contents be read from the NCX or navigation document (optional)
+
+    :Returns:
+      Dictionary with keys version, uid, title, direction, metadata, manifest, spine, guide,
+      toc and pages. Table of contents and pages are empty lists unless toc is True.
+    """
+    # lazy loading keeps the manifest from reading the content
+    reader = EpubReader(name, dict(options or {}, lazy_load=True))
+    # content of the items is never read, so missing files do not matter
+    reader._skip_missing = True
+    zf = reader._open()
+
+    try:
+        reader._load_container()
+        reader._load_opf_file(load_toc=toc)
+    finally:
+        zf.close()
+
+    book = reader.book
+
+    return {
+        "version": book.version,
+        "uid": book.uid,
+        "title": book.title,
+        "direction": book.direction,
+        "metadata": book.metadata,
+        "manifest": reader.manifest,
+        "spine": book.spine,
+        "guide": book.guide,
+        "toc": book.toc,
+        "pages": book.pages,
+    }
+
+
+def _read_one(name, options: dict[str, Any] | None, summary: bool, toc: bool) -> tuple[Any, Any, Exception | None]:
+    try:
+        if summary:
+            return (name, read_epub_metadata(name, options, toc=toc), None)
+
+        return (name, read_epub(name, options), None)
+    except Exception as e:
+        return (name, None, e)
+
+
+def read_many(
+    names: Iterable,
+    workers: int | None = None,
+    options: dict[str, Any] | None = None,
+    summary: bool = False,
+    toc: bool = False,
+) -> Iterator[tuple[Any, Any, Exception | None]]:
+    """
+    Reads many EPUB files using a pool of processes. Results are returned in the order in which
+    reading of the files finishes, not in the order of names. Error while reading one file does not
+    stop reading of the others, it is returned together with the file name.
+
+    >>> for name, book, error in ebooklib.read_many(paths, workers=8):
+    ...     if error is None:
+    ...         print(name, book.title)
+
+    Options (and plugins in them) have to be picklable. Lazy loading is not possible because the book
+    is sent back from another process, so the lazy_load option is ignored. With summary set, the
+    workers only read the package document and send back the much smaller dictionary returned by
+    read_epub_metadata instead of the whole book.
+
+    :Args:
+      - names: iterable with full paths to the input files
+      - workers: number of processes, defaults to the number of CPUs; with 1 files are read in this process
+      - options: extra options as dictionary (optional)
+      - summary: Return metadata dictionaries instead of books (optional)
+      - toc: With summary, should the table of contents be read as well (optional)
+
+    :Returns:
+      Iterator of (name, result, error) tuples. Result is EpubBook, or dictionary when summary is set,
+      and None when there was an error.
+    """
+    options = dict(options or {}, lazy_load=False)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for name in names:
+            yield _read_one(name, options, summary, toc)
+        return
+
+    names = iter(names)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # submit files a few at a time, so huge lists of files are not all queued up front
+        window = 4 * workers
+        pending: dict[Future, Any] = {}
+
+        while True:
+            for name in names:
+                pending[executor.submit(_read_one, name, options, summary, toc)] = name
+
+                if len(pending) >= window:
+                    break
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = pending.pop(future)
+
+                try:
+                    yield future.result()
+                except Exception as e:
+                    # worker died or the result could not be sent back
+                    yield (name, None, e)
@@ -0,0 +1,166 @@
+# This file is part of EbookLib.
+# Copyright (c) 2013 Aleksandar Erkalovic <aerkalov@gmail.com>
+#
+# EbookLib is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# EbookLib is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with EbookLib.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Content stores which keep content of large items outside of memory."""
+
+import os
+import tempfile
+import weakref
+from functools import partial
+
+from ebooklib.items import EpubItem
+
+# Items with content of this size or larger are moved to the store by default
+DEFAULT_STORE_THRESHOLD = 1024 * 1024
+
+
+class ContentStore:
+    """
+    Base class for content stores. A store set on the book with :meth:`ebooklib.epub.EpubBook.set_content_store`
+    gets every item added to the book and every item whose content is changed afterwards. It can move the
+    content out of memory and set a content provider on the item instead.
+    """
+
+    def put(self, item: EpubItem) -> None:
+        """
+        Called when item is added to the book or its content is set.
+
+        :Args:
+          - item: Item instance
+        """
+
+    def discard(self, item: EpubItem) -> None:
+        """
+        Called when item is removed from the book. Stored content of the item is not needed anymore.
+
+        :Args:
+          - item: Item instance
+        """
+
+    def close(self) -> None:
+        """
+        Called when the book is closed. Releases everything the store holds.
+        """
+
+
+def _remove_files(files: dict[EpubItem, str]) -> None:
+    for file_name in files.values():
+        try:
+            os.remove(file_name)
+        except OSError:
+            pass
+
+    files.clear()
+
+
+def _open_file(file_name: str):
+    return open(file_name, "rb")
+
+
+def _removed_file(name: str):
+    raise ValueError(f"Content of {name!r} was stored in a temporary file which was removed when the book was closed")
+
+
+class TempFileStore(ContentStore):
+    """
+    Keeps content of large items in temporary files. Items whose content is at least threshold bytes
+    long are written to a file and read back from it when needed; the writer copies them to the
+    archive in chunks. Files are removed when the content of the item changes, when the item is
+    removed from the book (its content is read back into memory) and when the book is closed. Content
+    of items whose file was removed when the book was closed can not be read anymore, it raises ValueError.
+
+    Only items which return their content as it is are stored; documents and navigation generate
+    their content when the book is written and are always kept in memory.
+
+    >>> book.set_content_store(TempFileStore(threshold=512 * 1024, directory='/var/tmp'))
+    """
+
+    def __init__(self, threshold: int = DEFAULT_STORE_THRESHOLD, directory: str | os.PathLike | None = None) -> None:
+        """
+        :Args:
+          - threshold: Minimal size of the content in bytes which is moved to a file (optional)
+          - directory: Directory for the files, default temporary directory is used if not defined (optional)
+        """
+        self.threshold = threshold
+        self.directory = directory
+
+        self._files: dict[EpubItem, str] = {}
+        # files are removed even if the store is never closed
+        self._finalizer = weakref.finalize(self, _remove_files, self._files)
+
+    def put(self, item: EpubItem) -> None:
+        if item in self._files and item.has_content_provider():
+            # already stored
+            return
+
+        self.discard(item)
+
+        if type(item).get_content is not EpubItem.get_content or item.has_content_provider():
+            return
+
+        # content of lazily loaded items stays in the archive until it is needed
+        if item.get_source() is not None and not item.is_loaded():
+            return
+
+        content = item.get_content()
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+
+        if len(content) < self.threshold:
+            return
+
+        fd, file_name = tempfile.mkstemp(prefix="ebooklib-", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+        except BaseException:
+            os.remove(file_name)
+            raise
+
+        item.set_content_provider(partial(_open_file, file_name), size=len(content))
+        self._files[item] = file_name
+
+    def discard(self, item: EpubItem) -> None:
+        file_name = self._files.pop(item, None)
+
+        if file_name is not None:
+            # item removed from the book still reads the file, its content is moved back to memory
+            if item.has_content_provider() and item.book is None:
+                item.set_content(item.get_content())
+
+            try:
+                os.remove(file_name)
+            except OSError:
+                pass
+
+    def get_file_name(self, item: EpubItem) -> str | None:
+        """
+        Returns name of the file where content of the item is stored.
+
+        :Args:
+          - item: Item instance
+
+        :Returns:
+          File name or None if the content is not stored.
+        """
+        return self._files.get(item)
+
+    def close(self) -> None:
+        # items can outlive the book, they should not point to files which do not exist anymore
+        for item in self._files:
+            item.set_content_provider(partial(_removed_file, item.file_name), size=item.get_provided_size())
+
+        _remove_files(self._files)
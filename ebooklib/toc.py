@@ -18,6 +18,8 @@
 
 
 class Section:
+    __slots__ = ("title", "href", "__dict__", "__weakref__")
+
     def __init__(self, title: str, href: str = "") -> None:
         self.title = title
         self.href = href
@@ -27,6 +29,8 @@ class Section:
 
 
 class Link:
+    __slots__ = ("href", "title", "uid", "__dict__", "__weakref__")
+
     def __init__(self, href: str, title: str, uid: str | None = None) -> None:
         self.href = href
         self.title = title
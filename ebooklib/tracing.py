@@ -0,0 +1,183 @@
+# This file is part of EbookLib.
+# Copyright (c) 2013 Aleksandar Erkalovic <aerkalov@gmail.com>
+#
+# EbookLib is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# EbookLib is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with EbookLib.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Timing of the reading and writing phases, enabled with the trace option of EpubReader and EpubWriter."""
+
+import time
+from collections.abc import Callable
+from typing import Any, NamedTuple, TypeAlias
+
+
+class Span(NamedTuple):
+    """
+    Single timed phase of reading or writing. Spans can be nested, for instance get_nav contains page_list.
+    """
+
+    # name of the phase, like load_manifest, get_content or SyntaxPlugin.html_before_write
+    phase: str
+    # file name of the item or archive member the phase was working on, None for phases of the whole book
+    name: str | None
+    # time.perf_counter() when the phase started and how long it took in seconds
+    start: float
+    duration: float
+    # number of bytes produced or processed in the phase, when it is known
+    size: int | None
+
+
+# Called with every finished span. Members can be compressed in several threads at the same time.
+TraceCallback: TypeAlias = Callable[[Span], object]
+
+
+class _ActiveSpan:
+    __slots__ = ("callback", "phase", "name", "size", "start")
+
+    def __init__(self, callback: TraceCallback, phase: str, name: str | None) -> None:
+        self.callback = callback
+        self.phase = phase
+        self.name = name
+        self.size: int | None = None
+        self.start = 0.0
+
+    def __enter__(self) -> "_ActiveSpan":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        duration = time.perf_counter() - self.start
+        self.callback(Span(self.phase, self.name, self.start, duration, self.size))
+
+
+class _NoSpan:
+    """Used when tracing is not enabled, does nothing."""
+
+    __slots__ = ()
+
+    @property
+    def size(self) -> int | None:
+        return None
+
+    @size.setter
+    def size(self, value: int | None) -> None:
+        pass
+
+    def __enter__(self) -> "_NoSpan":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def trace_span(callback: TraceCallback | None, phase: str, name: str | None = None) -> _ActiveSpan | _NoSpan:
+    """
+    Returns context manager which times the code in it and passes the span to the callback. Size of the
+    span can be set on the returned object. Without callback nothing is timed.
+
+    >>> with trace_span(options.get('trace'), 'get_content', item.file_name) as span:
+    ...     span.size = len(content)
+
+    :Args:
+      - callback: Function which gets the finished span, None when tracing is not enabled
+      - phase: Name of the phase
+      - name: File name of the item the phase is working on (optional)
+    """
+    if callback is None:
+        return _NO_SPAN
+
+    return _ActiveSpan(callback, phase, name)
+
+
+class TimingReport:
+    """
+    Collects spans and aggregates them into a report. Instance can be passed as the trace option.
+
+    >>> report = TimingReport()
+    >>> ebooklib.write_epub('book.epub', book, {'trace': report})
+    >>> print(report.format())
+    """
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    def __call__(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+    def summary(self, by_item: bool = False) -> list[dict[str, Any]]:
+        """
+        Returns spans aggregated by phase, sorted by total time. Nested spans are counted in their own
+        phase and in the phase which contains them.
+
+        :Args:
+          - by_item: Aggregate by phase and item name instead of only by phase (optional)
+
+        :Returns:
+          List of dictionaries with keys phase, name, count, total, max and size. Size is None if no span
+          in the group reported it.
+        """
+        groups: dict[tuple[str, str | None], dict[str, Any]] = {}
+
+        for span in self.spans:
+            key = (span.phase, span.name if by_item else None)
+            if key not in groups:
+                groups[key] = {"phase": key[0], "name": key[1], "count": 0, "total": 0.0, "max": 0.0, "size": None}
+
+            group = groups[key]
+
+            group["count"] += 1
+            group["total"] += span.duration
+            group["max"] = max(group["max"], span.duration)
+
+            if span.size is not None:
+                group["size"] = (group["size"] or 0) + span.size
+
+        return sorted(groups.values(), key=lambda group: group["total"], reverse=True)
+
+    def format(self, by_item: bool = False, limit: int | None = None) -> str:
+        """
+        Returns the summary as text table.
+
+        :Args:
+          - by_item: Aggregate by phase and item name instead of only by phase (optional)
+          - limit: Show only this many slowest rows (optional)
+
+        :Returns:
+          Report as string.
+        """
+        rows = self.summary(by_item)[:limit]
+        width = max([len(self._label(row)) for row in rows] + [5])
+
+        lines = [f"{'phase':<{width}} {'count':>7} {'total':>10} {'max':>10} {'bytes':>12}"]
+
+        for row in rows:
+            size = "-" if row["size"] is None else f"{row['size']:,}"
+            lines.append(
+                f"{self._label(row):<{width}} {row['count']:>7} {row['total'] * 1000:>8.1f}ms "
+                f"{row['max'] * 1000:>8.1f}ms {size:>12}"
+            )
+
+        return "\n".join(lines)
+
+    @staticmethod
+    def _label(row: dict[str, Any]) -> str:
+        if row["name"] is None:
+            return row["phase"]
+
+        return f"{row['phase']} {row['name']}"
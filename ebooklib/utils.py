@@ -16,12 +16,38 @@
 
 import io
 import mimetypes
+import mmap
 import os
+import struct
+import threading
+import weakref
+import zipfile
+import zlib
+from typing import IO, Any, cast
 
 from lxml import etree
 
 mimetype_initialised = False
 
+# Local file header of a ZIP archive member, the file name and extra field follow it
+ZIP_FILE_HEADER_SIGNATURE = b"PK\x03\x04"
+ZIP_FILE_HEADER_SIZE = 30
+
+# Size of the chunks read from the archive by member streams
+MEMBER_STREAM_CHUNK_SIZE = 64 * 1024
+# Number of unused file handles kept open by ArchiveHandlePool, by default
+DEFAULT_ARCHIVE_HANDLES = 4
+
+# lxml parsers can be reused, but not shared between threads
+_parsers = threading.local()
+
+# memory maps of opened ZIP archives, created on first zero-copy read
+_mappings: "weakref.WeakKeyDictionary[zipfile.ZipFile, mmap.mmap | None]" = weakref.WeakKeyDictionary()
+
+# pools of file handles of opened archives, see get_archive_pool(); the lock guards _mappings as well
+_pools: "weakref.WeakKeyDictionary[zipfile.ZipFile, ArchiveHandlePool]" = weakref.WeakKeyDictionary()
+_pools_lock = threading.Lock()
+
 
 def debug(obj: object) -> None:
     import pprint
@@ -30,8 +56,28 @@ def debug(obj: object) -> None:
     pp.pprint(obj)
 
 
+def _get_xml_parser() -> etree.XMLParser:
+    parser = getattr(_parsers, "xml", None)
+
+    if parser is None:
+        parser = _parsers.xml = etree.XMLParser(recover=True, resolve_entities=False)
+
+    return parser
+
+
+def _get_html_parser():
+    parser = getattr(_parsers, "html", None)
+
+    if parser is None:
+        from lxml import html
+
+        parser = _parsers.html = html.HTMLParser(encoding="utf-8")
+
+    return parser
+
+
 def parse_string(s: str | bytes) -> etree._ElementTree:
-    parser = etree.XMLParser(recover=True, resolve_entities=False)
+    parser = _get_xml_parser()
     if isinstance(s, str):
         tree = etree.parse(io.BytesIO(s.encode("utf-8")), parser=parser)
     else:
@@ -43,9 +89,7 @@ def parse_string(s: str | bytes) -> etree._ElementTree:
 def parse_html_string(s: str | bytes):
     from lxml import html
 
-    utf8_parser = html.HTMLParser(encoding="utf-8")
-
-    html_tree = html.document_fromstring(s, parser=utf8_parser)
+    html_tree = html.document_fromstring(s, parser=_get_html_parser())
 
     return html_tree
 
@@ -81,44 +125,65 @@ def create_pagebreak(pageref: str, label: str | None = None, html: bool = True)
     return pageref_elem
 
 
+_HEADER_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+
+
 def get_headers(elem) -> str | None:
-    for n in range(1, 7):
-        headers = elem.xpath(f"./h{n}")
+    # first header of every level, found in one pass over the children
+    headers = {}
 
-        if len(headers) > 0:
-            text = headers[0].text_content().strip()
+    for child in elem:
+        if child.tag in _HEADER_TAGS and child.tag not in headers:
+            headers[child.tag] = child
+
+    for tag in _HEADER_TAGS:
+        if tag in headers:
+            text = headers[tag].text_content().strip()
             if len(text) > 0:
                 return text
     return None
 
 
-def get_pages(item) -> list[tuple[str, str, str]]:
-    body = parse_html_string(item.get_body_content())
+def find_pages(html_tree) -> list[tuple[str, str]]:
+    """
+    Returns page breaks found in the body of parsed HTML document. Page breaks are all elements with
+    epub:type and id attributes.
+
+    :Args:
+      - html_tree: Root element of the parsed document
+
+    :Returns:
+      Returns list of (id, label) tuples.
+    """
+    body = html_tree.find("body")
     pages = []
 
-    for elem in body.iter():
-        if "epub:type" in elem.attrib:
-            if elem.get("id") is not None:
-                _text = None
+    if body is None:
+        return pages
+
+    for elem in body.xpath("descendant-or-self::*[@id and @*[name()='epub:type']]"):
+        _text = None
 
-                if elem.text is not None and elem.text.strip() != "":
-                    _text = elem.text.strip()
+        if elem.text is not None and elem.text.strip() != "":
+            _text = elem.text.strip()
 
-                if _text is None:
-                    _text = elem.get("aria-label")
+        if _text is None:
+            _text = elem.get("aria-label")
 
-                if _text is None:
-                    _text = get_headers(elem)
+        if _text is None:
+            _text = get_headers(elem)
 
-                pages.append((item.get_name(), elem.get("id"), _text or elem.get("id")))
+        pages.append((elem.get("id"), _text or elem.get("id")))
 
     return pages
 
 
-def get_pages_for_items(items) -> list[tuple[str, str, str]]:
-    pages_from_docs = [get_pages(item) for item in items]
+def get_pages(item) -> list[tuple[str, str, str]]:
+    return item.get_pages()
+
 
-    return [item for pages in pages_from_docs for item in pages]
+def get_pages_for_items(items) -> list[tuple[str, str, str]]:
+    return [page for item in items for page in item.get_pages()]
 
 
 class Directory:
@@ -139,6 +204,37 @@ class Directory:
         :raises OSError: If ``subname`` escapes the EPUB directory (path traversal,
             e.g. ``"../../secret"``), or if the file cannot be read.
         """
+        with open(self._get_path(subname), "rb") as fp:
+            return fp.read()
+
+    def read_view(self, subname: str) -> memoryview:
+        """Return content of the file ``subname`` as a view over a read-only memory map of it.
+
+        Nothing is copied into memory, pages of the file are read by the operating system
+        when they are accessed. The map stays valid as long as the view is referenced.
+
+        :param subname: Path of the file, relative to the EPUB directory.
+        :returns: Read-only view of the file content.
+        :raises OSError: Same as :meth:`read`.
+        """
+        with open(self._get_path(subname), "rb") as fp:
+            mapping = map_file(fp)
+
+            if mapping is None:
+                return memoryview(fp.read())
+
+        return memoryview(mapping)
+
+    def open(self, subname: str) -> IO[bytes]:
+        """Open the file ``subname`` for reading.
+
+        :param subname: Path of the file, relative to the EPUB directory.
+        :returns: Seekable binary file object.
+        :raises OSError: Same as :meth:`read`.
+        """
+        return open(self._get_path(subname), "rb")
+
+    def _get_path(self, subname: str) -> str:
         # Guard against path traversal (e.g. "../../secret") escaping the EPUB directory.
         base_path = os.path.realpath(self.directory_path)
         full_path = os.path.realpath(os.path.join(base_path, subname))
@@ -146,8 +242,477 @@ class Directory:
         if os.path.commonpath([base_path, full_path]) != base_path:
             raise OSError(f"Invalid path, escapes the source directory: {subname!r}")
 
-        with open(full_path, "rb") as fp:
-            return fp.read()
+        return full_path
 
     def close(self) -> None:
         pass
+
+
+def map_file(fp: Any) -> mmap.mmap | None:
+    """Return read-only memory map of the whole opened file.
+
+    :param fp: File object opened for reading.
+    :returns: Memory map, or None if the file can not be mapped (empty files, file-like objects
+        which are not backed by a file descriptor).
+    """
+    try:
+        return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        return None
+
+
+def _get_mapping(archive: zipfile.ZipFile) -> mmap.mmap | None:
+    with _pools_lock:
+        if archive not in _mappings:
+            _mappings[archive] = map_file(archive.fp)
+
+        return _mappings[archive]
+
+
+def _get_data_offset(header: bytes, info: zipfile.ZipInfo) -> int:
+    # zipfile has no public API for this. Data follows the local file header, whose length
+    # depends on the file name and extra field stored in the header itself.
+    if len(header) != ZIP_FILE_HEADER_SIZE or header[0:4] != ZIP_FILE_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"Bad magic number for file header of {info.filename!r}")
+
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+
+    return info.header_offset + ZIP_FILE_HEADER_SIZE + name_length + extra_length
+
+
+class ArchiveMember:
+    """Deferred reference to a single file inside an opened ZipFile or Directory.
+
+    Used by EpubReader for lazy loading, the content is read only when :meth:`read` is called.
+    The archive has to stay open until then.
+
+    With ``zero_copy``, content of files in a directory and of members stored without compression
+    is returned as a memoryview over a memory map of the file instead of a copy in bytes.
+    """
+
+    # there is one for every item of a lazily loaded book
+    __slots__ = ("archive", "name", "zero_copy", "info")
+
+    def __init__(self, archive: zipfile.ZipFile | Directory, name: str, zero_copy: bool = False) -> None:
+        self.archive = archive
+        self.name = name
+        self.zero_copy = zero_copy
+
+        # For ZIP archives look up the member right away, so a missing file raises KeyError
+        # while loading the book, same as when the content is read eagerly.
+        self.info: zipfile.ZipInfo | None = None
+        if isinstance(archive, zipfile.ZipFile):
+            self.info = archive.getinfo(name)
+            # same name, but the string is shared with the archive
+            self.name = self.info.filename
+
+    def read(self) -> bytes | memoryview:
+        """Read and return the (decompressed) content of this member."""
+        if self.zero_copy:
+            view = self.read_view()
+            if view is not None:
+                return view
+
+        if isinstance(self.archive, zipfile.ZipFile):
+            return self.archive.read(self.info or self.name)
+
+        return self.archive.read(self.name)
+
+    def open(self, pool: "ArchiveHandlePool | None" = None) -> IO[bytes]:
+        """Open content of this member as a binary stream, without reading all of it into memory.
+
+        Streams of members of a ZIP archive read with their own file handle, so several threads can
+        read at the same time.
+
+        :param pool: Pool of handles of the archive this member belongs to, pool of the archive when not given.
+        :returns: Seekable stream for files in a directory and members stored without compression,
+            stream which decompresses content as it is read for the other members.
+        """
+        if isinstance(self.archive, Directory):
+            return self.archive.open(self.name)
+
+        if pool is None or pool.archive is not self.archive:
+            pool = get_archive_pool(self.archive)
+
+        return pool.open(self.info or self.name)
+
+    def read_view(self) -> memoryview | None:
+        """Return content of this member as a view over a memory map of the archive, without copying it.
+
+        Only possible for files in a directory and for members of a ZIP file stored without compression.
+        Unlike :meth:`read`, CRC of the member is not checked.
+
+        :returns: Read-only view of the content, or None if the member can not be read this way.
+        """
+        if isinstance(self.archive, Directory):
+            return self.archive.read_view(self.name)
+
+        if not self.can_read_raw() or self.info is None or self.info.compress_type != zipfile.ZIP_STORED:
+            return None
+
+        mapping = _get_mapping(self.archive)
+        if mapping is None:
+            return None
+
+        return self._read_mapped(mapping)
+
+    def can_read_raw(self) -> bool:
+        """Returns if data of this member can be copied as it is stored in the still opened ZIP archive."""
+        return (
+            self.info is not None
+            and isinstance(self.archive, zipfile.ZipFile)
+            and self.archive.fp is not None
+            and self.info.compress_type in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)
+            and not self.info.flag_bits & 0x1
+        )
+
+    def read_raw(self) -> bytes | memoryview:
+        """Read data of this member as it is stored in the ZIP archive, without decompressing it.
+
+        :returns: Compressed data. CRC, sizes and compression type are in :attr:`info`.
+            With ``zero_copy`` a view over a memory map of the archive when it can be mapped.
+        :raises ValueError: If data can not be read this way, check with :meth:`can_read_raw` first.
+        """
+        archive, info = self.archive, self.info
+        if not self.can_read_raw() or not isinstance(archive, zipfile.ZipFile) or info is None:
+            raise ValueError(f"Can not read raw data of {self.name!r}")
+
+        if self.zero_copy:
+            mapping = _get_mapping(archive)
+            if mapping is not None:
+                return self._read_mapped(mapping)
+
+        return get_archive_pool(archive).read_raw(info)
+
+    def _read_mapped(self, mapping: mmap.mmap) -> memoryview:
+        info = cast("zipfile.ZipInfo", self.info)
+        start = _get_data_offset(mapping[info.header_offset : info.header_offset + ZIP_FILE_HEADER_SIZE], info)
+
+        return memoryview(mapping)[start : start + info.compress_size]
+
+
+class _SharedHandle:
+    """Reads from the file object of the ZipFile itself, for archives which were not opened from a file."""
+
+    def __init__(self, archive: zipfile.ZipFile) -> None:
+        self.archive = archive
+
+    def read_at(self, offset: int, size: int) -> bytes:
+        fp = self.archive.fp
+
+        # archive in memory is read without moving its position
+        if isinstance(fp, io.BytesIO):
+            with fp.getbuffer() as view:
+                return bytes(view[offset : offset + size])
+
+        # private lock of the ZipFile, shared by all readers of the archive
+        with cast("Any", self.archive)._lock:
+            fp = self.archive.fp
+            if fp is None:
+                raise ValueError("Attempt to read ZIP archive that was already closed")
+
+            fp.seek(offset)
+            return fp.read(size)
+
+    def close(self) -> None:
+        pass
+
+
+class _FileHandle:
+    """File handle used by only one stream at a time, so reading from it needs no lock."""
+
+    def __init__(self, file_name: str | os.PathLike) -> None:
+        self.fp = open(file_name, "rb", buffering=0)
+
+    def read_at(self, offset: int, size: int) -> bytes:
+        self.fp.seek(offset)
+        return self.fp.read(size)
+
+    def close(self) -> None:
+        self.fp.close()
+
+
+class ArchiveHandlePool:
+    """Thread-safe pool of file handles for reading members of an opened ZIP archive.
+
+    Members are located with the central directory which the ZipFile already read, but every stream
+    opened with :meth:`open` reads with its own handle of the file, so threads do not wait for each
+    other. Handles are opened when they are needed and up to ``max_handles`` unused ones are kept
+    for the next streams.
+
+    When the archive was not opened from a file (bytes in memory, other file-like objects) all streams
+    read from the file object of the ZipFile.
+    """
+
+    def __init__(
+        self,
+        archive: zipfile.ZipFile,
+        file_name: str | os.PathLike | None = None,
+        max_handles: int = DEFAULT_ARCHIVE_HANDLES,
+    ) -> None:
+        """
+        :param archive: Opened ZIP archive.
+        :param file_name: Name of the archive file, file name of the ZipFile when not given.
+        :param max_handles: How many unused handles are kept open.
+        """
+        if file_name is None and isinstance(archive.filename, str) and os.path.isfile(archive.filename):
+            file_name = archive.filename
+
+        self.archive = archive
+        self.file_name = file_name
+        self.max_handles = max_handles
+
+        self._idle: list[_FileHandle] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def open(self, info: zipfile.ZipInfo | str) -> IO[bytes]:
+        """Open member of the archive for reading.
+
+        Content of members stored without compression is read directly from the archive and the stream
+        supports seeking. Deflated members are decompressed while they are read and can only be read
+        from the start to the end. CRC of the content is checked when the whole member was read in order.
+
+        :param info: Member of the archive, as ZipInfo or name.
+        :returns: Binary stream, the handle it uses is returned to the pool when it is closed.
+        :raises KeyError: If there is no such member.
+        """
+        if isinstance(info, str):
+            info = self.archive.getinfo(info)
+
+        # encrypted members and other compression methods are left to zipfile
+        if info.flag_bits & 0x1 or info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            return self.archive.open(info)
+
+        handle = self._acquire()
+        try:
+            start = _get_data_offset(handle.read_at(info.header_offset, ZIP_FILE_HEADER_SIZE), info)
+        except BaseException:
+            self._release(handle)
+            raise
+
+        if info.compress_type == zipfile.ZIP_STORED:
+            raw: _MemberStream = _StoredMemberStream(self, handle, info, start)
+        else:
+            raw = _DeflatedMemberStream(self, handle, info, start)
+
+        return io.BufferedReader(raw, MEMBER_STREAM_CHUNK_SIZE)
+
+    def read_raw(self, info: zipfile.ZipInfo) -> bytes:
+        """Read data of the member as it is stored in the archive, without decompressing it.
+
+        :param info: Member of the archive.
+        :returns: Compressed data.
+        """
+        handle = self._acquire()
+        try:
+            start = _get_data_offset(handle.read_at(info.header_offset, ZIP_FILE_HEADER_SIZE), info)
+            return handle.read_at(start, info.compress_size)
+        finally:
+            self._release(handle)
+
+    def _acquire(self) -> "_FileHandle | _SharedHandle":
+        if self.file_name is None:
+            return _SharedHandle(self.archive)
+
+        with self._lock:
+            if self._closed:
+                raise ValueError("Attempt to read ZIP archive that was already closed")
+
+            if self._idle:
+                return self._idle.pop()
+
+        return _FileHandle(self.file_name)
+
+    def _release(self, handle: "_FileHandle | _SharedHandle") -> None:
+        with self._lock:
+            if not self._closed and isinstance(handle, _FileHandle) and len(self._idle) < self.max_handles:
+                self._idle.append(handle)
+                return
+
+        handle.close()
+
+    def close(self) -> None:
+        """Close all unused handles. Handles of streams which are still open are closed with the streams."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+
+        for handle in idle:
+            handle.close()
+
+
+class _MemberStream(io.RawIOBase):
+    def __init__(
+        self, pool: ArchiveHandlePool, handle: "_FileHandle | _SharedHandle", info: zipfile.ZipInfo, start: int
+    ) -> None:
+        super().__init__()
+
+        self._pool = pool
+        self._handle: _FileHandle | _SharedHandle | None = handle
+        self._info = info
+        self._start = start
+
+        # CRC of the content read so far, None when the content was not read in order
+        self._crc: int | None = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def _read_at(self, position: int, size: int) -> bytes:
+        if self._handle is None:
+            raise ValueError("I/O operation on closed file.")
+
+        return self._handle.read_at(self._start + position, size)
+
+    def _update_crc(self, data: bytes, end: bool) -> None:
+        if self._crc is None:
+            return
+
+        self._crc = zlib.crc32(data, self._crc)
+
+        if end and self._crc != self._info.CRC:
+            raise zipfile.BadZipFile(f"Bad CRC-32 for file {self._info.filename!r}")
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._pool._release(self._handle)
+            self._handle = None
+
+        super().close()
+
+
+class _StoredMemberStream(_MemberStream):
+    def __init__(self, *args: Any) -> None:
+        super().__init__(*args)
+
+        self._position = 0
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += self._info.file_size
+        elif whence != os.SEEK_SET:
+            raise ValueError(f"Invalid whence ({whence})")
+
+        if offset < 0:
+            raise ValueError(f"Negative seek position {offset}")
+
+        if offset != self._position:
+            self._crc = None
+
+        self._position = offset
+        return offset
+
+    def readinto(self, buffer: Any) -> int:
+        size = min(len(buffer), self._info.file_size - self._position)
+        if size <= 0:
+            return 0
+
+        data = self._read_at(self._position, size)
+        if len(data) != size:
+            raise EOFError(f"Member {self._info.filename!r} is truncated")
+
+        buffer[:size] = data
+        self._position += size
+        self._update_crc(data, self._position == self._info.file_size)
+
+        return size
+
+
+class _DeflatedMemberStream(_MemberStream):
+    def __init__(self, *args: Any) -> None:
+        super().__init__(*args)
+
+        self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        # position in the compressed data
+        self._compressed_position = 0
+        self._size = 0
+
+    def readinto(self, buffer: Any) -> int:
+        decompressor = self._decompressor
+
+        if len(buffer) == 0:
+            return 0
+
+        while not decompressor.eof:
+            if decompressor.unconsumed_tail:
+                chunk = decompressor.unconsumed_tail
+            else:
+                size = min(MEMBER_STREAM_CHUNK_SIZE, self._info.compress_size - self._compressed_position)
+                chunk = self._read_at(self._compressed_position, size) if size > 0 else b""
+
+                if not chunk:
+                    raise EOFError(f"Compressed data of member {self._info.filename!r} ended unexpectedly")
+
+                self._compressed_position += len(chunk)
+
+            # output is limited to the size of the buffer, rest of the input is kept in unconsumed_tail
+            data = decompressor.decompress(chunk, len(buffer))
+
+            if data:
+                size = len(data)
+                buffer[:size] = data
+                self._size += size
+                self._update_crc(data, decompressor.eof)
+
+                return size
+
+        self._update_crc(b"", True)
+
+        if self._size != self._info.file_size:
+            raise zipfile.BadZipFile(f"Bad size of file {self._info.filename!r}")
+
+        return 0
+
+
+def get_archive_pool(archive: zipfile.ZipFile, max_handles: int = DEFAULT_ARCHIVE_HANDLES) -> ArchiveHandlePool:
+    """Return pool of file handles of the archive, it is created when it is needed for the first time.
+
+    :param archive: Opened ZIP archive.
+    :param max_handles: How many unused handles are kept open, when the pool is created.
+    :returns: Pool shared by everyone reading from the archive.
+    :raises ValueError: If the archive was already closed.
+    """
+    if archive.fp is None:
+        raise ValueError("Attempt to read ZIP archive that was already closed")
+
+    with _pools_lock:
+        pool = _pools.get(archive)
+
+        if pool is None:
+            pool = _pools[archive] = ArchiveHandlePool(archive, max_handles=max_handles)
+
+    return pool
+
+
+def close_archive(archive: zipfile.ZipFile | Directory) -> None:
+    """Close the archive together with its pool of file handles and its memory map.
+
+    Memory map which is still used by views of the content (items read with ``zero_copy``) can not be
+    closed, it is unmapped when the last view is released.
+
+    :param archive: Opened ZIP archive or directory.
+    """
+    if isinstance(archive, zipfile.ZipFile):
+        with _pools_lock:
+            pool = _pools.pop(archive, None)
+            mapping = _mappings.pop(archive, None)
+
+        if pool is not None:
+            pool.close()
+
+        if mapping is not None:
+            try:
+                mapping.close()
+            except BufferError:
+                pass
+
+    archive.close()
@@ -17,39 +17,90 @@
 """EpubWriter - serialises an EpubBook to an EPUB file."""
 
 import datetime
+import hashlib
 import logging
 import os
 import os.path
 import posixpath as zip_path
+import re
+import tempfile
 import zipfile
+import zlib
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from types import MappingProxyType
 from typing import IO, Any, Protocol, TypeAlias, cast
+from urllib.parse import quote, unquote, urlsplit, urlunsplit
 
 from lxml import etree
 
 import ebooklib
 from ebooklib.book import EpubBook
-from ebooklib.consts import CONTAINER_PATH, CONTAINER_XML, NAMESPACES
+from ebooklib.consts import COMPRESSED_MEDIA_TYPES, CONTAINER_PATH, CONTAINER_XML, NAMESPACES
 from ebooklib.items import EpubCover, EpubHtml, EpubItem, EpubNav, EpubNcx
+from ebooklib.reader import read_epub
 from ebooklib.toc import Link, Section
-from ebooklib.utils import get_pages_for_items, parse_string
+from ebooklib.tracing import trace_span
+from ebooklib.utils import ArchiveMember, get_pages_for_items, parse_string
 
 logger = logging.getLogger(__name__)
 
+# With the compression_trial option, content is stored without compression when deflating
+# its first COMPRESSION_TRIAL_SIZE bytes does not make them smaller than this ratio.
+COMPRESSION_TRIAL_SIZE = 16 * 1024
+COMPRESSION_TRIAL_RATIO = 0.95
 
-class _WritableFile(Protocol):
-    """Minimal structural interface required by zipfile.ZipFile for writing."""
+# With the deduplicate option, references to removed duplicates are replaced in items of these media types
+_REFERENCING_XML_TYPES = ("application/xhtml+xml", "image/svg+xml", "application/smil+xml", "application/x-dtbncx+xml")
+_REFERENCING_CSS_TYPES = ("text/css",)
+_REFERENCE_ATTRIBUTES = ("href", "src", "poster")
+_CSS_REFERENCE = re.compile(r"""(url\(\s*(['"]?))([^'")]+)(\2\s*\))|(@import\s+(['"]))([^'"]+)(\6)""")
 
-    def write(self, data: bytes, /) -> object: ...
 
-    def seek(self, offset: int, whence: int = ..., /) -> object: ...
+class _WritableFile(Protocol):
+    """
+    Minimal structural interface required by zipfile.ZipFile for writing. Targets without seek() and tell(),
+    like sockets or pipes, are supported as well; zipfile then writes sizes and CRC after the member data.
+    """
 
-    def tell(self) -> int: ...
+    def write(self, data: bytes, /) -> object: ...
 
 
 # Anything accepted by zipfile.ZipFile: a path or a writable binary file-like object.
 EpubTarget: TypeAlias = str | os.PathLike[str] | _WritableFile
 
 
+# Private attributes of ZipFile used for adding already compressed members, the same ones
+# ZipFile.open(mode="w") uses. Without them members are always written with writestr().
+_RAW_WRITE_ATTRIBUTES = (
+    "_lock",
+    "_allowZip64",
+    "_writing",
+    "_seekable",
+    "_writecheck",
+    "_didModify",
+    "start_dir",
+    "filelist",
+    "NameToInfo",
+    "fp",
+)
+
+
+def _is_seekable(fp: Any) -> bool:
+    try:
+        fp.seek(fp.tell())
+    except (AttributeError, OSError, ValueError):
+        return False
+
+    return True
+
+
+# compressed data of an archive member with its CRC and uncompressed size
+_MemberFuture: TypeAlias = "Future[tuple[bytes | memoryview, int, int]]"
+
+
 class EpubWriter:
     DEFAULT_OPTIONS: dict[str, Any] = {
         "epub2_guide": True,
@@ -62,6 +113,15 @@ class EpubWriter:
         "play_order": {"enabled": False, "start_from": 1},
         "raise_exceptions": True,
         "compresslevel": 6,
+        "compress_workers": 1,
+        "copy_unchanged": True,
+        "copy_unchanged_documents": False,
+        # read-only, default options are shared by all writers
+        "compression_policy": MappingProxyType(dict.fromkeys(COMPRESSED_MEDIA_TYPES)),
+        "compression_trial": False,
+        "deduplicate": False,
+        "compression_cache": None,
+        "trace": None,
     }
 
     @classmethod
@@ -98,6 +158,18 @@ class EpubWriter:
         if options:
             self.options.update(options)
 
+        # with the deduplicate option, file names of the removed duplicates and of the items kept instead of them
+        self.duplicates: dict[str, str] = {}
+        self.saved_bytes = 0
+
+        self._duplicate_items: set[EpubItem] = set()
+        self._duplicate_names: tuple[bytes, ...] = ()
+
+        # if already compressed members can be added to the archive, see _write_compressed()
+        self._raw_writes: bool | None = None
+        # if the archive is written to a seekable file, set when writing starts
+        self._out_seekable = True
+
         self._init_play_order()
 
     def _init_play_order(self) -> None:
@@ -109,21 +181,25 @@ class EpubWriter:
         except KeyError:
             pass
 
+    def _span(self, phase: str, name: str | None = None):
+        return trace_span(self.options.get("trace"), phase, name)
+
     def process(self) -> None:
-        # should cache this html parsing so we don't do it for every plugin
         for plg in self.options.get("plugins", []):
             if hasattr(plg, "before_write"):
-                plg.before_write(self.book)
+                with self._span(f"{type(plg).__name__}.before_write"):
+                    plg.before_write(self.book)
 
         for item in self.book.get_items():
             if isinstance(item, EpubHtml):
                 for plg in self.options.get("plugins", []):
                     if hasattr(plg, "html_before_write"):
-                        plg.html_before_write(self.book, item)
+                        with self._span(f"{type(plg).__name__}.html_before_write", item.file_name):
+                            plg.html_before_write(self.book, item)
 
     def _write_container(self) -> None:
         container_xml = CONTAINER_XML % {"folder_name": self.book.FOLDER_NAME}
-        self.out.writestr(self.zipinfo(CONTAINER_PATH), container_xml)
+        self._writestr(self.zipinfo(CONTAINER_PATH), container_xml, self.options["compresslevel"])
 
     def _write_opf_metadata(self, root: etree._Element) -> None:
         nsmap = {"dc": NAMESPACES["DC"], "opf": NAMESPACES["OPF"]}
@@ -171,7 +247,7 @@ class EpubWriter:
         # cover-image
 
         for item in self.book.get_items():
-            if not item.manifest:
+            if not item.manifest or item in self._duplicate_items:
                 continue
 
             item_id = item.id or ""
@@ -270,6 +346,9 @@ class EpubWriter:
                     _href = item.get("href", "")
                     _title = item.get("title", "")
 
+                if _href and self.duplicates:
+                    _href = self._replace_reference(_href, "")
+
                 _ref = etree.SubElement(
                     guide, "reference", {"type": item.get("type", ""), "title": _title or "", "href": _href or ""}
                 )
@@ -283,7 +362,7 @@ class EpubWriter:
     def _write_opf_file(self, root: etree._Element) -> None:
         tree_str = etree.tostring(root, pretty_print=True, encoding="utf-8", xml_declaration=True)
 
-        self.out.writestr(self.zipinfo(f"{self.book.FOLDER_NAME}/content.opf"), tree_str)
+        self._writestr(self.zipinfo(f"{self.book.FOLDER_NAME}/content.opf"), tree_str, self.options["compresslevel"])
 
     def _write_opf(self) -> None:
         package_attributes = {
@@ -319,7 +398,7 @@ class EpubWriter:
 
     def _get_nav(self, item: EpubNav) -> bytes:
         # just a basic navigation for now
-        nav_xml = parse_string(self.book.get_template("nav") or b"")
+        nav_xml = self.book.get_template_tree("nav") or parse_string(b"")
         root = nav_xml.getroot()
 
         root.set("lang", self.book.language)
@@ -424,9 +503,10 @@ class EpubWriter:
 
         # PAGE-LIST
         if self.options.get("epub3_pages"):
-            inserted_pages = get_pages_for_items(
-                [item for item in self.book.get_items_of_type(ebooklib.ITEM_DOCUMENT) if not isinstance(item, EpubNav)]
-            )
+            with self._span("page_list", item.file_name):
+                inserted_pages = get_pages_for_items(
+                    [doc for doc in self.book.get_items_of_type(ebooklib.ITEM_DOCUMENT) if not isinstance(doc, EpubNav)]
+                )
 
             if len(inserted_pages) > 0:
                 pagelist_nav = etree.SubElement(
@@ -442,18 +522,26 @@ class EpubWriter:
                 pagelist_content_title.text = self.options.get("pages_title", "Pages")
 
                 pages_ol = etree.SubElement(pagelist_nav, "ol")
+                # documents have many pages, relative path is found only once for every document
+                relpaths: dict[str, str] = {}
 
                 for filename, pageref, label in inserted_pages:
                     li_item = etree.SubElement(pages_ol, "li")
 
-                    _href = f"{filename}#{pageref}"
+                    if "/" in pageref:
+                        _href = zip_path.relpath(f"{filename}#{pageref}", nav_dir_name)
+                    else:
+                        if filename not in relpaths:
+                            relpaths[filename] = zip_path.relpath(filename, nav_dir_name)
+
+                        _href = f"{relpaths[filename]}#{pageref}"
                     _title = label
 
                     a_item = etree.SubElement(
                         li_item,
                         "a",
                         {
-                            "href": zip_path.relpath(_href, nav_dir_name),
+                            "href": _href,
                         },
                     )
                     a_item.text = _title
@@ -464,7 +552,7 @@ class EpubWriter:
 
     def _get_ncx(self) -> bytes:
         # we should be able to setup language for NCX as also
-        ncx = parse_string(self.book.get_template("ncx") or b"")
+        ncx = self.book.get_template_tree("ncx") or parse_string(b"")
         root = ncx.getroot()
 
         head = etree.SubElement(root, "head")
@@ -561,31 +649,523 @@ class EpubWriter:
 
         return tree_str
 
-    def _write_items(self) -> None:
+    def _writestr(self, zinfo: zipfile.ZipInfo, data: str | bytes | memoryview, compresslevel: int | None) -> None:
+        # writestr() takes compression settings from the ZipInfo and not from the ZipFile,
+        # so they have to be passed explicitly. None as compresslevel stores data without compression.
+        if compresslevel is None and not self._out_seekable and self._can_write_raw():
+            # On non-seekable targets writestr() adds a data descriptor after the member. Stored members
+            # are written with known CRC and size instead, so streaming readers know where they end.
+            content = data.encode("utf-8") if isinstance(data, str) else data
+            self._write_compressed(zinfo, content, zlib.crc32(content), len(content), zipfile.ZIP_STORED)
+        elif compresslevel is None:
+            self.out.writestr(zinfo, data, compress_type=zipfile.ZIP_STORED)
+        else:
+            self.out.writestr(zinfo, data, compress_type=zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+
+    def _write_compressed(
+        self,
+        zinfo: zipfile.ZipInfo,
+        data: bytes | memoryview,
+        crc: int,
+        file_size: int,
+        compress_type: int = zipfile.ZIP_DEFLATED,
+    ) -> None:
+        """
+        Adds already compressed data to the archive as a new member.
+
+        zipfile has no public API for this, so this does the same as ZipFile.open(mode="w"), except that
+        CRC and sizes are known in advance and the local header can be written with the correct values.
+        Used only for copying unchanged members, for parallel compression and for the compression cache.
+        When this version of zipfile does not have the needed private attributes, data is decompressed
+        and written with writestr().
+        """
+        if not self._can_write_raw():
+            content = bytes(data) if compress_type == zipfile.ZIP_STORED else zlib.decompress(data, -15)
+            compresslevel = None if compress_type == zipfile.ZIP_STORED else self.options["compresslevel"]
+
+            self._writestr(zinfo, content, compresslevel)
+            return
+
+        # uses private attributes of ZipFile, the same ones ZipFile.open(mode="w") uses
+        out = cast("Any", self.out)
+
+        zinfo.compress_type = compress_type
+        zinfo.file_size = file_size
+        zinfo.compress_size = len(data)
+        zinfo.CRC = crc
+        zinfo.flag_bits = 0x00
+        if not zinfo.external_attr:
+            zinfo.external_attr = 0o600 << 16
+
+        # same rule as zipfile uses for adding the zip64 extra field
+        zip64 = file_size * 1.05 > zipfile.ZIP64_LIMIT or len(data) > zipfile.ZIP64_LIMIT
+
+        with out._lock:
+            if not out._allowZip64 and zip64:
+                raise zipfile.LargeZipFile("Filesize would require ZIP64 extensions")
+
+            if out._writing:
+                raise ValueError("Can't write to the ZIP file while there is an open writing handle.")
+
+            if out._seekable:
+                out.fp.seek(out.start_dir)
+
+            zinfo.header_offset = out.fp.tell()
+            out._writecheck(zinfo)
+            out._didModify = True
+
+            out.fp.write(zinfo.FileHeader(zip64))
+            out.fp.write(data)
+            out.start_dir = out.fp.tell()
+
+            out.filelist.append(zinfo)
+            out.NameToInfo[zinfo.filename] = zinfo
+
+    def _can_write_raw(self) -> bool:
+        if self._raw_writes is None:
+            self._raw_writes = all(hasattr(self.out, name) for name in _RAW_WRITE_ATTRIBUTES)
+
+            if not self._raw_writes:
+                logger.warning("Unsupported version of zipfile, members are compressed with writestr().")
+
+        return self._raw_writes
+
+    @staticmethod
+    def _compress(data: bytes | memoryview, compresslevel: int) -> tuple[bytes, int, int]:
+        # raw deflate stream, same as zipfile produces for ZIP_DEFLATED members
+        compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+        compressed = compressor.compress(data) + compressor.flush()
+
+        return compressed, zlib.crc32(data), len(data)
+
+    def _compress_member(self, name: str, data: bytes | memoryview, compresslevel: int) -> tuple[bytes, int, int]:
+        cache = self.options.get("compression_cache")
+
+        key = None
+        if cache is not None and len(data) >= cache.min_size:
+            key = cache.get_key(data, compresslevel)
+
+            with self._span("cache_get", name) as span:
+                cached = cache.get(key)
+
+                if cached is not None:
+                    span.size = len(cached[0])
+                    return cached
+
+        with self._span("compress", name) as span:
+            span.size = len(data)
+            member = self._compress(data, compresslevel)
+
+        if cache is not None and key is not None:
+            with self._span("cache_put", name) as span:
+                span.size = len(member[0])
+                cache.put(key, *member)
+
+        return member
+
+    def _get_compresslevel(self, item: EpubItem, data: str | bytes | memoryview) -> int | None:
+        """
+        Returns deflate level for the item, or None if the item should be stored without compression.
+        """
+        policy = self.options.get("compression_policy") or {}
+
+        if item.media_type in policy:
+            return policy[item.media_type]
+
+        item_type = item.get_type()
+        if item_type in policy:
+            return policy[item_type]
+
+        if self.options.get("compression_trial") and len(data) >= COMPRESSION_TRIAL_SIZE:
+            # deflate the beginning of the content and store it if that saves almost nothing
+            sample = data[:COMPRESSION_TRIAL_SIZE]
+            if isinstance(sample, str):
+                sample = sample.encode("utf-8")
+
+            if len(zlib.compress(sample, 1)) > len(sample) * COMPRESSION_TRIAL_RATIO:
+                return None
+
+        return self.options["compresslevel"]
+
+    def _write_stream(
+        self, zinfo: zipfile.ZipInfo, chunks: Iterable[bytes], compresslevel: int | None, size: int | None
+    ) -> None:
+        if compresslevel is None:
+            zinfo.compress_type = zipfile.ZIP_STORED
+        else:
+            zinfo.compress_type = zipfile.ZIP_DEFLATED
+            # compression level of a member opened for writing is public only since Python 3.13
+            if hasattr(zinfo, "compress_level"):
+                cast("Any", zinfo).compress_level = compresslevel
+            else:
+                cast("Any", zinfo)._compresslevel = compresslevel
+
+        # without known size member has to be ready for more than 4GB of data
+        zinfo.file_size = size or 0
+
+        with self._span("compress", zinfo.filename) as span:
+            written = 0
+
+            with self.out.open(zinfo, "w", force_zip64=size is None) as dest:
+                for chunk in chunks:
+                    dest.write(chunk)
+                    written += len(chunk)
+
+            span.size = written
+
+    def _get_pinned_ids(self) -> set[str]:
+        # items referenced by id from the package document can not be removed
+        pinned: set[str] = set()
+
+        for entry in self.book.spine:
+            spine_item = entry[0] if isinstance(entry, tuple) else entry
+            pinned.add(spine_item.get_id() if isinstance(spine_item, EpubItem) else spine_item)
+
+        for item in self.book.get_items():
+            if isinstance(item, EpubHtml) and item.media_overlay:
+                pinned.add(item.media_overlay)
+
+        for values in self.book.metadata.values():
+            for name, values2 in values.items():
+                for _, others in values2:
+                    others = others or {}
+
+                    if name == "meta" and others.get("name") == "cover" and others.get("content"):
+                        pinned.add(others["content"])
+
+                    if others.get("refines", "").startswith("#"):
+                        pinned.add(others["refines"][1:])
+
+        return pinned
+
+    @staticmethod
+    def _get_content_size(item: EpubItem) -> int | None:
+        if item.has_content_provider():
+            return item.get_provided_size()
+
+        source = item.get_source()
+        if source is not None and not item.is_loaded() and source.info is not None:
+            return source.info.file_size
+
+        content = item.get_content()
+        return len(content.encode("utf-8") if isinstance(content, str) else content)
+
+    @staticmethod
+    def _hash_content(item: EpubItem) -> bytes:
+        digest = hashlib.sha256()
+        source = item.get_source()
+
+        if source is not None and not item.is_loaded():
+            # content of lazily loaded items is not kept in memory only because of the hash
+            digest.update(source.read())
+        else:
+            for chunk in item.iter_content():
+                digest.update(chunk)
+
+        return digest.digest()
+
+    def _find_duplicates(self) -> None:
+        """
+        Finds items with the same content. Only the first of them is written, or the one which is referenced
+        by id from the package document, and references to the others are replaced with its file name.
+        Content is hashed only for items which have the same size as some other item.
+        """
+        pinned = self._get_pinned_ids()
+        by_size: dict[int | None, list[EpubItem]] = {}
+
         for item in self.book.get_items():
+            # documents and navigation generate their content, so only resources are compared
+            if not item.manifest or isinstance(item, EpubNcx) or type(item).get_content is not EpubItem.get_content:
+                continue
+
+            by_size.setdefault(self._get_content_size(item), []).append(item)
+
+        for items in by_size.values():
+            if len(items) < 2:
+                continue
+
+            by_hash: dict[bytes, list[EpubItem]] = {}
+            for item in items:
+                by_hash.setdefault(self._hash_content(item), []).append(item)
+
+            for same in by_hash.values():
+                kept = [item for item in same if isinstance(item, EpubCover) or item.id in pinned] or same[:1]
+
+                for item in same:
+                    if item in kept:
+                        continue
+
+                    self._duplicate_items.add(item)
+                    self.duplicates[item.file_name] = kept[0].file_name
+                    self.saved_bytes += self._get_content_size(item) or 0
+
+        names = {zip_path.basename(file_name) for file_name in self.duplicates}
+        self._duplicate_names = tuple(name.encode("utf-8") for name in names | {quote(name) for name in names} if name)
+
+        if self.duplicates:
+            logger.info(f"Removed {len(self.duplicates)} duplicate items, saved {self.saved_bytes} bytes.")
+
+    def _replace_reference(self, href: str, base: str) -> str:
+        parts = urlsplit(href)
+        if parts.scheme or parts.netloc or not parts.path:
+            return href
+
+        kept = self.duplicates.get(zip_path.normpath(zip_path.join(base, unquote(parts.path))))
+        if kept is None:
+            return href
+
+        return urlunsplit(("", "", quote(zip_path.relpath(kept, base or ".")), parts.query, parts.fragment))
+
+    def _replace_css_references(self, css: str, base: str) -> str:
+        def _replace(match: re.Match) -> str:
+            if match.group(3) is not None:
+                return match.group(1) + self._replace_reference(match.group(3).strip(), base) + match.group(4)
+
+            return match.group(5) + self._replace_reference(match.group(7), base) + match.group(8)
+
+        return _CSS_REFERENCE.sub(_replace, css)
+
+    def _replace_references(self, item: EpubItem, data: str | bytes | memoryview) -> bytes:
+        """
+        Returns content of the item with references to removed duplicates replaced.
+        """
+        content = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+
+        # most of the items do not mention any of the removed files
+        if not any(name in content for name in self._duplicate_names):
+            return content
+
+        base = zip_path.dirname(item.file_name)
+
+        if item.media_type in _REFERENCING_CSS_TYPES:
+            return self._replace_css_references(content.decode("utf-8"), base).encode("utf-8")
+
+        try:
+            tree = parse_string(content)
+        except etree.XMLSyntaxError:
+            logger.warning(f"Could not replace references to duplicates in {item.file_name}.")
+            return content
+
+        for elem in tree.iter(etree.Element):
+            for name, value in cast("list[tuple[str, str]]", elem.items()):
+                local_name = etree.QName(name).localname
+
+                if local_name in _REFERENCE_ATTRIBUTES:
+                    elem.set(name, self._replace_reference(value, base))
+                elif local_name == "style":
+                    elem.set(name, self._replace_css_references(value, base))
+
+            if etree.QName(elem).localname == "style" and elem.text:
+                elem.text = self._replace_css_references(elem.text, base)
+
+        return etree.tostring(tree, encoding="utf-8", xml_declaration=content.lstrip().startswith(b"<?xml"))
+
+    def _get_item_data(self, item: EpubItem) -> str | bytes | memoryview | ArchiveMember:
+        # Content of items which were read from an archive and not changed since then can be copied
+        # without decompressing and compressing it again. Items which generate their content on write
+        # (documents, navigation) always have to be written again.
+        source = item.get_source()
+
+        if self.options.get("copy_unchanged") and source is not None and source.can_read_raw():
+            if type(item).get_content is EpubItem.get_content:
+                return source
+
+            # Documents are generated from the template, title, links and body of the original file.
+            # Copying them as they are keeps the original file, but changes of the title or links
+            # which were made without setting the content are lost.
+            if self.options.get("copy_unchanged_documents") and isinstance(item, EpubHtml):
+                return source
+
+        # content read with zero_copy is written without copying it
+        return item.get_buffer()
+
+    def _get_item_members(
+        self,
+    ) -> Iterator[tuple[zipfile.ZipInfo, str | bytes | memoryview | ArchiveMember | EpubItem, int | None]]:
+        for item in self.book.get_items():
+            data: str | bytes | memoryview | ArchiveMember
+
+            if item in self._duplicate_items:
+                continue
+
+            if item.manifest:
+                zinfo = self.zipinfo(f"{self.book.FOLDER_NAME}/{item.file_name}")
+            else:
+                zinfo = self.zipinfo(item.file_name)
+
+            if item.has_content_provider() and type(item).get_content is EpubItem.get_content:
+                # content is streamed to the archive in chunks, only a sample is needed for the trial compression
+                sample = b""
+                if self.options.get("compression_trial"):
+                    chunks = item.iter_content(COMPRESSION_TRIAL_SIZE)
+                    sample = next(chunks, b"")
+                    chunks.close()
+
+                yield zinfo, item, self._get_compresslevel(item, sample)
+                continue
+
+            get_data: Callable[[], str | bytes | memoryview | ArchiveMember]
+
             if isinstance(item, EpubNcx):
-                self.out.writestr(self.zipinfo(f"{self.book.FOLDER_NAME}/{item.file_name}"), self._get_ncx())
+                phase, get_data = "get_ncx", self._get_ncx
             elif isinstance(item, EpubNav):
-                self.out.writestr(self.zipinfo(f"{self.book.FOLDER_NAME}/{item.file_name}"), self._get_nav(item))
-            elif item.manifest:
-                self.out.writestr(self.zipinfo(f"{self.book.FOLDER_NAME}/{item.file_name}"), item.get_content())
+                phase, get_data = "get_nav", partial(self._get_nav, item)
+            else:
+                phase, get_data = "get_content", partial(self._get_item_data, item)
+
+            with self._span(phase, item.file_name) as span:
+                data = get_data()
+
+                if self.duplicates and item.media_type in _REFERENCING_XML_TYPES + _REFERENCING_CSS_TYPES:
+                    data = self._replace_references(item, data.read() if isinstance(data, ArchiveMember) else data)
+
+                if not isinstance(data, ArchiveMember):
+                    span.size = len(data)
+
+            if isinstance(data, ArchiveMember):
+                # copied as it is, compression level does not matter
+                yield zinfo, data, None
             else:
-                self.out.writestr(self.zipinfo(item.file_name), item.get_content())
+                yield zinfo, data, self._get_compresslevel(item, data)
+
+    def _copy_member(self, zinfo: zipfile.ZipInfo, source: ArchiveMember) -> None:
+        info = cast("zipfile.ZipInfo", source.info)
+
+        with self._span("copy", zinfo.filename) as span:
+            span.size = info.compress_size
+            self._write_compressed(zinfo, source.read_raw(), info.CRC, info.file_size, info.compress_type)
+
+    def _write_items(self) -> None:
+        workers = self.options.get("compress_workers") or 1
+
+        if workers > 1 and self._can_write_raw():
+            self._write_items_parallel(workers)
+        else:
+            for zinfo, data, compresslevel in self._get_item_members():
+                if isinstance(data, ArchiveMember):
+                    self._copy_member(zinfo, data)
+                elif isinstance(data, EpubItem):
+                    self._write_stream(zinfo, data.iter_content(), compresslevel, data.get_provided_size())
+                elif (
+                    compresslevel is not None
+                    and self.options.get("compression_cache") is not None
+                    and self._can_write_raw()
+                ):
+                    content = data.encode("utf-8") if isinstance(data, str) else data
+                    self._write_compressed(zinfo, *self._compress_member(zinfo.filename, content, compresslevel))
+                else:
+                    with self._span("compress", zinfo.filename) as span:
+                        self._writestr(zinfo, data, compresslevel)
+                        span.size = zinfo.file_size
+
+    def _write_items_parallel(self, workers: int) -> None:
+        # Members are compressed in a thread pool (zlib releases the GIL) while the next item content is
+        # being generated. Compressed members are written in the original order and only a limited number
+        # of them is kept in memory.
+        pending: deque[tuple[zipfile.ZipInfo, _MemberFuture, int]] = deque()
+
+        def _write_next():
+            zinfo, future, compress_type = pending.popleft()
+            self._write_compressed(zinfo, *future.result(), compress_type=compress_type)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            try:
+                for zinfo, data, compresslevel in self._get_item_members():
+                    if isinstance(data, EpubItem):
+                        # streamed content is written directly, members before it have to be written first
+                        while pending:
+                            _write_next()
+
+                        self._write_stream(zinfo, data.iter_content(), compresslevel, data.get_provided_size())
+                        continue
+
+                    if isinstance(data, ArchiveMember):
+                        # unchanged member is copied as it is, it only has to wait for its turn
+                        info = cast("zipfile.ZipInfo", data.info)
+                        copied: _MemberFuture = Future()
+
+                        with self._span("copy", zinfo.filename) as span:
+                            span.size = info.compress_size
+                            copied.set_result((data.read_raw(), info.CRC, info.file_size))
+
+                        pending.append((zinfo, copied, info.compress_type))
+                    elif compresslevel is None:
+                        content = data.encode("utf-8") if isinstance(data, str) else data
+                        stored: _MemberFuture = Future()
+                        stored.set_result((content, zlib.crc32(content), len(content)))
+
+                        pending.append((zinfo, stored, zipfile.ZIP_STORED))
+                    else:
+                        content = data.encode("utf-8") if isinstance(data, str) else data
+                        future = executor.submit(self._compress_member, zinfo.filename, content, compresslevel)
+
+                        pending.append((zinfo, cast("_MemberFuture", future), zipfile.ZIP_DEFLATED))
+
+                    if len(pending) >= workers * 2:
+                        _write_next()
+
+                while pending:
+                    _write_next()
+            finally:
+                for _, future, _ in pending:
+                    future.cancel()
+
+    def _writes_source_file(self) -> bool:
+        # items of lazily loaded and zero copy books are read from their file while the new one is written
+        source = self.book._source_file
+        if source is None or not isinstance(self.file_name, str | os.PathLike):
+            return False
+
+        try:
+            return os.path.samefile(self.file_name, source)
+        except OSError:
+            return False
 
     def write(self) -> None:
-        # zipfile stubs expect IO[bytes], but any object with write/seek/tell works
-        target = cast("str | os.PathLike[str] | IO[bytes]", self.file_name)
+        if self._writes_source_file():
+            _replace_file(cast("str | os.PathLike[str]", self.file_name), self._write)
+        else:
+            self._write(self.file_name)
+
+    def _write(self, name: EpubTarget) -> None:
+        # zipfile stubs expect IO[bytes], but any object with write works
+        target = cast("str | os.PathLike[str] | IO[bytes]", name)
         self.out = zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED, compresslevel=self.options["compresslevel"])
+        self._out_seekable = _is_seekable(self.out.fp)
         try:
-            self.out.writestr("mimetype", "application/epub+zip", compress_type=zipfile.ZIP_STORED)
+            self._writestr(self.zipinfo("mimetype"), b"application/epub+zip", None)
+
+            if self.options.get("deduplicate"):
+                with self._span("deduplicate") as span:
+                    self._find_duplicates()
+                    span.size = self.saved_bytes
 
-            self._write_container()
-            self._write_opf()
+            with self._span("write_container"):
+                self._write_container()
+            with self._span("write_opf"):
+                self._write_opf()
             self._write_items()
         finally:
             self.out.close()
 
 
+def _replace_file(name: str | os.PathLike[str], write: Callable[[str], object]) -> None:
+    # new file is written next to the original one and replaces it only when it is complete
+    fd, temp_name = tempfile.mkstemp(prefix=".ebooklib-", suffix=".epub", dir=os.path.dirname(os.path.abspath(name)))
+    os.close(fd)
+
+    try:
+        write(temp_name)
+
+        if os.path.exists(name):
+            os.chmod(temp_name, os.stat(name).st_mode & 0o7777)
+
+        os.replace(temp_name, name)
+    except BaseException:
+        os.remove(temp_name)
+        raise
+
+
 def write_epub(name: EpubTarget, book: EpubBook, options: dict[str, Any] | None = None) -> bool:
     """
     Creates epub file with the content defined in EpubBook.
@@ -610,3 +1190,55 @@ def write_epub(name: EpubTarget, book: EpubBook, options: dict[str, Any] | None
             return False
 
     return True
+
+
+def update_epub(
+    name: str | os.PathLike[str],
+    update: Callable[[EpubBook], object],
+    output: EpubTarget | None = None,
+    options: dict[str, Any] | None = None,
+) -> None:
+    """
+    Applies changes to an existing EPUB file and writes it again. The book is loaded lazily and passed to
+    the update function, which changes it using the usual EpubBook and EpubItem methods (set content of the
+    items, add or remove items, change metadata). Only the package document, navigation, NCX and items whose
+    content was changed are generated again, all other members are copied from the original archive
+    without decompressing them.
+
+    >>> def set_title(book):
+    ...     book.set_unique_metadata('DC', 'title', 'New title')
+    >>> ebooklib.update_epub('book.epub', set_title)
+
+    Documents are copied as they are as long as their content is not set, so changes of their title, links
+    or metadata have to be done in the content itself.
+
+    :Args:
+      - name: full path to the input file
+      - update: Function which gets the EpubBook and changes it
+      - output: File name or file-like object for the new file, original file is replaced if not defined (optional)
+      - options: extra options for the reader and the writer as dictionary (optional)
+    """
+    options = dict(options or {})
+    options.update({"lazy_load": True, "raise_exceptions": True})
+    options.setdefault("copy_unchanged", True)
+    options.setdefault("copy_unchanged_documents", True)
+
+    if output is not None:
+        with read_epub(name, options) as book:
+            update(book)
+
+            writer = EpubWriter(output, book, options)
+            writer.process()
+            writer.write()
+
+        return
+
+    def _update(temp_name: str) -> None:
+        with read_epub(name, options) as book:
+            update(book)
+
+            writer = EpubWriter(temp_name, book, options)
+            writer.process()
+            writer.write()
+
+    _replace_file(name, _update)
@@ -1,7 +1,10 @@
+import asyncio
+import datetime
 import io
 import logging
 import os
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import cast
 
@@ -9,8 +12,9 @@ import pytest
 from lxml import etree
 
 import ebooklib
-from ebooklib import epub
-from ebooklib.plugins import booktype, sourcecode, standard
+from ebooklib import epub, utils
+from ebooklib.plugins import booktype, sourcecode, standard, tidyhtml
+from ebooklib.plugins.base import BasePlugin
 from ebooklib.utils import parse_html_string, parse_string
 
 logger = logging.getLogger(__name__)
@@ -127,6 +131,684 @@ class TestEbook:
         bk = epub.read_epub(f, {"ignore_ncx": True})
         assert len(bk.toc) == 0
 
+    def test_lazy_load(self):
+        book = self._create_basic_book()
+
+        f = io.BytesIO()
+        epub.write_epub(f, book, {})
+        f.seek(0)
+
+        with epub.read_epub(f, {"lazy_load": True}) as lazy_book:
+            self._test_basic_book(lazy_book)
+
+            style = lazy_book.get_item_with_id("style")
+            cover = lazy_book.get_item_with_id("cover-img")
+            assert style is not None and cover is not None
+            assert not style.is_loaded()
+
+            assert style.get_content() == b"BODY { color: black; }"
+            assert style.is_loaded()
+
+        # content which was accessed before closing stays available
+        assert style.get_content() == b"BODY { color: black; }"
+
+        with pytest.raises(ValueError):
+            cover.get_content()
+
+    def test_open_item(self, tmp_path):
+        book = self._create_basic_book()
+        audio = os.urandom(100000)
+        book.add_item(epub.EpubItem(uid="audio", file_name="audio.mp3", media_type="audio/mpeg", content=audio))
+
+        file_name = str(tmp_path / "open_item.epub")
+        epub.write_epub(file_name, book)
+
+        with epub.read_epub(file_name, {"lazy_load": True}) as lazy_book:
+            # stored without compression, read directly from the archive
+            with lazy_book.open_item("audio.mp3") as f:
+                assert f.seekable()
+                f.seek(50000)
+                assert f.read(10) == audio[50000:50010]
+
+            # deflated, decompressed while it is read
+            with lazy_book.open_item("style.css") as f:
+                assert not f.seekable()
+                assert f.read() == b"BODY { color: black; }"
+
+            def _read(_):
+                with lazy_book.open_item("audio.mp3") as f:
+                    return f.read()
+
+            with ThreadPoolExecutor(4) as executor:
+                assert list(executor.map(_read, range(8))) == [audio] * 8
+
+            style = lazy_book.get_item_with_id("style")
+            assert style is not None
+            style.set_content(b"BODY { color: red; }")
+
+            with lazy_book.open_item("style.css") as f:
+                assert f.read() == b"BODY { color: red; }"
+
+            with pytest.raises(KeyError):
+                lazy_book.open_item("missing.css")
+
+        assert lazy_book._archive is None
+
+    @pytest.mark.parametrize("copy_unchanged", [False, True])
+    def test_lazy_load_write_to_source(self, tmp_path, copy_unchanged):
+        book = self._create_basic_book()
+        book.add_item(epub.EpubItem(uid="data", file_name="data.txt", media_type="text/plain", content=b"x" * 10000))
+
+        file_name = str(tmp_path / "source.epub")
+        epub.write_epub(file_name, book, {})
+
+        # items are still read from the file while it is written again
+        with epub.read_epub(file_name, {"lazy_load": True}) as lazy_book:
+            options = {"copy_unchanged": copy_unchanged, "raise_exceptions": True}
+            assert epub.write_epub(file_name, lazy_book, options)
+
+        book2 = epub.read_epub(file_name)
+        self._test_basic_book(book2)
+
+        data = book2.get_item_with_id("data")
+        assert data is not None
+        assert data.get_content() == b"x" * 10000
+        assert os.listdir(tmp_path) == ["source.epub"]
+
+    def test_lazy_load_set_content(self):
+        book = self._create_basic_book()
+
+        f = io.BytesIO()
+        epub.write_epub(f, book, {})
+        f.seek(0)
+
+        lazy_book = epub.read_epub(f, {"lazy_load": True})
+        style = lazy_book.get_item_with_id("style")
+        assert style is not None
+
+        style.set_content(b"BODY { color: red; }")
+        lazy_book.close()
+
+        assert style.get_content() == b"BODY { color: red; }"
+
+    def test_read_epub_metadata(self, monkeypatch):
+        book = self._create_basic_book()
+
+        f = io.BytesIO()
+        epub.write_epub(f, book, {})
+        f.seek(0)
+
+        read_names = []
+        zip_read = zipfile.ZipFile.read
+
+        def _read(zf, name, pwd=None):
+            read_names.append(getattr(name, "filename", name))
+            return zip_read(zf, name, pwd)
+
+        monkeypatch.setattr(zipfile.ZipFile, "read", _read)
+
+        info = epub.read_epub_metadata(f)
+
+        assert read_names == ["META-INF/container.xml", "EPUB/content.opf"]
+        assert info["uid"] == "test123456"
+        assert info["title"] == "Test book"
+        assert info["spine"] == [("nav", "yes"), ("chap_1", "yes"), ("chap_2", "yes")]
+        assert {"id": "style", "href": "style.css", "media_type": "text/css", "properties": []} in info["manifest"]
+        assert info["toc"] == []
+
+    def test_read_epub_metadata_missing_files(self):
+        book = self._create_basic_book()
+
+        f = io.BytesIO()
+        epub.write_epub(f, book, {})
+
+        # files listed in the manifest are missing in the archive
+        out = io.BytesIO()
+        with zipfile.ZipFile(f) as zf_in, zipfile.ZipFile(out, "w") as zf_out:
+            for info in zf_in.infolist():
+                if info.filename not in ("EPUB/style.css", "EPUB/nav.xhtml"):
+                    zf_out.writestr(info, zf_in.read(info))
+
+        info = epub.read_epub_metadata(out, toc=True)
+
+        assert {"id": "style", "href": "style.css", "media_type": "text/css", "properties": []} in info["manifest"]
+        # table of contents is read from the NCX instead
+        assert len(info["toc"]) == 2
+
+    def test_read_opf_in_batches(self, monkeypatch):
+        book = self._create_basic_book()
+        for n in range(3, 10):
+            book.add_item(epub.EpubHtml(uid=f"chap_{n}", file_name=f"test{n}.xhtml", content="<p>lorum ipsum.</p>"))
+            book.spine.append(f"chap_{n}")
+        book.guide = [{"href": "test.xhtml", "title": "Start", "type": "text"}]
+
+        f = io.BytesIO()
+        epub.write_epub(f, book, {})
+
+        def _read():
+            f.seek(0)
+            return epub.read_epub_metadata(f)
+
+        expected = _read()
+
+        # parsed elements of the OPF are removed from the tree after every 2 elements
+        monkeypatch.setattr("ebooklib.reader._OPF_BATCH_SIZE", 2)
+        info = _read()
+
+        assert info == expected
+        assert len(info["manifest"]) == len(book.items)
+        assert info["spine"][-1] == ("chap_9", "yes")
+        assert info["guide"] == [{"href": "test.xhtml", "title": "Start", "type": "text"}]
+
+        f.seek(0)
+        info = epub.read_epub_metadata(f, toc=True)
+
+        assert len(info["toc"]) == 2
+        assert type(info["toc"][1][0]) is epub.Section
+
+    def test_compression(self):
+        book = self._create_basic_book()
+        mtime = datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+
+        serial = io.BytesIO()
+        epub.write_epub(serial, book, {"mtime": mtime})
+
+        parallel = io.BytesIO()
+        epub.write_epub(parallel, book, {"mtime": mtime, "compress_workers": 4})
+
+        # compressing in the thread pool must create exactly the same archive
+        assert parallel.getvalue() == serial.getvalue()
+
+        with zipfile.ZipFile(parallel) as zf:
+            assert zf.testzip() is None
+
+            infos = zf.infolist()
+            assert infos[0].filename == "mimetype"
+            assert infos[0].compress_type == zipfile.ZIP_STORED
+            for info in infos[1:]:
+                # already compressed images are stored by default
+                if info.filename.endswith(".jpg"):
+                    assert info.compress_type == zipfile.ZIP_STORED
+                else:
+                    assert info.compress_type == zipfile.ZIP_DEFLATED
+
+        parallel.seek(0)
+        self._test_basic_book(epub.read_epub(parallel))
+
+    def test_compression_without_raw_writes(self, monkeypatch):
+        book = self._create_basic_book()
+
+        def _write_compressed(*args, **kwargs):
+            raise AssertionError("private zipfile attributes used")
+
+        # default options write all members with writestr()
+        with monkeypatch.context() as m:
+            m.setattr(epub.EpubWriter, "_write_compressed", _write_compressed)
+            epub.write_epub(io.BytesIO(), book, {"raise_exceptions": True})
+
+        f = io.BytesIO()
+        epub.write_epub(f, book, {})
+        f.seek(0)
+
+        # zipfile without the private attributes, members are written with writestr() as well
+        monkeypatch.setattr("ebooklib.writer._RAW_WRITE_ATTRIBUTES", ("_missing_attribute",))
+
+        with epub.read_epub(f, {"lazy_load": True}) as lazy_book:
+            out = io.BytesIO()
+            epub.write_epub(out, lazy_book, {"compress_workers": 4, "raise_exceptions": True})
+
+        with zipfile.ZipFile(out) as zf:
+            assert zf.testzip() is None
+            assert zf.infolist()[0].filename == "mimetype"
+
+        out.seek(0)
+        self._test_basic_book(epub.read_epub(out))
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_copy_unchanged(self, workers):
+        book = self._create_basic_book()
+
+        f = io.BytesIO()
+        epub.write_epub(f, book, {})
+        f.seek(0)
+
+        with epub.read_epub(f, {"lazy_load": True}) as lazy_book:
+            lazy_book.set_unique_metadata("DC", "title", "New title")
+
+            style = lazy_book.get_item_with_id("style")
+            cover = lazy_book.get_item_with_id("cover-img")
+            assert style is not None and cover is not None
+            cover.set_content(b"new image data")
+
+            out = io.BytesIO()
+            epub.write_epub(out, lazy_book, {"compress_workers": workers})
+
+            # unchanged item was copied without reading its content
+            assert not style.is_loaded()
+
+        out.seek(0)
+        book2 = epub.read_epub(out)
+
+        assert book2.get_metadata("DC", "title") == [("New title", {})]
+        style2 = book2.get_item_with_id("style")
+        image2 = book2.get_item_with_id("cover-img")
+        assert style2 is not None
+        assert image2 is not None
+        assert style2.get_content() == b"BODY { color: black; }"
+        assert image2.get_content() == b"new image data"
+
+        with zipfile.ZipFile(f) as zf_in, zipfile.ZipFile(out) as zf_out:
+            info_in = zf_in.getinfo("EPUB/style.css")
+            info_out = zf_out.getinfo("EPUB/style.css")
+
+            assert info_out.CRC == info_in.CRC
+            assert info_out.compress_size == info_in.compress_size
+            assert zf_out.testzip() is None
+
+    @pytest.mark.parametrize("lazy_load", [False, True])
+    def test_zero_copy(self, tmp_path, lazy_load):
+        book = self._create_basic_book()
+        audio = b"".join(bytes([n]) * 1000 for n in range(100))
+        book.add_item(epub.EpubItem(uid="audio", file_name="audio/track.mp3", media_type="audio/mpeg", content=audio))
+
+        file_name = str(tmp_path / "zero_copy.epub")
+        epub.write_epub(file_name, book, {})
+
+        out = io.BytesIO()
+
+        with epub.read_epub(file_name, {"zero_copy": True, "lazy_load": lazy_load}) as mapped_book:
+            self._test_basic_book(mapped_book)
+
+            track = mapped_book.get_item_with_id("audio")
+            style = mapped_book.get_item_with_id("style")
+            chapter = mapped_book.get_item_with_id("chap_1")
+            assert track is not None and style is not None and chapter is not None
+
+            # stored member is a view over the archive, compressed ones and documents are copies
+            assert isinstance(track.get_buffer(), memoryview)
+            assert track.get_buffer() == audio
+            assert isinstance(style.get_buffer(), bytes)
+            assert style.get_content() == b"BODY { color: black; }"
+            assert isinstance(chapter.content, bytes)
+
+            # public accessors always return bytes
+            content = track.get_content()
+            assert isinstance(content, bytes)
+            assert content.startswith(bytes([0]) * 1000)
+
+            epub.write_epub(out, mapped_book, {"compress_workers": 2})
+            archive = mapped_book._archive
+
+        # memory map of the archive is not kept after it was closed, views still work
+        assert archive is None or archive not in utils._mappings
+        assert track.get_content() == audio
+
+        out.seek(0)
+        book2 = epub.read_epub(out)
+
+        track2 = book2.get_item_with_id("audio")
+        assert track2 is not None
+        assert track2.get_content() == audio
+
+    def test_zero_copy_write_to_source(self, tmp_path):
+        book = self._create_basic_book()
+        audio = b"".join(bytes([n]) * 1000 for n in range(100))
+        book.add_item(epub.EpubItem(uid="audio", file_name="audio/track.mp3", media_type="audio/mpeg", content=audio))
+
+        file_name = str(tmp_path / "zero_copy.epub")
+        epub.write_epub(file_name, book, {})
+
+        # mapped items must not be read from the file after it was truncated
+        mapped_book = epub.read_epub(file_name, {"zero_copy": True})
+        assert epub.write_epub(file_name, mapped_book, {"raise_exceptions": True})
+
+        track = epub.read_epub(file_name).get_item_with_id("audio")
+        assert track is not None
+        assert track.get_content() == audio
+
+        mapped_track = mapped_book.get_item_with_id("audio")
+        assert mapped_track is not None
+        assert mapped_track.get_content() == audio
+
+    def test_update_epub(self, tmp_path):
+        book = self._create_basic_book()
+        book.add_item(epub.EpubItem(uid="old", file_name="old.txt", media_type="text/plain", content=b"old"))
+
+        file_name = str(tmp_path / "update.epub")
+        epub.write_epub(file_name, book, {})
+
+        with zipfile.ZipFile(file_name) as zf:
+            original = {info.filename: (info.CRC, info.compress_size) for info in zf.infolist()}
+
+        def _update(book):
+            book.set_unique_metadata("DC", "title", "New title")
+
+            style = book.get_item_with_id("style")
+            old = book.get_item_with_id("old")
+            assert style is not None and old is not None
+
+            style.set_content(b"BODY { color: red; }")
+            book.remove_item(old)
+            book.add_item(epub.EpubItem(uid="new", file_name="new.txt", media_type="text/plain", content=b"new"))
+
+        out = io.BytesIO()
+        epub.update_epub(file_name, _update, out)
+
+        # without output the original file is replaced
+        epub.update_epub(file_name, _update)
+
+        for updated in (out, file_name):
+            book2 = epub.read_epub(updated)
+            assert book2.spine == [("nav", "yes"), ("chap_1", "yes"), ("chap_2", "yes")]
+            assert len(book2.toc) == 2
+
+            style2 = book2.get_item_with_id("style")
+            new = book2.get_item_with_id("new")
+            assert style2 is not None and new is not None
+            assert book2.get_metadata("DC", "title") == [("New title", {})]
+            assert style2.get_content() == b"BODY { color: red; }"
+            assert new.get_content() == b"new"
+            assert book2.get_item_with_id("old") is None
+
+            with zipfile.ZipFile(updated) as zf:
+                assert zf.testzip() is None
+                assert "EPUB/old.txt" not in zf.namelist()
+
+                # unchanged documents and images are copied as they are
+                for name in ("EPUB/test.xhtml", "EPUB/test2.xhtml", "EPUB/image.jpg"):
+                    info = zf.getinfo(name)
+                    assert (info.CRC, info.compress_size) == original[name]
+
+        assert [p.name for p in tmp_path.iterdir()] == ["update.epub"]
+
+    def test_trace(self):
+        book = self._create_basic_book()
+
+        report = epub.TimingReport()
+        out = io.BytesIO()
+        epub.write_epub(out, book, {"trace": report, "plugins": [standard.SyntaxPlugin()]})
+
+        phases = {span.phase for span in report.spans}
+        assert {"write_opf", "get_content", "get_nav", "get_ncx", "compress"} <= phases
+        assert "SyntaxPlugin.html_before_write" in phases
+
+        summary = {row["phase"]: row for row in report.summary()}
+        assert summary["SyntaxPlugin.html_before_write"]["count"] == len(
+            [item for item in book.get_items() if isinstance(item, epub.EpubHtml)]
+        )
+        assert summary["SyntaxPlugin.html_before_write"]["size"] is None
+        assert summary["compress"]["size"] == sum(info.file_size for info in zipfile.ZipFile(out).infolist()[3:])
+
+        rows = report.summary(by_item=True)
+        assert [row["total"] for row in rows] == sorted((row["total"] for row in rows), reverse=True)
+        assert ("get_content", "test.xhtml") in {(row["phase"], row["name"]) for row in rows}
+
+        lines = report.format(limit=3).splitlines()
+        assert lines[0].split() == ["phase", "count", "total", "max", "bytes"]
+        assert len(lines) == 4
+
+        report.clear()
+        out.seek(0)
+        epub.read_epub(out, {"trace": report})
+
+        spans = {span.phase: span for span in report.spans}
+        assert list(spans)[:2] == ["open", "load_container"]
+        assert {"parse_opf", "load_metadata", "load_manifest", "load_spine", "load_toc", "parse_nav"} <= set(spans)
+        assert spans["read_item"].size is not None
+
+    def test_async_epub(self, tmp_path):
+        class AsyncFile:
+            def __init__(self, data=b""):
+                self.data = io.BytesIO(data)
+
+            async def read(self, size=-1):
+                return self.data.read(size)
+
+            async def write(self, data):
+                self.data.write(data)
+
+        class StreamWriter:
+            def __init__(self):
+                self.data = io.BytesIO()
+                self.drained = 0
+
+            def write(self, data):
+                self.data.write(data)
+
+            async def drain(self):
+                self.drained += 1
+
+        async def _chunks(data):
+            for n in range(0, len(data), 1000):
+                yield data[n : n + 1000]
+
+        async def _roundtrip():
+            semaphore = asyncio.Semaphore(1)
+            file_name = str(tmp_path / "async.epub")
+            book = self._create_basic_book()
+
+            assert await epub.awrite_epub(file_name, book, {}, semaphore=semaphore)
+
+            # async output streams get the archive in chunks
+            async_file, stream = AsyncFile(), StreamWriter()
+            results = await asyncio.gather(
+                epub.awrite_epub(async_file, book, {}, semaphore=semaphore),
+                epub.awrite_epub(stream, book, {}, semaphore=semaphore),
+            )
+            assert results == [True, True]
+            assert stream.drained > 0
+
+            data = async_file.data.getvalue()
+            assert data == stream.data.getvalue()
+
+            # errors of the stream are handled like in write_epub
+            class BrokenFile(AsyncFile):
+                async def write(self, data):
+                    raise OSError("Broken pipe")
+
+            assert await epub.awrite_epub(BrokenFile(), book) is False
+            with pytest.raises(OSError, match="Broken pipe"):
+                await epub.awrite_epub(BrokenFile(), book, {"raise_exceptions": True})
+
+            return [
+                await epub.aread_epub(file_name, semaphore=semaphore),
+                await epub.aread_epub(AsyncFile(data)),
+                await epub.aread_epub(_chunks(data), {"lazy_load": True}),
+            ]
+
+        for book in asyncio.run(_roundtrip()):
+            self._test_basic_book(book)
+
+    def test_write_non_seekable(self):
+        class Stream:
+            def __init__(self):
+                self.data = io.BytesIO()
+
+            def write(self, data):
+                return self.data.write(data)
+
+            def flush(self):
+                pass
+
+        book = self._create_basic_book()
+        audio = epub.EpubItem(uid="audio", file_name="audio.mp3", media_type="audio/mpeg")
+        audio.set_content_provider(lambda: (bytes([n]) * 1000 for n in range(100)))
+        book.add_item(audio)
+
+        for options in ({}, {"workers": 2}):
+            stream = Stream()
+            assert epub.write_epub(stream, book, {**options, "raise_exceptions": True})
+
+            with zipfile.ZipFile(io.BytesIO(stream.data.getvalue())) as zf:
+                for info in zf.infolist():
+                    # only members streamed from a content provider need a data descriptor
+                    streamed = info.filename == "EPUB/audio.mp3" or info.compress_type == zipfile.ZIP_DEFLATED
+                    assert bool(info.flag_bits & 0x08) == streamed, info.filename
+
+                assert zf.getinfo("EPUB/image.jpg").compress_type == zipfile.ZIP_STORED
+                assert zf.read("EPUB/image.jpg") == b"fake image data"
+                assert zf.read("EPUB/audio.mp3") == b"".join(bytes([n]) * 1000 for n in range(100))
+
+    def test_compression_policy(self):
+        book = self._create_basic_book()
+        book.add_item(epub.EpubItem(uid="data", file_name="data.bin", content=os.urandom(64 * 1024)))
+
+        f = io.BytesIO()
+        epub.write_epub(
+            f,
+            book,
+            {
+                "compression_policy": {"text/css": None, ebooklib.ITEM_COVER: 9},
+                "compression_trial": True,
+            },
+        )
+
+        with zipfile.ZipFile(f) as zf:
+            assert zf.getinfo("EPUB/style.css").compress_type == zipfile.ZIP_STORED
+            assert zf.getinfo("EPUB/image.jpg").compress_type == zipfile.ZIP_DEFLATED
+            assert zf.getinfo("EPUB/test.xhtml").compress_type == zipfile.ZIP_DEFLATED
+            # random data does not compress, so the trial deflate stores it
+            assert zf.getinfo("EPUB/data.bin").compress_type == zipfile.ZIP_STORED
+
+        # default policy is shared by all writers and can not be changed by one of them
+        writer = epub.EpubWriter(io.BytesIO(), book)
+        with pytest.raises(TypeError):
+            writer.options["compression_policy"]["image/png"] = 9
+
+        extended = {**epub.EpubWriter.DEFAULT_OPTIONS["compression_policy"], "text/css": None}
+        assert extended["image/png"] is None
+
+    def test_deduplicate(self):
+        book = self._create_basic_book()
+        book.add_item(
+            epub.EpubItem(
+                uid="style_copy", file_name="styles/copy.css", media_type="text/css", content="BODY { color: black; }"
+            )
+        )
+        book.add_item(epub.EpubImage(uid="image_copy", file_name="images/copy 1.jpg", content=b"fake image data"))
+
+        doc = epub.EpubHtml(
+            uid="chap_3", file_name="text/test3.xhtml", content='<p><img src="../images/copy%201.jpg"/></p>'
+        )
+        doc.add_link(href="../styles/copy.css", rel="stylesheet", type="text/css")
+        book.add_item(doc)
+        book.spine.append(doc)
+
+        f = io.BytesIO()
+        writer = epub.EpubWriter(f, book, {"deduplicate": True})
+        writer.process()
+        writer.write()
+
+        # cover image is kept because the package document refers to its id
+        assert writer.duplicates == {"styles/copy.css": "style.css", "images/copy 1.jpg": "image.jpg"}
+        assert writer.saved_bytes == len(b"BODY { color: black; }") + len(b"fake image data")
+
+        with zipfile.ZipFile(f) as zf:
+            assert "EPUB/styles/copy.css" not in zf.namelist()
+            assert "EPUB/images/copy 1.jpg" not in zf.namelist()
+
+            content = zf.read("EPUB/text/test3.xhtml")
+            assert b'src="../image.jpg"' in content
+            assert b'href="../style.css"' in content
+
+        f.seek(0)
+        read_book = epub.read_epub(f)
+        assert read_book.get_item_with_id("style_copy") is None
+        assert read_book.get_item_with_id("image_copy") is None
+        assert len(list(read_book.get_items_of_type(ebooklib.ITEM_STYLE))) == 1
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_compression_cache(self, tmp_path, workers):
+        book = self._create_basic_book()
+        book.add_item(epub.EpubItem(uid="data", file_name="data.txt", media_type="text/plain", content=b"x" * 10000))
+        mtime = datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+        options = {"mtime": mtime, "compress_workers": workers}
+
+        expected = io.BytesIO()
+        epub.write_epub(expected, book, options)
+
+        cache = epub.DiskCompressionCache(tmp_path / "cache", min_size=0)
+        results = []
+        for _ in range(2):
+            f = io.BytesIO()
+            epub.write_epub(f, book, {**options, "compression_cache": cache})
+            results.append(f.getvalue())
+
+        # container and package document are different in every book and are not cached
+        infos = zipfile.ZipFile(expected).infolist()
+        members = len([info for info in infos if info.compress_type == zipfile.ZIP_DEFLATED]) - 2
+        assert (cache.misses, cache.hits) == (members, members)
+        # compressed data from the cache makes exactly the same archive
+        assert results == [expected.getvalue(), expected.getvalue()]
+
+        # random data does not compress, only one of the entries fits and least recently used ones are removed
+        for n in range(2):
+            book.add_item(epub.EpubItem(file_name=f"random{n}.txt", media_type="text/plain", content=os.urandom(3000)))
+
+        cache = epub.DiskCompressionCache(tmp_path / "small", max_size=5000, min_size=2000)
+        epub.write_epub(io.BytesIO(), book, {**options, "compression_cache": cache})
+        # with several workers the small entry of data.txt is not always the oldest one
+        sizes = [entry.stat().st_size for entry in os.scandir(tmp_path / "small")]
+        assert len([size for size in sizes if size > 2000]) == 1
+        assert sum(sizes) <= 5000
+
+        # entry written again replaces the old one and is counted only once
+        key = cache.get_key(b"y" * 3000, 6)
+        for _ in range(3):
+            cache.put(key, b"z" * 2000, 0, 3000)
+        assert cache._size == sum(entry.stat().st_size for entry in os.scandir(tmp_path / "small"))
+
+        # temporary files left by processes which did not finish writing are removed as well
+        (tmp_path / "small" / ".ebooklib-stale").write_bytes(b"partial")
+        cache.clear()
+        assert os.listdir(tmp_path / "small") == []
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_write_stream(self, workers):
+        book = self._create_basic_book()
+
+        audio = epub.EpubItem(uid="audio", file_name="audio/track.mp3", media_type="audio/mpeg")
+        audio.set_content_provider(lambda: (bytes([n]) * 1000 for n in range(100)))
+        book.add_item(audio)
+
+        data = epub.EpubItem(uid="data", file_name="data.txt", media_type="text/plain")
+        data.set_content_provider(lambda: io.BytesIO(b"provided " * 1000), size=9000)
+        book.add_item(data)
+
+        class Sink:
+            # write-only target, like a socket or a pipe
+            def __init__(self):
+                self.chunks = []
+
+            def write(self, chunk):
+                self.chunks.append(bytes(chunk))
+                return len(chunk)
+
+            def flush(self):
+                pass
+
+        sink = Sink()
+        epub.write_epub(sink, book, {"compress_workers": workers})
+
+        f = io.BytesIO(b"".join(sink.chunks))
+
+        with zipfile.ZipFile(f) as zf:
+            assert zf.testzip() is None
+            assert zf.namelist()[0] == "mimetype"
+            assert zf.read("mimetype") == b"application/epub+zip"
+            assert zf.getinfo("EPUB/audio/track.mp3").compress_type == zipfile.ZIP_STORED
+
+        f.seek(0)
+        book2 = epub.read_epub(f)
+        self._test_basic_book(book2)
+
+        audio = book2.get_item_with_id("audio")
+        data = book2.get_item_with_id("data")
+        assert audio is not None
+        assert data is not None
+        assert audio.get_content() == b"".join(bytes([n]) * 1000 for n in range(100))
+        assert data.get_content() == b"provided " * 1000
+
     def test_basic_file_raise_exceptions(self):
         book = self._create_basic_book()
 
@@ -298,6 +980,47 @@ class TestEbook:
         # Make sure plugin erases unwanted attributes
         assert link[0].attrib.get("onclick") is None
 
+    def test_syntax_plugin_whitelist(self):
+        book = epub.EpubBook()
+
+        doc1 = epub.EpubHtml(uid="chap_syntax", file_name="syntax.xhtml")
+        doc1.set_content(
+            '<html><head><meta name="a" content="b"/><link href="a.css" rel="stylesheet" onload="x()"/></head>'
+            '<body><p class="a" align="left"><font>Big</font> <tt>text</tt></p>'
+            '<table summary="Summary" border="0" width="10"><tr><td colspan="2" nowrap="">1</td></tr></table>'
+            '<svg viewbox="0 0 10 10" width="10"/></body></html>'
+        )
+        book.add_item(doc1)
+
+        standard.SyntaxPlugin().html_before_write(book, doc1)
+        tree = doc1.get_html_tree()
+
+        head = tree.find("head")
+        assert head is not None
+        assert [child.tag for child in head] == ["link"]
+        assert dict(head[0].attrib) == {"href": "a.css", "rel": "stylesheet"}
+
+        body = tree.find("body")
+        assert body is not None
+        p = body.find("p")
+        assert p is not None
+        assert dict(p.attrib) == {"class": "a"}
+        assert p.text == "Big text"
+
+        table = body.find("table")
+        assert table is not None
+        assert dict(table.attrib) == {"border": ""}
+        assert table[0].tag == "caption"
+        assert table[0].text == "Summary"
+        td = table.find(".//td")
+        assert td is not None
+        assert dict(td.attrib) == {"colspan": "2"}
+
+        svg = body.find("svg")
+        assert svg is not None
+        assert dict(svg.attrib) == {"width": "10"}
+        assert "svg" in doc1.properties
+
     def test_booktype_plugin(self):
         book = self._create_basic_book()
 
@@ -377,6 +1100,105 @@ class TestEbook:
 
         assert len(highlight_div) == 1
 
+    def test_sourcecode_plugin_formatter_options(self):
+        book = self._create_basic_book()
+
+        doc1 = epub.EpubHtml(uid="chap_syntax", file_name="syntax.xhtml")
+        doc1.set_content("<body><h1>Title</h1><pre class='source-python'>a = 1\nb = 2</pre></body>")
+        book.add_item(doc1)
+
+        # list values can not be used as keys of the formatter cache
+        plugin = sourcecode.SourceHighlighter(formatter_options={"hl_lines": [2], "cssclass": "code"})
+
+        f = io.BytesIO()
+        epub.write_epub(f, book, {"plugins": [plugin]})
+        f.seek(0)
+
+        chapter1 = epub.read_epub(f).get_item_with_id("chap_syntax")
+        assert chapter1 is not None
+
+        body = parse_html_string(chapter1.get_content()).find("body")
+        assert len(xpath_elements(body, ".//div[@class='code']")) == 1
+        assert len(xpath_elements(body, ".//span[@class='hll']")) == 1
+
+    def test_sourcecode_plugin_workers(self):
+        mtime = datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+        outputs = []
+
+        for workers in (1, 2):
+            book = self._create_basic_book()
+
+            for n in range(4):
+                chapter = epub.EpubHtml(uid=f"chap_code_{n}", file_name=f"code_{n}.xhtml")
+                chapter.set_content(
+                    f"<body><h1>Code {n}</h1><pre class='source-python'>print({n})</pre>"
+                    f"<pre class='source-css'>p {{ margin: {n}em; }}</pre>"
+                    "<pre class='source-python'>x = 1 <b>bold</b></pre></body>"
+                )
+                book.add_item(chapter)
+
+            f = io.BytesIO()
+            epub.write_epub(f, book, {"mtime": mtime, "plugins": [sourcecode.SourceHighlighter(workers=workers)]})
+            outputs.append(f.getvalue())
+
+        # highlighting in a process pool gives exactly the same book
+        assert outputs[0] == outputs[1]
+
+        book2 = epub.read_epub(io.BytesIO(outputs[1]))
+        chapter = book2.get_item_with_id("chap_code_3")
+        assert chapter is not None
+
+        body = parse_html_string(chapter.get_content()).find("body")
+        assert len(xpath_elements(body, ".//div[@class='highlight']")) == 3
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_tidy_plugin(self, monkeypatch, workers):
+        def _tidy_cleanup(content, **extra):
+            content = content.encode("utf-8") if isinstance(content, str) else content
+
+            if b"broken" in content:
+                return (2, content)
+
+            return (0, content.replace(b"<p>", b'<p class="tidy">'))
+
+        monkeypatch.setattr(tidyhtml, "tidy_cleanup", _tidy_cleanup)
+
+        book = self._create_basic_book()
+
+        for n in range(10):
+            chapter = epub.EpubHtml(uid=f"chap_tidy_{n}", file_name=f"tidy_{n}.xhtml")
+            chapter.set_content(f"<body><p>Chapter {n}</p>{'broken' if n == 5 else ''}</body>")
+            book.add_item(chapter)
+
+        class MarkerPlugin(BasePlugin):
+            def html_before_write(self, book, chapter):
+                content = chapter.content
+                content = content.encode("utf-8") if isinstance(content, str) else content
+                chapter.content = content.replace(b"</body>", b"<p>Marker</p></body>")
+
+        plugin = tidyhtml.TidyPlugin(workers=workers)
+
+        f = io.BytesIO()
+        # tidy runs before the HTML hooks of all plugins, whatever the number of workers
+        epub.write_epub(f, book, {"plugins": [MarkerPlugin(), plugin]})
+        f.seek(0)
+
+        assert plugin.return_codes["tidy_0.xhtml"] == 0
+        assert plugin.return_codes["tidy_5.xhtml"] == 2
+
+        book2 = epub.read_epub(f)
+
+        for n in range(10):
+            chapter = book2.get_item_with_id(f"chap_tidy_{n}")
+            assert chapter is not None
+
+            content = chapter.get_content()
+            assert isinstance(content, bytes)
+
+            expected = f"<p>Chapter {n}</p>" if n == 5 else f'<p class="tidy">Chapter {n}</p>'
+            assert expected.encode("utf-8") in content
+            assert b"<p>Marker</p>" in content
+
     def _test_metadata(self, book):
         assert book.get_metadata("DC", "subject") == [("Fiction", None)]
         assert book.get_metadata("DC", "contributor") == [("Editor", {"role": "edt"})]
@@ -433,3 +1255,50 @@ class TestEbook:
 
     def test_epubbook_read_epub_as_bytes(self):
         self._test_epubbook(io.BytesIO((Path(__file__).parent / "resources" / "test01.epub").open("rb").read()))
+
+    def test_reader_section_hooks(self):
+        file_name = Path(__file__).parent / "resources" / "test01.epub"
+
+        class GuideReader(epub.EpubReader):
+            def _load_guide(self):
+                super()._load_guide()
+
+                # the whole package document is there for overridden hooks
+                assert self.container is not None
+                self.book.guide.append({"href": "extra.xhtml", "title": "Extra", "type": "text"})
+
+        reader = GuideReader(file_name)
+        book = reader.load()
+        expected = epub.read_epub(file_name)
+
+        assert book.guide == [*expected.guide, {"href": "extra.xhtml", "title": "Extra", "type": "text"}]
+        assert book.metadata == expected.metadata
+        assert book.spine == expected.spine
+        assert [item.get_name() for item in book.get_items()] == [item.get_name() for item in expected.get_items()]
+
+        # without overridden hooks the root element of the package document is kept
+        reader = epub.EpubReader(file_name)
+        reader.load()
+        assert reader.container is not None
+        assert reader.container.getroot().get("unique-identifier") == expected.IDENTIFIER_ID
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_read_many(self, tmp_path, workers):
+        good = Path(__file__).parent / "resources" / "test01.epub"
+        bad = tmp_path / "bad.epub"
+        bad.write_bytes(b"not a zip file")
+
+        results = {name: (book, error) for name, book, error in epub.read_many([good, bad], workers=workers)}
+
+        book, error = results[good]
+        assert error is None
+        assert book.uid == "sample123456"
+        assert len(list(book.get_items())) == 6
+
+        book, error = results[bad]
+        assert book is None
+        assert isinstance(error, epub.EpubException)
+        assert error.msg == "Bad Zip file"
+
+        results = {name: info for name, info, _ in epub.read_many([good], workers=workers, summary=True)}
+        assert results[good]["title"] == "Sample book"
@@ -1,10 +1,11 @@
 import logging
-from typing import cast
+from typing import Any, cast
 
+import pytest
 from lxml import etree
 
 import ebooklib
-from ebooklib import epub
+from ebooklib import epub, utils
 from ebooklib.utils import parse_html_string
 
 logger = logging.getLogger(__name__)
@@ -47,6 +48,34 @@ class TestEpubHtml:
         assert len(list(doc1.get_links())) == 5
         assert "scripted" in doc1.properties
 
+    def test_lists(self):
+        doc1 = epub.EpubHtml()
+
+        assert list(doc1.get_metas()) == []
+        assert doc1.properties == []
+
+        doc1.properties.append("svg")
+        doc1.metas.append({"name": "viewport"})
+        doc1.pages += [epub.Link("test.xhtml#page1", "1")]
+        assert doc1.properties == ["svg"]
+        assert list(doc1.get_metas()) == [{"name": "viewport"}]
+        assert len(doc1.pages) == 1
+
+        properties = ["scripted"]
+        doc1.properties = properties
+        assert doc1.properties is properties
+
+    def test_custom_attributes(self):
+        # attributes which are not defined by the classes can still be set
+        doc1 = cast("Any", epub.EpubHtml())
+        doc1.chapter_number = 1
+        assert doc1.chapter_number == 1
+        assert vars(doc1) == {"chapter_number": 1}
+
+        link = cast("Any", epub.Link("test.xhtml", "Test"))
+        link.level = 2
+        assert vars(link) == {"level": 2}
+
     def test_items(self):
         doc1 = epub.EpubHtml()
 
@@ -99,3 +128,67 @@ class TestEpubHtml:
         doc1.set_language("de")
         html_tree = parse_html_string(doc1.get_content())
         assert html_tree.attrib["lang"] == "de"
+
+    def test_template(self):
+        book = epub.EpubBook()
+
+        doc1 = epub.EpubHtml(file_name="test.xhtml")
+        doc1.set_content("<html><body><p>Paragraph</p></body></html>")
+        book.add_item(doc1)
+
+        # every call returns new copy, so changes to one copy do not leak into the next one
+        tree = book.get_template_tree("chapter")
+        assert tree is not None
+        tree.getroot().set("class", "changed")
+        assert b"changed" not in doc1.get_content()
+        assert doc1.get_content() == doc1.get_content()
+
+        book.set_template("chapter", b'<html xmlns="http://www.w3.org/1999/xhtml" class="custom"></html>')
+        assert b'class="custom"' in doc1.get_content()
+
+        # templates changed directly are noticed as well
+        book.templates["chapter"] = b'<html xmlns="http://www.w3.org/1999/xhtml" class="direct"></html>'
+        assert b'class="direct"' in doc1.get_content()
+
+        assert book.get_template_tree("missing") is None
+
+    def test_pages(self, monkeypatch):
+        book = epub.EpubBook()
+
+        doc1 = epub.EpubHtml(file_name="test.xhtml")
+        doc1.set_content(
+            '<html><body><span epub:type="pagebreak" id="page1" aria-label="One"/><p>Text</p>'
+            '<div epub:type="pagebreak" id="page2"><h2> </h2><h3>Three</h3></div></body></html>'
+        )
+        book.add_item(doc1)
+
+        pages = [("test.xhtml", "page1", "One"), ("test.xhtml", "page2", "Three")]
+
+        # page breaks are remembered when the document is parsed for writing
+        doc1.get_content()
+        monkeypatch.setattr("ebooklib.items.parse_html_string", None)
+        assert doc1.get_pages() == pages
+        monkeypatch.undo()
+
+        doc1.set_content('<html><body><span epub:type="pagebreak" id="page3"/></body></html>')
+        assert doc1.get_pages() == [("test.xhtml", "page3", "page3")]
+
+        # changes of the parsed tree are noticed
+        tree = doc1.get_html_tree()
+        tree.find("body").append(utils.create_pagebreak("page4", html=False))
+        assert [page[1] for page in doc1.get_pages()] == ["page3", "page4"]
+
+        doc1.set_content("<html><body></body></html>")
+        assert doc1.get_pages() == []
+
+        # documents which can not be parsed have no pages, other errors are not hidden
+        doc1.set_content("")
+        assert doc1.get_pages() == []
+        assert doc1.get_body_content() == b""
+
+        def _failing_provider():
+            raise OSError("provider failed")
+
+        doc1.set_content_provider(_failing_provider)
+        with pytest.raises(OSError, match="provider failed"):
+            doc1.get_pages()
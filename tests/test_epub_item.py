@@ -1,3 +1,9 @@
+import copy
+import os
+
+import pytest
+from lxml import etree
+
 import ebooklib
 from ebooklib import epub
 
@@ -51,6 +57,21 @@ class TestEpubItemInitialization:
         item.set_content(b"NEW CONTENT")
         assert item.get_content() == b"NEW CONTENT"
 
+    def test_content_provider(self):
+        item = epub.EpubItem(content=b"THIS IS CONTENT")
+
+        item.set_content_provider(lambda: iter([b"PROVIDED ", b"CONTENT"]), size=16)
+
+        assert item.has_content_provider()
+        assert item.get_provided_size() == 16
+        assert item.get_content() == b"PROVIDED CONTENT"
+        assert list(item.iter_content()) == [b"PROVIDED ", b"CONTENT"]
+
+        item.set_content(b"NEW CONTENT")
+
+        assert not item.has_content_provider()
+        assert list(item.iter_content()) == [b"NEW CONTENT"]
+
     def test_get_type(self):
         """Test item.get_type() method."""
 
@@ -74,3 +95,144 @@ class TestEpubItemInitialization:
         assert len(list(book.get_items_of_type(ebooklib.ITEM_IMAGE))) == 3
         assert len(list(book.get_items_of_media_type("image/jpeg"))) == 2
         assert len(list(book.get_items())) == len(FILENAME_TYPES)
+
+    def test_remove_item(self):
+        book = epub.EpubBook()
+
+        item1 = book.add_item(epub.EpubItem(uid="item_1", file_name="style/one.css"))
+        item2 = book.add_item(epub.EpubItem(uid="item_2", file_name="style/two.css"))
+
+        book.remove_item(item1)
+
+        assert item1.book is None
+        assert book.get_item_with_id("item_1") is None
+        assert book.get_item_with_href("style/one.css") is None
+        assert book.get_item_with_id("item_2") == item2
+        assert list(book.get_items()) == [item2]
+
+    def test_item_lookup_after_changes(self):
+        book = epub.EpubBook()
+
+        item1 = book.add_item(epub.EpubItem(uid="item_1", file_name="style/one.css"))
+        assert book.get_item_with_id("item_1") == item1
+
+        # attributes changed after the item was added
+        item1.id = "renamed"
+        item1.file_name = "style/renamed.css"
+
+        assert book.get_item_with_id("item_1") is None
+        assert book.get_item_with_id("renamed") == item1
+        assert book.get_item_with_href("style/renamed.css") == item1
+
+        # items list changed directly
+        item2 = epub.EpubItem(uid="item_2", file_name="style/two.css")
+        book.items.append(item2)
+
+        assert book.get_item_with_id("item_2") == item2
+        assert book.get_item_with_href("style/two.css") == item2
+
+    def test_item_lookup_after_replacement(self):
+        book = epub.EpubBook()
+
+        item1 = book.add_item(epub.EpubItem(uid="item_1", file_name="style/one.css"))
+        item2 = book.add_item(epub.EpubItem(uid="item_2", file_name="style/two.css"))
+        assert book.get_item_with_id("item_1") is item1
+        assert book.get_item_with_href("style/two.css") is item2
+
+        # items replaced in the list without changing its length
+        item3 = epub.EpubItem(uid="item_3", file_name="style/three.css")
+        book.items[0] = item3
+
+        assert book.get_item_with_id("item_1") is None
+        assert book.get_item_with_href("style/one.css") is None
+        assert book.get_item_with_id("item_3") is item3
+
+        book.items.remove(item2)
+        book.items.append(item1)
+
+        assert book.get_item_with_id("item_2") is None
+        assert book.get_item_with_href("style/one.css") is item1
+
+        book.remove_item(item3)
+        assert book.get_item_with_id("item_3") is None
+        assert book.get_item_with_id("item_1") is item1
+
+    def test_item_lookup_after_removing_first(self):
+        book = epub.EpubBook()
+
+        items = [book.add_item(epub.EpubItem(uid=f"i{n}", file_name=f"style/{n}.css")) for n in range(3)]
+        assert book.get_item_with_id("i0") is items[0]
+
+        book.remove_item(items[0])
+        assert book.get_item_with_id("i2") is items[2]
+        assert book.get_item_with_href("style/0.css") is None
+
+        book.items.pop(0)
+        assert book.get_item_with_id("i2") is items[2]
+        assert book.get_item_with_id("i1") is None
+
+        # items list assigned directly and copies of the book keep working
+        book.items = [items[0]]
+        assert book.get_item_with_href("style/0.css") is items[0]
+        assert copy.deepcopy(book).get_item_with_id("i0") is not None
+
+    def test_html_tree(self):
+        book = epub.EpubBook()
+        chapter = epub.EpubHtml(title="Intro", file_name="intro.xhtml", lang="en")
+        chapter.content = "<html><body><p>First</p></body></html>"
+        book.add_item(chapter)
+
+        tree = chapter.get_html_tree()
+        assert chapter.get_html_tree() is tree
+
+        # changes to the tree are seen by everyone using the item
+        tree.find("body").find("p").text = "Changed"
+        assert chapter.content == etree.tostring(tree, pretty_print=True, encoding="utf-8")
+        assert b"<p>Changed</p>" in chapter.get_body_content()
+        assert b"<p>Changed</p>" in chapter.get_content()
+
+        # serializing the item does not consume the cached tree
+        assert len(tree.find("body")) == 1
+
+        chapter.set_content("<html><body><p>Second</p></body></html>")
+        assert chapter.get_html_tree() is not tree
+        assert b"<p>Second</p>" in chapter.get_content()
+
+    def test_content_store(self, tmp_path):
+        book = epub.EpubBook()
+        store = epub.TempFileStore(threshold=100, directory=tmp_path)
+        book.set_content_store(store)
+
+        audio = book.add_item(epub.EpubItem(uid="audio", file_name="audio.mp3", content=b"a" * 1000))
+        style = book.add_item(epub.EpubItem(uid="style", file_name="style.css", content=b"body {}"))
+
+        file_name = store.get_file_name(audio)
+        assert file_name is not None
+        assert not audio.is_loaded()
+        assert audio.get_content() == b"a" * 1000
+        assert audio.get_provided_size() == 1000
+        assert store.get_file_name(style) is None
+
+        # new content replaces the stored one
+        audio.set_content(b"b" * 2000)
+        assert not os.path.exists(file_name)
+        assert audio.get_content() == b"b" * 2000
+
+        audio.set_content(b"small")
+        assert store.get_file_name(audio) is None
+        assert audio.get_content() == b"small"
+
+        audio.set_content(b"c" * 1000)
+        file_name = store.get_file_name(audio)
+        assert file_name is not None
+        book.remove_item(audio)
+        assert not os.path.exists(file_name)
+        assert audio.get_content() == b"c" * 1000
+
+        book.add_item(audio)
+        assert store.get_file_name(audio) is not None
+        book.close()
+        assert list(tmp_path.iterdir()) == []
+
+        with pytest.raises(ValueError, match="removed when the book was closed"):
+            audio.get_content()
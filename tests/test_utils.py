@@ -1,4 +1,7 @@
+import io
 import os
+import zipfile
+import zlib
 
 import pytest
 
@@ -62,3 +65,58 @@ class TestDirectory:
 
         with pytest.raises(OSError, match="escapes the source directory"):
             directory.read(os.path.join(os.sep, "etc", "passwd"))
+
+    def test_read_view(self, tmp_path):
+        (tmp_path / "audio.mp3").write_bytes(b"audio data")
+        (tmp_path / "empty.css").write_bytes(b"")
+
+        directory = utils.Directory(str(tmp_path))
+
+        view = directory.read_view("audio.mp3")
+        assert isinstance(view, memoryview)
+        assert view == b"audio data"
+        assert directory.read_view("empty.css") == b""
+
+        with pytest.raises(OSError, match="escapes the source directory"):
+            directory.read_view(os.path.join("..", "..", "etc", "passwd"))
+
+
+class TestArchiveHandlePool:
+    @pytest.mark.parametrize("compress_type", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+    def test_bad_crc(self, tmp_path, compress_type):
+        file_name = tmp_path / "test.zip"
+        with zipfile.ZipFile(file_name, "w") as zf:
+            zf.writestr("data.bin", b"data" * 1000, compress_type)
+
+        with zipfile.ZipFile(file_name) as zf:
+            pool = utils.ArchiveHandlePool(zf, file_name)
+
+            with pool.open("data.bin") as f:
+                assert f.read() == b"data" * 1000
+
+            zf.getinfo("data.bin").CRC ^= 1
+
+            with pool.open("data.bin") as f, pytest.raises(zipfile.BadZipFile, match="Bad CRC-32"):
+                f.read()
+
+            pool.close()
+            with pytest.raises(ValueError):
+                pool.open("data.bin")
+
+    def test_read_raw(self, tmp_path):
+        file_name = tmp_path / "test.zip"
+        with zipfile.ZipFile(file_name, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("data.bin", b"data" * 1000)
+
+        expected = None
+        for source in (file_name, io.BytesIO(file_name.read_bytes())):
+            with zipfile.ZipFile(source) as zf:
+                member = utils.ArchiveMember(zf, "data.bin")
+                data = member.read_raw()
+
+                # position of the ZipFile is not moved
+                assert zf.read("data.bin") == b"data" * 1000
+                assert zlib.decompress(data, -15) == b"data" * 1000
+
+                assert expected in (None, data)
+                expected = data